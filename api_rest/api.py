@@ -1,11 +1,15 @@
 """
 Contains classes that provide sets of API views for all models of the project.
 """
-from django.db.models import Count
+from copy import copy
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Count, Case, When, Value
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, mixins, viewsets
 from rest_framework.decorators import action
-from rest_framework.generics import get_object_or_404
+from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
@@ -13,10 +17,14 @@ from rest_framework.viewsets import ModelViewSet
 
 from posts.models import Post
 from questions.models import QuestionCategory, Question
+from interview_quiz.conditional import make_validators, not_modified, set_validators
+from interview_quiz.versions import bump_version
+from myadmin.stats import COUNTED_FIELDS, count_changes
 from users.models import MyUser
+from .exports import EXPORT_CONTENT_TYPES, export_response
 from .filters import QuestionFilter, QuestionCategoryFilter, PostFilter, UserFilter
 from .serializers import QuestionCategorySerializer, QuestionSerializer, \
-    PostSerializer, UserSerializer
+    PostSerializer, UserSerializer, BulkToggleSerializer
 
 
 class BasePagination(LimitOffsetPagination):
@@ -24,7 +32,178 @@ class BasePagination(LimitOffsetPagination):
     default_limit = 10
 
 
-class BaseViewSet(ModelViewSet):
+class ExportMixin:
+    """Adds the streaming export of the filtered queryset to a set of api views.
+
+    Attributes:
+
+        * export_fields (`tuple`): the names of the exported fields (attnames for foreign keys).
+    """
+    export_fields = ()
+
+    @action(detail=False, name='Экспорт (CSV/NDJSON)')
+    def export(self, request, *args, **kwargs):
+        """Streams all objects matching the filters of the request without pagination.
+        The format is chosen with the 'export_format' parameter: 'csv' (default) or 'ndjson'."""
+        file_format = request.query_params.get('export_format', 'csv')
+        if file_format not in EXPORT_CONTENT_TYPES:
+            return Response({'export_format': f'Unknown format {file_format}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, self.export_fields, file_format, self.basename)
+
+
+class NotModified(Exception):
+    """Raised to answer a request of unchanged data with the response carried by the exception."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """Answers GET and HEAD requests of unchanged data with 304 after the authentication
+    and permission checks, but before any query of the objects and their serialization.
+
+    A response of a single object depends on the version of this object, other responses -
+    on the version of the whole model. The full url (with the filters and the pagination),
+    the user and the format of the response are also a part of the ETag.
+
+    Attributes:
+
+        * version_models (`tuple`): other models the representation of the objects depends on.
+    """
+    version_models = ()
+
+    def get_version_dependencies(self):
+        """Returns the pairs (model, pk) the response depends on."""
+        model = self.queryset.model
+        pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field) if self.detail else None
+        return [(other, None) for other in self.version_models] + [(model, pk)]
+
+    def initial(self, request, *args, **kwargs):
+        """After the checks of the request, compares its validators with the current ones."""
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method in ('GET', 'HEAD'):
+            self.validators = make_validators(self.get_version_dependencies(), request.build_absolute_uri(),
+                                              request.user.pk, request.accepted_renderer.format)
+            response = not_modified(request, *self.validators)
+            if response is not None:
+                raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'validators', None) is not None:
+            set_validators(response, *self.validators)
+        return response
+
+
+class BulkWriteMixin:
+    """Adds bulk updating and bulk activation/deactivation of objects to a set of api views.
+    Every request is processed in one transaction with a fixed number of queries,
+    and the version of the model is increased once per request, not once per object.
+
+    Attributes:
+
+        * toggle_field (`str`): the boolean field switched by deletion and ``bulk_toggle``,
+          None if the objects cannot be switched through the api.
+    """
+    toggle_field = 'available'
+
+    def toggle(self, ids, value=None):
+        """Sets the toggle field of the objects to the value (or inverts it) with one UPDATE query.
+
+        Args:
+
+            * ids (`list`): primary keys of the objects;
+            * value (`bool`, optional): the new value, by default the current value is inverted.
+
+        Returns:
+
+            * int: the number of updated objects.
+        """
+        model = self.queryset.model
+        update = value
+        if value is None:
+            update = Case(When(**{self.toggle_field: True}, then=Value(False)), default=Value(True))
+        with transaction.atomic():
+            # the previous states of the objects are locked and read for the counters of the dashboard
+            before = list(model.objects.filter(pk__in=ids).select_for_update().only(*COUNTED_FIELDS.get(model, ())))
+            updated = model.objects.filter(pk__in=ids).update(**{self.toggle_field: update})
+            after = [copy(obj) for obj in before]
+            for obj in after:
+                setattr(obj, self.toggle_field, not getattr(obj, self.toggle_field) if value is None else value)
+            count_changes(before, after)
+        if updated:
+            bump_version(model)
+        return updated
+
+    def destroy(self, request, *args, **kwargs):
+        """When trying to delete an object, makes it inactive
+        (or active if it was deactivated earlier).
+        """
+        if not self.toggle(self.clean_ids([kwargs['pk']])):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def clean_id(self, pk):
+        """Returns the passed primary key converted to a python value, None if it is incorrect."""
+        try:
+            return self.queryset.model._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            return None
+
+    def clean_ids(self, ids):
+        """Returns the passed primary keys converted to python values, skipping the incorrect ones."""
+        return [pk for pk in map(self.clean_id, ids) if pk is not None]
+
+    @action(detail=False, methods=['put', 'patch'], url_path='bulk-update', name='Массовое изменение')
+    def bulk_update(self, request, *args, **kwargs):
+        """Updates several objects at once. Accepts a list of objects, each with its 'id';
+        with the PATCH method only the passed fields are changed.
+        Returns the updated objects in the order of the request."""
+        if not isinstance(request.data, list):
+            return Response({'non_field_errors': ['Expected a list of items.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        ids = self.clean_ids([item.get('id') for item in request.data if isinstance(item, dict)])
+        instances = list(self.queryset.model.objects.filter(pk__in=ids))
+        before = [copy(obj) for obj in instances]
+        serializer = self.get_serializer(instances, data=request.data, many=True,
+                                         partial=request.method == 'PATCH')
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+            count_changes(before, instances)
+        bump_version(self.queryset.model)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk-toggle', name='Массовая активация/деактивация')
+    def bulk_toggle(self, request, *args, **kwargs):
+        """Activates/deactivates several objects with one query.
+        Accepts {"ids": [...], "value": true/false}, without 'value' the state of every object is inverted.
+        Returns the number of updated objects, the new state of each of them and the ids that were not found."""
+        if self.toggle_field is None:
+            raise MethodNotAllowed(request.method)
+        serializer = BulkToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = self.clean_ids(serializer.validated_data['ids'])
+        updated = self.toggle(ids, serializer.validated_data['value'])
+        results = dict(self.queryset.model.objects.filter(pk__in=ids).values_list('pk', self.toggle_field))
+        return Response({
+            'updated': updated,
+            'results': [{'id': pk, self.toggle_field: value} for pk, value in results.items()],
+            # the ids are compared as python values, so '007' or an uppercase UUID is found as well
+            'not_found': [pk for pk in serializer.validated_data['ids'] if self.clean_id(pk) not in results],
+        })
+
+
+class BaseViewSet(ConditionalGetMixin, BulkWriteMixin, ExportMixin, ModelViewSet):
     """Basic class of making set of api views."""
     model = QuestionCategory
     pagination_class = BasePagination
@@ -34,7 +213,11 @@ class BaseViewSet(ModelViewSet):
         'create': [IsAuthenticated],
         'update': [IsAdminUser],
         'partial_update': [IsAdminUser],
-        'destroy': [IsAdminUser]
+        'destroy': [IsAdminUser],
+        'export': [IsAdminUser],
+        'bulk_create': [IsAuthenticated],
+        'bulk_update': [IsAdminUser],
+        'bulk_toggle': [IsAdminUser],
     }
 
     def get_permissions(self):
@@ -46,15 +229,6 @@ class BaseViewSet(ModelViewSet):
         except KeyError:
             return [permission() for permission in self.permission_classes]
 
-    def destroy(self, request, *args, **kwargs):
-        """When trying to delete an object, makes it inactive
-        (or active if it was deactivated earlier).
-        """
-        item = get_object_or_404(self.queryset, pk=kwargs['pk'])
-        item.available = not item.available
-        item.save()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-
     def create(self, request, *args, **kwargs):
         """Overrides the method of creating a new object.
         If it is not an instance of a Category, it automatically fills in the 'author' field
@@ -65,6 +239,20 @@ class BaseViewSet(ModelViewSet):
             if self.model is not QuestionCategory else serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='bulk-create', name='Массовое создание')
+    def bulk_create(self, request, *args, **kwargs):
+        """Creates several objects with one query. Accepts a list of objects;
+        if one of them is incorrect, nothing is created and the errors are returned for each item.
+        As with creation of a single object, the 'author' field is filled in with the current user."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save(author=request.user) \
+                if self.model is not QuestionCategory else serializer.save()
+            count_changes([], serializer.instance)
+        bump_version(self.model)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, name='Сортировка по тегу (а-я)')
     def order_by_tag(self, request, *args, **kwargs):
         """A method that allows you to sort the queryset by the 'tag' field."""
@@ -81,11 +269,17 @@ class BaseViewSet(ModelViewSet):
 class QuestionCategoryViewSet(BaseViewSet):
     """Child class for QuestionCategory model api views."""
     queryset = QuestionCategory.objects.all().order_by('name')
+    # a category is represented with the numbers of its questions and posts
+    version_models = (Question, Post)
     http_method_names = ['get', 'post', 'put']
     serializer_class = QuestionCategorySerializer
     filterset_class = QuestionCategoryFilter
     permission_classes_by_action = {item: [IsAdminUser] for item in
-                                    ['create', 'update', 'partial_update', ]}
+                                    ['create', 'update', 'partial_update', 'export',
+                                     'bulk_create', 'bulk_update', ]}
+    # categories are switched together with their questions and posts in the admin panel
+    toggle_field = None
+    export_fields = ('id', 'name', 'description', 'available')
 
     @action(detail=False, name='Сортировка по количеству вопросов')
     def order_by_tag(self, request, *args, **kwargs):
@@ -105,19 +299,27 @@ class QuestionViewSet(BaseViewSet):
     """Child class for Question model api views."""
     model = Question
     queryset = Question.objects.all()
+    version_models = (QuestionCategory,)
     serializer_class = QuestionSerializer
     filterset_class = QuestionFilter
+    export_fields = ('id', 'question', 'subject_id', 'author_id', 'right_answer', 'answer_01', 'answer_02',
+                     'answer_03', 'answer_04', 'difficulty_level', 'available', 'tag')
 
 
 class PostViewSet(BaseViewSet):
     """Child class for Post model api views."""
     model = Post
     queryset = Post.objects.all()
+    version_models = (QuestionCategory,)
     serializer_class = PostSerializer
     filterset_class = PostFilter
+    export_fields = ('id', 'title', 'author_id', 'category_id', 'body', 'created_on', 'available', 'tag')
 
 
-class UserViewSet(mixins.RetrieveModelMixin,
+class UserViewSet(ConditionalGetMixin,
+                  BulkWriteMixin,
+                  ExportMixin,
+                  mixins.RetrieveModelMixin,
                   mixins.UpdateModelMixin,
                   mixins.DestroyModelMixin,
                   mixins.ListModelMixin,
@@ -129,15 +331,9 @@ class UserViewSet(mixins.RetrieveModelMixin,
     filter_backends = (DjangoFilterBackend,)
     filterset_class = UserFilter
     permission_classes = [IsAdminUser]
-
-    def destroy(self, request, *args, **kwargs):
-        """When trying to delete an object, makes it inactive
-        (or active if it was deactivated earlier).
-        """
-        item = get_object_or_404(self.queryset, pk=kwargs['pk'])
-        item.is_active = not item.is_active
-        item.save()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+    toggle_field = 'is_active'
+    export_fields = ('id', 'username', 'first_name', 'last_name', 'email', 'score', 'is_active', 'is_staff',
+                     'is_superuser', 'social_network', 'last_login', 'date_joined')
 
     @action(detail=False, name='Пользователи по дате последнего логина')
     def recent_users(self, request, *args, **kwargs):
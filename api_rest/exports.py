@@ -0,0 +1,69 @@
+"""
+Contains helpers for streaming export of querysets in CSV or NDJSON format.
+
+Rows are fetched with ``.iterator(chunk_size=...)`` (a server-side cursor on Postgres)
+and written to the response one by one, so the memory used by the export does not
+depend on the size of the table.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+#: the number of rows fetched from the database at a time
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class Echo:
+    """An object that implements just the write method of the file-like interface.
+    Allows csv.writer to return the written line instead of buffering it."""
+
+    def write(self, value):
+        """Returns the value instead of writing it."""
+        return value
+
+
+def export_rows(queryset, fields, file_format='csv'):
+    """Lazily converts the queryset into lines of the export file.
+
+    Args:
+
+        * queryset (`QuerySet`): objects to export;
+        * fields (`tuple`): the names of the exported fields (attnames for foreign keys);
+        * file_format (`str`, optional): 'csv' (with a header line) or 'ndjson'.
+
+    Yields:
+
+        * str: the next line of the file.
+    """
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if file_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+    else:
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+
+
+def export_response(queryset, fields, file_format, filename):
+    """Returns a streaming response with the exported queryset as an attached file.
+
+    Args:
+
+        * queryset (`QuerySet`): objects to export;
+        * fields (`tuple`): the names of the exported fields;
+        * file_format (`str`): 'csv' or 'ndjson';
+        * filename (`str`): the name of the file without the extension.
+    """
+    response = StreamingHttpResponse(export_rows(queryset, fields, file_format),
+                                     content_type=EXPORT_CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
@@ -2,12 +2,88 @@
 Contains serializers of models for the API of the project.
 """
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from rest_framework.serializers import HyperlinkedModelSerializer, ModelSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import HyperlinkedModelSerializer, ModelSerializer, ListSerializer
 
 from posts.models import Post
 from questions.models import QuestionCategory, Question
-from users.models import MyUser
+from users.models import MyUser, get_default_author
+
+
+#: the maximum number of objects in one bulk request
+BULK_MAX_ITEMS = 1000
+
+
+class BulkListSerializer(ListSerializer):
+    """Serializer for lists of objects that saves them with bulk queries:
+    one ``bulk_create`` for new objects, one ``bulk_update`` for changed ones.
+
+    When updating, the list of instances is passed as the instance of the serializer,
+    and every item of the data must contain the 'id' of its object.
+    """
+
+    def to_internal_value(self, data):
+        """Validates every item of the list. When updating, each item is validated
+        against its own object, so that object-level validation of partial data
+        can use the current values of the object.
+        The validated items and their objects are kept in the same order."""
+        if not isinstance(data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if not data or len(data) > BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [f'Expected from 1 to {BULK_MAX_ITEMS} items.']})
+        if self.instance is None:
+            return super().to_internal_value(data)
+
+        instances = {self.clean_id(obj.pk): obj for obj in self.instance}
+        self.ordered_instances, ret, errors = [], [], []
+        for item in data:
+            self.child.instance = instances.get(self.clean_id(item.get('id'))) if isinstance(item, dict) else None
+            if self.child.instance is None:
+                errors.append({'id': ['Object not found.']})
+                continue
+            try:
+                ret.append(self.child.run_validation(item))
+                self.ordered_instances.append(self.child.instance)
+                errors.append({})
+            except ValidationError as exc:
+                errors.append(exc.detail)
+        self.child.instance = None
+        if any(errors):
+            raise ValidationError(errors)
+        return ret
+
+    def clean_id(self, pk):
+        """Returns the primary key converted to a python value the way the view converts it, None if it is incorrect."""
+        try:
+            return self.child.Meta.model._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            return None
+
+    def create(self, validated_data):
+        """Creates all objects with one query.
+        Primary keys are filled in on databases that return them from bulk inserts (Postgres).
+        The objects without an author are given the default one, looked up once."""
+        model = self.child.Meta.model
+        objects = [model(**attrs) for attrs in validated_data]
+        authorless = [obj for obj in objects if getattr(obj, 'author_id', False) is None]
+        if authorless:
+            author = get_default_author()
+            for obj in authorless:
+                obj.author_id = author
+        return model.objects.bulk_create(objects)
+
+    def update(self, instance, validated_data):
+        """Sets the validated values to the objects and saves all changed fields with one query."""
+        fields = set()
+        for obj, attrs in zip(self.ordered_instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(obj, attr, value)
+                fields.add(attr)
+        if fields:
+            self.child.Meta.model.objects.bulk_update(self.ordered_instances, fields)
+        return self.ordered_instances
 
 
 class QuestionCategorySerializer(HyperlinkedModelSerializer):
@@ -15,6 +91,7 @@ class QuestionCategorySerializer(HyperlinkedModelSerializer):
     class Meta:
         model = QuestionCategory
         fields = ('id', 'name', 'description', 'available')
+        list_serializer_class = BulkListSerializer
 
     def to_representation(self, instance):
         """
@@ -33,14 +110,19 @@ class QuestionSerializer(ModelSerializer):
     class Meta:
         model = Question
         exclude = ('author', 'available',)
+        list_serializer_class = BulkListSerializer
 
     def validate(self, data):
         """
         Validating the presence of the correct answer among the suggested
-        options when creating a new question.
+        options when creating a new question. For partial updates the missing
+        answers are taken from the question being updated.
         """
-        if data['right_answer'] not in [data['answer_01'], data['answer_02'],
-                                        data['answer_03'], data['answer_04']]:
+        def value(field):
+            return data[field] if field in data else getattr(self.instance, field, None)
+
+        if value('right_answer') not in [value('answer_01'), value('answer_02'),
+                                         value('answer_03'), value('answer_04')]:
             raise serializers.ValidationError('Among the answer options, there is '
                                               'no one that you indicated as correct!')
         return data
@@ -53,6 +135,7 @@ class PostSerializer(ModelSerializer):
     class Meta:
         model = Post
         exclude = ('author', 'available',)
+        list_serializer_class = BulkListSerializer
 
 
 class UserSerializer(ModelSerializer):
@@ -62,3 +145,11 @@ class UserSerializer(ModelSerializer):
         exclude = ('activation_key', 'activation_key_created',
                    'info', 'password', 'groups', 'user_permissions', )
         read_only_fields = ('last_login', 'social_network', 'date_joined', )
+        list_serializer_class = BulkListSerializer
+
+
+class BulkToggleSerializer(serializers.Serializer):
+    """Serializer for the data of a bulk activation/deactivation request.
+    If 'value' is not passed, the state of every object is inverted."""
+    ids = serializers.ListField(child=serializers.CharField(), allow_empty=False, max_length=BULK_MAX_ITEMS)
+    value = serializers.BooleanField(required=False, allow_null=True, default=None)
@@ -0,0 +1,72 @@
+"""
+Configuration of gunicorn serving the site in production.
+
+The site is served as a WSGI application with threaded workers: a request waiting for
+Postgres, memcached or SMTP holds one thread, not a whole worker process.
+
+There is no ASGI mode: uvicorn workers with async versions of the hot views (QuestionView,
+AnswerQuestion, TopUsers, PostView and the api lists) were measured against gthread and rejected.
+Django 3.2 has no async ORM or cache api, and those of Django 4.x run the sync calls in the single
+thread-sensitive executor thread of the worker, so an async view waits for the database like a sync
+one, in one thread instead of WEB_THREADS. Requests per second and p95 of loadtest_journeys
+(one CPU, 3 workers, SQLite, the memcached stand-in, think time 1 s):
+
+    scenario, users              gthread            uvicorn,        async views,        async views
+                                                    sync views      thread-sensitive    on a thread pool
+    browse, 500 (+2 ms/query)    100, 0.7 s         74, 7.7 s       92, 6.5 s           93, 5.7 s
+    quiz, 50                     27-33, 1.1-1.8 s   27, 2.0 s       24, 2.4 s           29, 1.6 s
+    quiz, 500                    15-18 in every mode, more than half of the requests timed out:
+                                 the CPU is spent on the password hashes of the logins
+
+The views on a thread pool (thread_sensitive=False) are not safe with the ORM and only match gthread.
+It is worth measuring again with a database driver doing asynchronous I/O.
+
+The number of worker processes and threads is set with WEB_WORKERS and WEB_THREADS.
+Every thread keeps its own persistent connection to Postgres (DB_CONN_MAX_AGE), so the site
+opens up to WEB_WORKERS * WEB_THREADS connections; DB_POOL_SIZE limits the connections of
+a worker with the in-process pool (see interview_quiz/db/pool.py).
+Every worker is warmed up before it accepts connections (see interview_quiz/warmup.py),
+unless WARM_UP=0.
+
+The workers write their metrics to the files of METRICS_DIR, which are summed by the worker
+answering /metrics (see interview_quiz/metrics.py); the directory is emptied on start.
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+wsgi_app = 'interview_quiz.wsgi:application'
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 4))
+
+# requests of the load tests may wait for a long time in the queue
+timeout = int(os.getenv('WEB_TIMEOUT', 60))
+keepalive = 5
+
+# inherited by the workers, read by the settings
+METRICS_DIR = os.environ.setdefault('METRICS_DIR', '/tmp/interview_quiz_metrics')
+
+
+def on_starting(server):
+    """Removes the metrics of the previous run of the server."""
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+
+def post_worker_init(worker):
+    """Publishes the number of threads of the worker and warms it up after the application is loaded
+    and before it accepts connections."""
+    from interview_quiz.metrics import WORKER_THREADS
+    WORKER_THREADS.set(worker.cfg.threads)
+    from interview_quiz.warmup import enabled, warm_up
+    if enabled():
+        warm_up()
+
+
+def child_exit(server, worker):
+    """Drops the gauges of the stopped worker from the metrics, its counters stay."""
+    from interview_quiz.metrics import mark_process_dead
+    mark_process_dead(worker.pid, METRICS_DIR)
@@ -0,0 +1,168 @@
+"""
+Contains the views of the GraphQL api and of the documentation of the REST api.
+
+graphene and drf_yasg2 are the heaviest imports of the project and are needed only by
+these few urls, so urls.py refers to the views by their paths (see ``lazy_view``)
+and the module is imported on the first request of one of them (or by the warm-up).
+
+Generating the OpenAPI schema introspects every viewset, serializer and filterset, so it is
+done once per version of the code: by the build_openapi_schema command at deploy, or by
+the first request. The rendered documents are kept as files in ``OPENAPI_SCHEMA_DIR``,
+in the cache and in the memory of the process, and are served with an ETag.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from graphene_django.views import GraphQLView
+from drf_yasg2.views import get_schema_view
+from drf_yasg2 import openapi
+from drf_yasg2.renderers import SwaggerJSONRenderer, SwaggerYAMLRenderer
+from rest_framework.permissions import AllowAny
+
+schema_info = openapi.Info(
+   title="Interview Quiz",
+   default_version='2.0',
+   description="Documentation to Interview Quiz, my pet project",
+   contact=openapi.Contact(email="inspiracion@yandex.ru"),
+   license=openapi.License(name="MIT License"),
+)
+
+# without the url the schema has no host, so the clients send the requests to the host serving it
+schema_view = get_schema_view(
+   schema_info,
+   public=True,
+   permission_classes=(AllowAny,)
+)
+
+#: the renderers and the content types of the formats of the schema
+SCHEMA_FORMATS = {
+    'json': (SwaggerJSONRenderer, 'application/json'),
+    'yaml': (SwaggerYAMLRenderer, 'application/yaml'),
+}
+
+#: the rendered documents loaded by the process: {(version, format): (content, etag)}
+loaded_schemas = {}
+
+
+def project_sources():
+    """Returns the paths of the python files of the packages of the project, in a stable order."""
+    packages = sorted(path for path in settings.BASE_DIR.iterdir() if (path / '__init__.py').is_file())
+    return [source for package in packages for source in sorted(package.rglob('*.py'))]
+
+
+@lru_cache(maxsize=None)
+def get_schema_version():
+    """Returns the version of the code the schema is generated from, computed once per process:
+    a hash of the release set at deploy, or without it (in development) - of all python files
+    of the project, so a change of the api, its models or urls is a new version of the schema."""
+    digest = hashlib.md5(settings.RELEASE.encode())
+    if not settings.RELEASE:
+        for path in project_sources():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def get_schema_path(version, file_format):
+    """Returns the path of the file of the rendered schema."""
+    return settings.OPENAPI_SCHEMA_DIR / f'schema.{version}.{file_format}'
+
+
+def generate_schemas(formats=tuple(SCHEMA_FORMATS)):
+    """Generates the schema and renders it in the formats.
+
+    Args:
+
+        * formats (`tuple`, optional): the formats of the documents, by default all.
+
+    Returns:
+
+        * dict: the rendered documents by their formats.
+    """
+    generator = schema_view.generator_class(schema_info)
+    schema = generator.get_schema(request=None, public=True)
+    return {file_format: SCHEMA_FORMATS[file_format][0]().render(schema) for file_format in formats}
+
+
+def build_schemas(formats=tuple(SCHEMA_FORMATS)):
+    """Generates the schema of the current version, writes its files and puts it in the cache.
+
+    Args:
+
+        * formats (`tuple`, optional): the formats of the documents, by default all.
+
+    Returns:
+
+        * list: the paths of the written files.
+    """
+    version = get_schema_version()
+    paths = []
+    settings.OPENAPI_SCHEMA_DIR.mkdir(parents=True, exist_ok=True)
+    for file_format, content in generate_schemas(formats).items():
+        path = get_schema_path(version, file_format)
+        path.write_bytes(content)
+        cache.set(f'openapi:{version}:{file_format}', content, timeout=None)
+        paths.append(path)
+    return paths
+
+
+def get_schema(file_format):
+    """Returns the rendered schema of the current version and its ETag, looking for it in the memory
+    of the process, in the files and in the cache; the schema is generated only if it is nowhere.
+
+    Args:
+
+        * file_format (`str`): 'json' or 'yaml'.
+
+    Returns:
+
+        * tuple: the content (`bytes`) and the quoted ETag.
+    """
+    version = get_schema_version()
+    if (version, file_format) not in loaded_schemas:
+        try:
+            content = get_schema_path(version, file_format).read_bytes()
+        except OSError:
+            content = cache.get(f'openapi:{version}:{file_format}')
+        if content is None:
+            content = generate_schemas((file_format,))[file_format]
+            cache.set(f'openapi:{version}:{file_format}', content, timeout=None)
+        loaded_schemas[version, file_format] = content, quote_etag(f'{version}-{file_format}')
+    return loaded_schemas[version, file_format]
+
+
+def schema_response(request, file_format, content_type=None):
+    """Returns the response with the schema in the format, or 304 if the client has it already."""
+    content, etag = get_schema(file_format)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type=content_type or SCHEMA_FORMATS[file_format][1])
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def schema_json(request, format):
+    """Returns the schema as '/swagger.json' or '/swagger.yaml'."""
+    return schema_response(request, format.lstrip('.'))
+
+
+def with_cached_schema(ui_view):
+    """Wraps a view of the documentation: the page itself is rendered by drf_yasg2 (without
+    the schema), and the schema it requests with '?format=openapi' is served from the cache."""
+
+    def view(request, *args, **kwargs):
+        if request.GET.get('format') == 'openapi':
+            return schema_response(request, 'json', 'application/openapi+json')
+        return ui_view(request, *args, **kwargs)
+
+    return view
+
+
+schema_swagger_ui = with_cached_schema(schema_view.with_ui('swagger', cache_timeout=0))
+schema_redoc = with_cached_schema(schema_view.with_ui('redoc', cache_timeout=0))
+
+graphql = GraphQLView.as_view(graphiql=True)
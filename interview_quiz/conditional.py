@@ -0,0 +1,71 @@
+"""
+Contains validators of the conditional GET requests (ETag and Last-Modified).
+
+The validators of a response are derived from the versions of the models and objects
+the response depends on (see ``interview_quiz.versions``), not from its rendered body,
+so a request of unchanged data is answered with 304 after one cache query,
+before any database query, template rendering or serialization.
+
+The body of a response must be at least as new as its ETag, so when the data has changed
+too recently for the read replicas to have caught up, the body is read from the primary.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+from interview_quiz.db.router import use_primary
+from interview_quiz.versions import get_validators
+
+
+def replica_may_lag(last_modified):
+    """Checks whether a read replica may not show the last change of the data yet: it has been made
+    less than ``settings.REPLICA_PIN_SECONDS`` ago (the lag the pin cookie of the router allows for)
+    or its time is unknown."""
+    return last_modified is None or time.time() - last_modified.timestamp() < settings.REPLICA_PIN_SECONDS
+
+
+def make_validators(dependencies, *parts):
+    """Returns the ETag and the Last-Modified time of a response.
+    If a replica may lag behind the versions, the rest of the request reads from the primary.
+
+    Args:
+
+        * dependencies (`list`): pairs (model, pk) the response depends on, the pk is None for the whole model;
+        * parts: other values the response depends on (the path, the user).
+
+    Returns:
+
+        * tuple: the quoted ETag and the time of the last change (`datetime` or None).
+    """
+    versions, last_modified = get_validators(dependencies)
+    if replica_may_lag(last_modified):
+        use_primary()
+    source = '|'.join(map(str, [settings.RELEASE, *parts, *versions]))
+    return quote_etag(hashlib.md5(source.encode()).hexdigest()), last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """Returns the 304 (or 412) response if the conditions of the request allow it, otherwise None."""
+    response = get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified and int(last_modified.timestamp()))
+    return response and set_validators(response, etag, last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    """Adds the validators to a successful or 304 response and makes the clients revalidate it.
+
+    Returns:
+
+        * HttpResponse: the same response.
+    """
+    if response.status_code == 200 or response.status_code == 304:
+        if not response.has_header('ETag'):
+            response['ETag'] = etag
+        if last_modified is not None and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
@@ -0,0 +1,10 @@
+"""
+Contains the PostgreSQL database backend of the site (see base.py) with connection health checks
+and an optional in-process connection pool (see pool.py), the router of reads to the read
+replicas (see router.py), the migration of the keys of the authors (see author_keys.py),
+the time-ordered primary keys of the users (see keys.py) and the statistics of the queries
+by their fingerprints (see queries.py).
+
+The backend is used in production instead of ``django.db.backends.postgresql``
+(see DATABASES in settings.py).
+"""
@@ -0,0 +1,196 @@
+"""
+Contains the steps of the migration of the authors of questions and posts from usernames to
+the primary keys of the users, shared by the migrations of the questions and posts apps.
+
+The old foreign key (the ``author_id`` column holding a username) is replaced without stopping
+the site, in the order of the migrations:
+
+    1. ``000x_<model>_author_ref`` adds the nullable ``author_ref_id`` column. On PostgreSQL
+       a trigger keeps both columns in sync, so the workers of the previous release, which write
+       usernames, and the workers of the new one, which write primary keys, may run side by side;
+    2. ``000x_backfill_<model>_author_ref`` fills the new column in batches, each batch in its own
+       transaction. A big table may be filled in advance with the backfill_author_keys command
+       between the first migration and the rest of them, then this one finds nothing to do.
+       Rolled back, it writes the usernames of the authors back from the primary keys;
+    3. ``000x_switch_<model>_author`` switches the model to the new column: the ``author`` field
+       uses ``author_ref_id``, which becomes NOT NULL, and the old column becomes nullable
+       and loses its foreign key constraint;
+    4. the drop_author_usernames command drops the trigger and the old column. It is not
+       a migration, so the ``migrate`` run by the startup of the new release never drops the column
+       while the workers of the previous release still read and write it: it is run once they have
+       all stopped, and the next release may turn it into a migration.
+
+SQLite has no concurrent writers to care about: the trigger is not created, and the old column
+disappears when the table is rebuilt by the third step.
+"""
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+#: the number of rows updated by one transaction of the backfill
+BATCH_SIZE = 5000
+
+
+def create_sync_trigger(model_label):
+    """Returns the function of RunPython creating the trigger that fills the missing one
+    of the two author columns of the model on PostgreSQL."""
+    def create(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        table = apps.get_model(model_label)._meta.db_table
+        users = apps.get_model('users', 'MyUser')._meta.db_table
+        schema_editor.execute(f'''
+            CREATE OR REPLACE FUNCTION {table}_sync_author() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'UPDATE' AND NEW.author_id IS DISTINCT FROM OLD.author_id
+                        AND NEW.author_ref_id IS NOT DISTINCT FROM OLD.author_ref_id THEN
+                    NEW.author_ref_id := NULL;
+                ELSIF TG_OP = 'UPDATE' AND NEW.author_ref_id IS DISTINCT FROM OLD.author_ref_id
+                        AND NEW.author_id IS NOT DISTINCT FROM OLD.author_id THEN
+                    NEW.author_id := NULL;
+                END IF;
+                IF NEW.author_ref_id IS NULL AND NEW.author_id IS NOT NULL THEN
+                    SELECT id INTO NEW.author_ref_id FROM {users} WHERE username = NEW.author_id;
+                ELSIF NEW.author_id IS NULL AND NEW.author_ref_id IS NOT NULL THEN
+                    SELECT username INTO NEW.author_id FROM {users} WHERE id = NEW.author_ref_id;
+                END IF;
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_sync_author ON {table}')
+        schema_editor.execute(f'CREATE TRIGGER {table}_sync_author BEFORE INSERT OR UPDATE ON {table} '
+                              f'FOR EACH ROW EXECUTE PROCEDURE {table}_sync_author()')
+    return create
+
+
+def drop_sync_trigger(model_label):
+    """Returns the function of RunPython dropping the trigger created by ``create_sync_trigger``."""
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        table = apps.get_model(model_label)._meta.db_table
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_sync_author ON {table}')
+        schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_sync_author()')
+    return drop
+
+
+def backfill(model, user_model, using, batch_size=BATCH_SIZE):
+    """Fills the primary keys of the authors of the rows that have only the username,
+    going through the table by the primary key, one transaction per batch.
+
+    Args:
+
+        * model (`Model`): the historical model with both the ``author`` (username)
+                           and ``author_ref`` fields;
+        * user_model (`Model`): the historical model of users;
+        * using (`str`): the alias of the database;
+        * batch_size (`int`, optional): the number of rows updated by one transaction.
+
+    Yields:
+
+        * int: the number of rows updated by each batch.
+    """
+    last_pk = 0
+    author_pk = Subquery(user_model.objects.filter(username=OuterRef('author_id')).values('pk')[:1])
+    rows = model.objects.using(using)
+    while True:
+        pks = list(rows.filter(pk__gt=last_pk, author_ref__isnull=True).order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        with transaction.atomic(using=using):
+            yield rows.filter(pk__in=pks).update(author_ref_id=author_pk)
+        last_pk = pks[-1]
+
+
+def backfill_author_ref(model_label):
+    """Returns the function of RunPython filling the new author column of the model."""
+    def run(apps, schema_editor):
+        for _ in backfill(apps.get_model(model_label), apps.get_model('users', 'MyUser'),
+                          schema_editor.connection.alias):
+            pass
+    return run
+
+
+def restore_author_username(model_label):
+    """Returns the reverse function of ``backfill_author_ref``: the usernames of the authors are written
+    back from the primary keys in batches, so the previous release finds the authors of the rows
+    created or changed after the switch (on SQLite the old column is added again by ``KeepOldColumn``)."""
+    def run(apps, schema_editor):
+        model, user_model = apps.get_model(model_label), apps.get_model('users', 'MyUser')
+        using = schema_editor.connection.alias
+        username = Subquery(user_model.objects.filter(pk=OuterRef('author_ref_id')).values('username')[:1])
+        rows = model.objects.using(using)
+        last_pk = 0
+        while True:
+            pks = list(rows.filter(pk__gt=last_pk, author_ref__isnull=False).order_by('pk')
+                       .values_list('pk', flat=True)[:BATCH_SIZE])
+            if not pks:
+                return
+            with transaction.atomic(using=using):
+                rows.filter(pk__in=pks).update(author_id=username)
+            last_pk = pks[-1]
+    return run
+
+
+class SetNotNull(migrations.AlterField):
+    """Alters a nullable field to NOT NULL.
+
+    On PostgreSQL a NOT VALID check constraint is added and validated first: the validation reads
+    the table without blocking writes, and ``SET NOT NULL`` then uses the constraint instead of
+    scanning the table under an exclusive lock. Unlike ``AlterField``, the foreign key constraint
+    of the column is not dropped and created again. Other databases alter the field as usual.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        table, column = model._meta.db_table, model._meta.get_field(self.name).column
+        constraint = f'{table}_{column}_not_null'
+        schema_editor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {constraint} '
+                              f'CHECK ({column} IS NOT NULL) NOT VALID')
+        schema_editor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}')
+        schema_editor.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+        schema_editor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {constraint}')
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        column = model._meta.get_field(self.name).column
+        schema_editor.execute(f'ALTER TABLE {model._meta.db_table} ALTER COLUMN {column} DROP NOT NULL')
+
+
+class KeepOldColumn(migrations.AlterField):
+    """Alters the old author column to be nullable and have no foreign key constraint.
+
+    On SQLite the column is dropped when the table is rebuilt by the rest of the third step,
+    so rolled back, the column is added again first; it is filled with the default author
+    and then with the usernames by the reverse function of the backfill.
+    """
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            model = from_state.apps.get_model(app_label, self.model_name)
+            field = model._meta.get_field(self.name)
+            with schema_editor.connection.cursor() as cursor:
+                columns = [column.name for column in schema_editor.connection.introspection.get_table_description(
+                    cursor, model._meta.db_table)]
+            if field.column not in columns:
+                schema_editor.add_field(model, field)
+        super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def drop_author_username(model_label):
+    """Returns the function dropping the sync trigger and the old username column on PostgreSQL
+    (on SQLite the column has been dropped by the rebuild of the table), see drop_author_usernames."""
+    drop_trigger = drop_sync_trigger(model_label)
+
+    def drop(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        drop_trigger(apps, schema_editor)
+        table = apps.get_model(model_label)._meta.db_table
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS author_id')
+    return drop
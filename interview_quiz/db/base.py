@@ -0,0 +1,81 @@
+"""
+Contains the PostgreSQL database backend with connection health checks and an optional connection pool.
+
+Health checks (``CONN_HEALTH_CHECKS`` of the database settings, as in Django 4.1): a persistent
+connection (``CONN_MAX_AGE``) is reused by the next requests, and the database may have closed it
+in between (a restart, a failover, an idle timeout of pgbouncer). The first query of a request
+then fails. With the checks enabled, a connection left from a previous request is checked
+with ``SELECT 1`` before its first use in the request and reopened if it is broken.
+
+Pool (``POOL_SIZE`` > 0): connections are taken from the pool of the process (see pool.py)
+instead of being opened, and are returned to it instead of being closed at the end of a request.
+A connection closed inside a transaction or after errors is closed for real.
+"""
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from interview_quiz.db.pool import get_pool
+
+
+def is_usable(connection):
+    """Returns True if the raw psycopg2 connection answers a query."""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        connection.rollback()
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """The PostgreSQL backend of Django with health checks of persistent connections
+    and an in-process connection pool."""
+
+    health_check_done = False
+
+    @property
+    def pool(self):
+        """The connection pool of the process, or None if the pool is disabled."""
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), is_usable)
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        connection = self.connection
+        if self.in_atomic_block or self.errors_occurred or connection.closed:
+            pool.close(connection)
+            return
+        try:
+            if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except base.Database.Error:
+            pool.close(connection)
+        else:
+            pool.release(connection)
+
+    def connect(self):
+        super().connect()
+        # a new connection does not need to be checked until the next request
+        self.health_check_done = True
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done and not self.in_atomic_block and \
+                self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            self.health_check_done = True
+            if not self.is_usable():
+                self.errors_occurred = True
+                self.close()
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # called at the start and at the end of every request
+        self.health_check_done = False
@@ -0,0 +1,121 @@
+"""
+Contains the time-ordered primary keys of the users and the re-keying of the existing users.
+
+Random ``uuid4`` keys are inserted into random places of the primary key index of the users
+and of the indexes of every foreign key referencing them, which splits their pages and leaves
+them half empty as the table grows. A ``uuid7`` (RFC 9562) starts with the time of its creation
+in milliseconds, so new keys are appended to the right edge of the indexes, like the keys of
+a sequence, while staying unique without the database.
+"""
+import os
+import threading
+import time
+from uuid import UUID
+
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import Q
+
+#: the number of users re-keyed by one transaction
+BATCH_SIZE = 1000
+
+_lock = threading.Lock()
+_last = {'ms': 0, 'counter': 0}
+
+
+def uuid7(timestamp=None, rng=None):
+    """Returns a new UUID of version 7.
+
+    The keys generated by the process without a timestamp are strictly increasing: the 12 bits
+    following the milliseconds hold a counter, which starts from a random value every millisecond
+    and moves the time forward when it overflows (and when the clock goes back).
+
+    Args:
+
+        * timestamp (`float`, optional): the time of the key in seconds since the epoch,
+                                         the current time by default;
+        * rng (`random.Random`, optional): the source of the random bits of a key with a timestamp,
+                                           for reproducible keys (see myadmin/synthetic.py).
+
+    Returns:
+
+        * UUID: the key.
+    """
+    if timestamp is None:
+        with _lock:
+            ms = time.time_ns() // 1_000_000
+            if ms > _last['ms']:
+                _last['ms'], _last['counter'] = ms, int.from_bytes(os.urandom(2), 'big') & 0x7ff
+            else:
+                _last['counter'] += 1
+                if _last['counter'] > 0xfff:
+                    _last['ms'], _last['counter'] = _last['ms'] + 1, 0
+            ms, counter = _last['ms'], _last['counter']
+    elif rng is not None:
+        ms, counter = int(timestamp * 1000), rng.getrandbits(12)
+    else:
+        ms, counter = int(timestamp * 1000), int.from_bytes(os.urandom(2), 'big') & 0xfff
+    random = rng.getrandbits(62) if rng is not None else int.from_bytes(os.urandom(8), 'big') & (1 << 62) - 1
+    return UUID(int=ms << 80 | 0x7 << 76 | counter << 64 | 0b10 << 62 | random)
+
+
+def user_references(user_model):
+    """Returns the tables and columns of the foreign keys to the primary key of the users,
+    including the tables of many-to-many relations.
+
+    Args:
+
+        * user_model (`Model`): the model of users.
+
+    Returns:
+
+        * list: pairs of the table and the column.
+    """
+    return [(model._meta.db_table, field.column)
+            for model in apps.get_models(include_auto_created=True)
+            for field in model._meta.local_fields
+            if field.many_to_one or field.one_to_one
+            if field.remote_field.model is user_model and field.target_field.primary_key]
+
+
+def rekey(user_model, using, batch_size=BATCH_SIZE):
+    """Replaces the random primary keys of the users by time-ordered ones made from the time
+    of their registration, along with the foreign keys referencing them, one transaction
+    per batch. The users already having keys of version 7 are skipped, so the re-keying may be
+    interrupted and started again.
+
+    The foreign key constraints of Django are deferred to the end of the transaction,
+    so the key of a user and the references to it are changed in any order.
+    A write referencing a user of the batch being re-keyed waits for the batch and fails.
+
+    Args:
+
+        * user_model (`Model`): the model of users;
+        * using (`str`): the alias of the database;
+        * batch_size (`int`, optional): the number of users re-keyed by one transaction.
+
+    Yields:
+
+        * dict: the new keys of the users of each batch by their old ones.
+    """
+    connection = connections[using]
+    pk = user_model._meta.pk
+    tables = [(user_model._meta.db_table, pk.column)] + user_references(user_model)
+    users = user_model.objects.using(using).order_by('date_joined', 'pk').values_list('pk', 'date_joined')
+    last = None
+    while True:
+        after = Q(date_joined__gt=last[1]) | Q(date_joined=last[1], pk__gt=last[0]) if last else Q()
+        batch = list(users.filter(after)[:batch_size])
+        if not batch:
+            return
+        last = batch[-1]
+        keys = {old: uuid7(joined.timestamp()) for old, joined in batch if old.version != 7}
+        if not keys:
+            continue
+        params = [(pk.get_db_prep_value(new, connection), pk.get_db_prep_value(old, connection))
+                  for old, new in keys.items()]
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            for table, column in tables:
+                cursor.executemany(f'UPDATE {table} SET {column} = %s WHERE {column} = %s', params)
+        yield keys
+
@@ -0,0 +1,186 @@
+"""
+Contains the in-process pool of database connections.
+
+A gunicorn worker serves several requests at once in its threads, and without the pool every
+thread keeps its own connection (CONN_MAX_AGE) or opens a new one per request. The pool keeps
+at most ``max_size`` connections per worker process, which is the limit of the connections of
+the worker: a request taken by a thread when all connections are busy waits for a free one up
+to ``timeout`` seconds, then fails with ``PoolTimeout``. A connection that has been idle for longer
+than ``check_after`` seconds is checked before it is given out, and replaced if it is broken.
+
+The pool does not depend on the driver: connections are opened, checked and closed with
+the functions passed by the backend.
+"""
+import threading
+import time
+
+from django.db import OperationalError
+
+#: the pools of the process by the alias of the database
+pools = {}
+pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """Raised when no connection of the pool has become free within the timeout."""
+
+
+def close_quietly(connection):
+    """Closes the connection, ignoring errors: it is closed because it may be broken."""
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """A pool of database connections shared by the threads of a process.
+
+    Args:
+
+        * max_size (`int`): the maximum number of open connections;
+        * timeout (`float`, optional): how long to wait for a free connection, in seconds;
+        * check_after (`float`, optional): the idle time after which a connection is checked
+          before it is given out, in seconds.
+    """
+
+    def __init__(self, max_size, timeout=10.0, check_after=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.idle = []
+        self.open = 0
+        self.in_use = 0
+        self.condition = threading.Condition()
+        self.counters = {'opened': 0, 'closed': 0, 'acquired': 0, 'waits': 0, 'timeouts': 0,
+                         'broken': 0, 'wait_time': 0.0, 'max_wait_time': 0.0}
+
+    def count(self, name):
+        """Increases the counter of the pool."""
+        with self.condition:
+            self.counters[name] += 1
+
+    def add_wait_time(self, wait_time):
+        """Adds the time spent waiting for a connection to the counters, called under the lock."""
+        self.counters['wait_time'] += wait_time
+        self.counters['max_wait_time'] = max(self.counters['max_wait_time'], wait_time)
+
+    def reserve(self):
+        """Takes an idle connection or a place for a new one, waiting if the pool is full.
+
+        Returns:
+
+            * tuple: the connection or None if a new one must be opened, and the time it was released.
+        """
+        started = time.monotonic()
+        with self.condition:
+            if not self.idle and self.open >= self.max_size:
+                self.counters['waits'] += 1
+                while not self.idle and self.open >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self.counters['timeouts'] += 1
+                        self.add_wait_time(time.monotonic() - started)
+                        raise PoolTimeout(f'Все {self.max_size} соединений с базой данных заняты '
+                                          f'дольше {self.timeout} с')
+                    self.condition.wait(remaining)
+                self.add_wait_time(time.monotonic() - started)
+            self.in_use += 1
+            if self.idle:
+                return self.idle.pop()
+            self.open += 1
+            return None, None
+
+    def acquire(self, connect, check):
+        """Returns a connection of the pool, opening a new one if there are no idle connections.
+
+        Args:
+
+            * connect (`callable`): opens a new connection;
+            * check (`callable`): returns True if the connection passed to it is usable.
+        """
+        connection, released = self.reserve()
+        if connection is not None and time.monotonic() - released > self.check_after and not check(connection):
+            # the place of the broken connection is taken by the new one
+            self.count('broken')
+            self.count('closed')
+            close_quietly(connection)
+            connection = None
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                with self.condition:
+                    self.open -= 1
+                    self.in_use -= 1
+                    self.condition.notify()
+                raise
+            self.count('opened')
+        self.count('acquired')
+        return connection
+
+    def release(self, connection):
+        """Returns the connection to the pool."""
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.in_use -= 1
+            self.condition.notify()
+
+    def close(self, connection):
+        """Closes a connection taken from the pool (a broken one) and frees its place."""
+        close_quietly(connection)
+        with self.condition:
+            self.counters['closed'] += 1
+            self.open -= 1
+            self.in_use -= 1
+            self.condition.notify()
+
+    def stats(self):
+        """Returns the number of open, used and idle connections and the counters of the pool."""
+        with self.condition:
+            return {'max_size': self.max_size, 'open': self.open, 'in_use': self.in_use,
+                    'idle': len(self.idle), **self.counters}
+
+    def clear(self):
+        """Closes all idle connections."""
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.open -= len(idle)
+            self.counters['closed'] += len(idle)
+        for connection, _ in idle:
+            close_quietly(connection)
+
+
+def get_pool(alias, settings_dict):
+    """Returns the pool of the database of the process, creating it on the first call,
+    or None if the pool is disabled (``POOL_SIZE`` of the database settings is 0).
+
+    Args:
+
+        * alias (`str`): the alias of the database;
+        * settings_dict (`dict`): the settings of the database.
+    """
+    size = settings_dict.get('POOL_SIZE') or 0
+    if size <= 0:
+        return None
+    pool = pools.get(alias)
+    if pool is None:
+        with pools_lock:
+            pool = pools.get(alias)
+            if pool is None:
+                pool = pools[alias] = ConnectionPool(size, settings_dict.get('POOL_TIMEOUT', 10.0),
+                                                     settings_dict.get('POOL_CHECK_AFTER', 30.0))
+    return pool
+
+
+def get_pool_stats():
+    """Returns the statistics of the pools of the process by the alias of the database."""
+    return {alias: pool.stats() for alias, pool in list(pools.items())}
+
+
+def close_pools():
+    """Closes the idle connections of all pools and removes the pools."""
+    with pools_lock:
+        for pool in pools.values():
+            pool.clear()
+        pools.clear()
@@ -0,0 +1,204 @@
+"""
+Contains the statistics of the database queries of the requests grouped by their fingerprints.
+
+A fingerprint is the SQL of a query with the literals and the placeholders replaced by ``?``
+and the lists of values collapsed, so the queries made by the same code with different
+parameters share it. For every fingerprint the process keeps the number of queries, their total
+time, the number of queries per range of time (for the percentiles; unlike the times themselves,
+the ranges of the workers are summed cheaply) and the views and the places of the code making them.
+The queries slower than ``settings.SLOW_QUERY_MS`` are also kept as samples. Only the fingerprints
+are kept, never the SQL with its literals or the parameters, which may hold personal data and secrets.
+The statistics are collected only when ``settings.QUERY_STATS`` is turned on.
+
+The queries are recorded by the execute wrapper of the timing middleware (see timing.py).
+In the multiprocess mode of the metrics (see metrics.py) every gunicorn worker writes its
+statistics to its own file, and the report sums the files of all workers.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from functools import lru_cache
+
+from django.conf import settings
+
+from interview_quiz.metrics import FLUSH_HOOKS
+
+#: the limits of the kept statistics: fingerprints, views and places of the code per fingerprint, slow samples
+MAX_FINGERPRINTS = 500
+MAX_ORIGINS = 10
+MAX_SAMPLES = 50
+
+#: the upper bounds of the ranges of the time of the queries, seconds; the last range is unbounded
+BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+#: the columns the fingerprints may be sorted by
+SORT_BY = ('total', 'p95', 'mean', 'count')
+
+#: the replacements making a fingerprint of SQL, in order
+NORMALIZE = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r'\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))*'), '(...)'),
+)
+
+#: the frames of these files are not the places of the code making the queries
+SKIPPED_FILES = (os.path.join('interview_quiz', 'db', ''), os.path.join('interview_quiz', 'timing.py'),
+                 'site-packages')
+
+_lock = threading.Lock()
+_stats = {}
+_samples = deque(maxlen=MAX_SAMPLES)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """Returns the fingerprint of the SQL of a query."""
+    for pattern, replacement in NORMALIZE:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def code_location():
+    """Returns the place of the code of the site that has made the query: the path, the line and the function."""
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base) and not any(skipped in filename for skipped in SKIPPED_FILES):
+            return f'{os.path.relpath(filename, base)}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+def record(sql, duration, view):
+    """Adds a query to the statistics of the process.
+
+    Args:
+
+        * sql (`str`): the SQL of the query;
+        * duration (`float`): its time, seconds;
+        * view (`str`): the view of the request that has made it.
+    """
+    key = fingerprint(sql)
+    location = code_location()
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            if len(_stats) >= MAX_FINGERPRINTS:
+                return
+            entry = _stats[key] = {'count': 0, 'total': 0.0, 'buckets': [0] * (len(BOUNDS) + 1),
+                                   'views': Counter(), 'locations': Counter()}
+        entry['count'] += 1
+        entry['total'] += duration
+        entry['buckets'][bisect_left(BOUNDS, duration)] += 1
+        for name, origin in (('views', view or 'unknown'), ('locations', location)):
+            if origin in entry[name] or len(entry[name]) < MAX_ORIGINS:
+                entry[name][origin] += 1
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            _samples.append({'fingerprint': key, 'duration': duration, 'view': view, 'location': location,
+                             'time': time.time()})
+
+
+def snapshot():
+    """Returns the statistics of the process as data that can be written to JSON."""
+    with _lock:
+        return {
+            'stats': {key: {'count': entry['count'], 'total': entry['total'], 'buckets': list(entry['buckets']),
+                            'views': dict(entry['views']), 'locations': dict(entry['locations'])}
+                      for key, entry in _stats.items()},
+            'samples': list(_samples),
+        }
+
+
+def clear():
+    """Forgets the statistics of the process."""
+    with _lock:
+        _stats.clear()
+        _samples.clear()
+
+
+def flush(directory, pid):
+    """Writes the statistics of the process to its file in the directory of the metrics."""
+    path = os.path.join(directory, 'queries', f'{pid}.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+        json.dump(snapshot(), file)
+    os.replace(f'{path}.tmp', path)
+
+
+FLUSH_HOOKS.append(flush)
+
+
+def load(directory=None):
+    """Returns the statistics of all workers written to the directory of the metrics,
+    or of the current process when there is no directory."""
+    if not directory:
+        return [snapshot()]
+    snapshots = []
+    queries = os.path.join(directory, 'queries')
+    for name in os.listdir(queries) if os.path.isdir(queries) else []:
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(queries, name), encoding='utf-8') as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):  # the file of a worker being replaced
+            continue
+    return snapshots
+
+
+def upper_bound(buckets, share):
+    """Returns the upper bound of the range of time that the share (0..1) of the queries fits in,
+    the unbounded range is reported as twice the largest bound."""
+    needed, seen = share * sum(buckets), 0
+    for bound, count in zip(BOUNDS + (BOUNDS[-1] * 2,), buckets):
+        seen += count
+        if seen >= needed:
+            return bound
+    return BOUNDS[-1] * 2
+
+
+def report(snapshots, sort='total', top=20, samples=20):
+    """Sums the statistics of the workers.
+
+    Args:
+
+        * snapshots (`list`): the statistics of the workers (see ``snapshot``);
+        * sort (`str`, optional): the column of the order of the fingerprints: total, p95, mean or count;
+        * top (`int`, optional): the number of the fingerprints;
+        * samples (`int`, optional): the number of the slowest samples.
+
+    Returns:
+
+        * tuple: the rows of the fingerprints and the slowest samples, the times in milliseconds.
+    """
+    merged = {}
+    for data in snapshots:
+        for key, entry in data['stats'].items():
+            row = merged.setdefault(key, {'fingerprint': key, 'count': 0, 'total': 0.0,
+                                          'buckets': [0] * (len(BOUNDS) + 1), 'views': Counter(),
+                                          'locations': Counter()})
+            row['count'] += entry['count']
+            row['total'] += entry['total']
+            row['buckets'] = [total + count for total, count in zip(row['buckets'], entry['buckets'])]
+            row['views'].update(entry['views'])
+            row['locations'].update(entry['locations'])
+    rows = []
+    for row in merged.values():
+        row.update(total=row['total'] * 1000, mean=row['total'] * 1000 / row['count'],
+                   p95=upper_bound(row.pop('buckets'), 0.95) * 1000,
+                   view=row.pop('views').most_common(1)[0][0], location=row.pop('locations').most_common(1)[0][0])
+        rows.append(row)
+    rows.sort(key=lambda row: row[sort], reverse=True)
+    slowest = sorted((sample for data in snapshots for sample in data['samples']),
+                     key=lambda sample: sample['duration'], reverse=True)[:samples]
+    for sample in slowest:
+        sample['duration'] *= 1000
+    return rows[:top], slowest
@@ -0,0 +1,104 @@
+"""
+Contains the database router sending reads to the read replicas of the primary database.
+
+Reads go to a replica (one of ``settings.DATABASE_REPLICAS``, chosen randomly) only during
+GET and HEAD requests (see ``ReplicaMiddleware``); everything else - writes, requests with other
+methods, management commands - uses the primary. A replica lags behind the primary, so the reads
+of a request are pinned to the primary:
+
+    * after the request has written something (a read-modify-write must not see stale data);
+    * during ``settings.REPLICA_PIN_SECONDS`` after a request of the same client has written
+      something: the response of such a request sets a cookie living for that time, so the user
+      sees their own changes (a score after an answer, an edited profile);
+    * in the views decorated with ``primary_only``, an explicit hint for the views showing
+      the data just changed (the admin panel);
+    * when the request fills a cache keyed by the versions of the content, or builds an ETag from
+      versions changed less than ``settings.REPLICA_PIN_SECONDS`` ago (see ``use_primary``): otherwise
+      the rows of a lagging replica would be stored and validated under the new version.
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+#: the name of the cookie pinning the reads of the client to the primary
+PIN_COOKIE = 'db_primary'
+
+#: the routing of the current request, None outside requests
+routing = ContextVar('routing', default=None)
+
+
+class Routing:
+    """The routing state of a request: the object is shared with the contexts copied from the request
+    context (sync_to_async), so a write in any of them pins the rest of the request to the primary.
+
+    Args:
+
+        * use_replicas (`bool`): whether the reads of the request may go to the replicas.
+    """
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.written = False
+
+
+def use_primary():
+    """Sends the rest of the reads of the current request to the primary, including the reads
+    of the response rendered after the view has returned."""
+    state = routing.get()
+    if state is not None:
+        state.use_replicas = False
+
+
+def primary_only(view):
+    """Decorator of a view sending all reads of its request to the primary."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        use_primary()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Routes reads to the replicas when the request allows it, and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        if state is None or not state.use_replicas or state.written or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = routing.get()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # all databases of the site are the primary and copies of it
+        if obj1._state.db in settings.DATABASES and obj2._state.db in settings.DATABASES:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """Sets up the routing of the request and pins the next reads of the client to the primary
+    after a write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        use_replicas = request.method in ('GET', 'HEAD') and PIN_COOKIE not in request.COOKIES
+        state = Routing(use_replicas)
+        token = routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing.reset(token)
+        if state.written and settings.DATABASE_REPLICAS:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                                samesite='Lax')
+        return response
@@ -0,0 +1,25 @@
+"""Contains helpers for processing the images attached to the objects of the project."""
+
+from PIL import Image
+
+
+def shrink_image(path, output_size):
+    """Reduces the image stored at the specified path to the specified size
+    if at least one of its sides is larger. Smaller images are left untouched.
+
+    Args:
+
+        * path (`str`): the path to the image file on disk;
+        * output_size (`tuple`): the maximum width and height of the image.
+
+    Returns:
+
+        * bool: True if the image has been reduced and rewritten.
+    """
+    width, height = output_size
+    with Image.open(path) as img:
+        if img.height > height or img.width > width:
+            img.thumbnail(output_size)
+            img.save(path)
+            return True
+    return False
@@ -0,0 +1,26 @@
+"""
+Contains the lazy loading of views whose modules are expensive to import.
+"""
+from django.utils.module_loading import import_string
+
+
+def lazy_view(path):
+    """Returns a view that imports the real view by its dotted path on the first request.
+
+    Args:
+
+        * path (`str`): the dotted path of a view function, for example 'interview_quiz.api_views.graphql'.
+
+    Returns:
+
+        * function: the view.
+    """
+    loaded = []
+
+    def view(request, *args, **kwargs):
+        if not loaded:
+            loaded.append(import_string(path))
+        return loaded[0](request, *args, **kwargs)
+
+    view.lazy_path = path
+    return view
@@ -0,0 +1,21 @@
+"""
+Contains the email backend of the site counting the emails in the metrics (see metrics.py).
+"""
+from django.core.mail.backends.smtp import EmailBackend as SmtpEmailBackend
+
+from interview_quiz.metrics import EMAILS
+
+
+class EmailBackend(SmtpEmailBackend):
+    """The SMTP backend counting the emails handed to it, sent and failed."""
+
+    def send_messages(self, email_messages):
+        EMAILS.inc(len(email_messages), state='queued')
+        try:
+            sent = super().send_messages(email_messages)
+        except Exception:
+            EMAILS.inc(len(email_messages), state='failed')
+            raise
+        EMAILS.inc(sent, state='sent')
+        EMAILS.inc(len(email_messages) - sent, state='failed')
+        return sent
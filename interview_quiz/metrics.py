@@ -0,0 +1,341 @@
+"""
+Contains the metrics of the site exposed to Prometheus by the ``/metrics`` view.
+
+The metrics are counters, gauges and histograms with labels. Their values are kept per thread:
+a thread changes only its own dict, so requests never wait for each other, and the values of
+the threads are summed when the metrics are collected. Only the first change made by a thread
+takes a lock, to register the dict of the thread. When a thread finishes (runserver starts one
+per request, executors stop idle ones), its values are added to the dict of the finished threads
+and its own dict is dropped, so the number of dicts stays bounded by the number of live threads.
+
+Under gunicorn every worker is a separate process. With ``settings.METRICS_DIR`` set
+(gunicorn.conf.py sets it) a thread of every worker writes the values of the process to its own
+file in the directory every ``settings.METRICS_FLUSH_SECONDS``; the worker answering
+the scrape sums the files of all workers. The files of stopped workers keep their counters
+and histograms, so the totals do not go back when a worker is restarted, but their gauges
+are dropped (see ``mark_process_dead``). The directory is emptied when gunicorn starts.
+
+The saturation of the workers is the share of their busy threads::
+
+    sum(http_requests_in_flight) / sum(gunicorn_worker_threads)
+"""
+import hmac
+import ipaddress
+import json
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+#: the metrics of the site in the order of registration
+REGISTRY = []
+
+#: the upper bounds of the buckets of the latency histograms, seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+#: the functions writing other statistics of the process next to its metrics, called with the directory and the pid
+FLUSH_HOOKS = []
+
+_local = threading.local()
+#: the values of the finished threads
+_finished = defaultdict(float)
+_shards = [_finished]
+# reentrant: a thread may finish, and its values be retired, while it holds the lock
+_shards_lock = threading.RLock()
+_flush_lock = threading.Lock()
+
+
+class ThreadMark:
+    """An object kept by a thread in its local storage, deleted when the thread finishes."""
+
+
+def shard():
+    """Returns the dict of the values changed by the current thread, registering it on the first call."""
+    values = getattr(_local, 'values', None)
+    if values is None:
+        values = _local.values = defaultdict(float)
+        _local.mark = ThreadMark()
+        with _shards_lock:
+            _shards.append(values)
+        weakref.finalize(_local.mark, retire, values).atexit = False
+    return values
+
+
+def retire(values):
+    """Adds the values of a finished thread to the values of the finished threads and drops its dict."""
+    with _shards_lock:
+        for key, value in values.items():
+            _finished[key] += value
+        _shards[:] = [item for item in _shards if item is not values]
+
+
+class Metric:
+    """A metric with labels.
+
+    Args:
+
+        * name (`str`): the name of the metric;
+        * documentation (`str`): the description shown by Prometheus;
+        * labels (`tuple`, optional): the names of the labels.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def key(self, labels, suffix=''):
+        """Returns the key of the value of the labels, the suffix tells the parts of a histogram apart."""
+        return self.name, tuple(str(labels[label]) for label in self.labels), suffix
+
+    def samples(self, values):
+        """Yields the lines of the metric in the text format of Prometheus from the collected values."""
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        for (name, label_values, _), value in sorted(values.items()):
+            if name == self.name:
+                yield f'{self.name}{format_labels(self.labels, label_values)} {format_value(value)}'
+
+
+class Counter(Metric):
+    """A value that only grows."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        shard()[self.key(labels)] += amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down, summed over the threads and the workers."""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        shard()[self.key(labels)] += amount
+
+    def dec(self, amount=1, **labels):
+        shard()[self.key(labels)] -= amount
+
+    def set(self, value, **labels):
+        """Sets the value of the process, dropping the changes made by the threads."""
+        key = self.key(labels)
+        values = shard()
+        with _shards_lock:
+            for thread_values in _shards:
+                thread_values.pop(key, None)
+        values[key] = value
+
+
+class Histogram(Metric):
+    """The distribution of observed values over buckets.
+
+    Args:
+
+        * buckets (`tuple`, optional): the upper bounds of the buckets.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        values = shard()
+        for bound in self.buckets:
+            if value <= bound:
+                values[self.key(labels, str(bound))] += 1
+                break
+        values[self.key(labels, '+Inf')] += 1
+        values[self.key(labels, 'sum')] += value
+
+    def samples(self, values):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.kind}'
+        series = defaultdict(dict)
+        for (name, label_values, suffix), value in values.items():
+            if name == self.name:
+                series[label_values][suffix] = value
+        for label_values, parts in sorted(series.items()):
+            cumulative = 0
+            for bound in self.buckets:
+                cumulative += parts.get(str(bound), 0)
+                yield f'{self.name}_bucket{format_labels(self.labels + ("le",), label_values + (str(bound),))} ' \
+                      f'{format_value(cumulative)}'
+            count = parts.get('+Inf', 0)
+            yield f'{self.name}_bucket{format_labels(self.labels + ("le",), label_values + ("+Inf",))} ' \
+                  f'{format_value(count)}'
+            yield f'{self.name}_sum{format_labels(self.labels, label_values)} {format_value(parts.get("sum", 0))}'
+            yield f'{self.name}_count{format_labels(self.labels, label_values)} {format_value(count)}'
+
+
+def format_labels(names, values):
+    """Returns the labels of a sample in the text format of Prometheus."""
+    if not names:
+        return ''
+    escaped = (value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def format_value(value):
+    """Returns a value of a sample, integers without the fraction."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'The time of the responses by the url name.',
+                            ('url_name', 'method'))
+REQUESTS = Counter('http_requests_total', 'The responses by the url name and the status.',
+                   ('url_name', 'method', 'status'))
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'The requests being processed.')
+WORKER_THREADS = Gauge('gunicorn_worker_threads', 'The threads of the gunicorn workers processing requests.')
+DB_QUERIES = Counter('db_queries_total', 'The database queries of the requests.')
+DB_TIME = Counter('db_query_seconds_total', 'The time of the database queries of the requests.')
+CACHE_READS = Counter('cache_reads_total', 'The reads of the cache by the requests.', ('result',))
+CACHE_TIME = Counter('cache_seconds_total', 'The time of the cache operations of the requests.')
+TEMPLATE_TIME = Counter('template_render_seconds_total', 'The time of rendering the templates of the requests.')
+QUIZ_STARTS = Counter('quiz_starts_total', 'The started tests by the category and the level.', ('category', 'level'))
+QUIZ_ANSWERS = Counter('quiz_answers_total', 'The answers to the questions by the level and the result.',
+                       ('level', 'result'))
+REGISTRATIONS = Counter('registrations_total', 'The registered users by the way of registration.', ('method',))
+EMAILS = Counter('emails_total', 'The emails queued for sending, sent and failed.', ('state',))
+
+
+def observe_request(request, response, state, total):
+    """Counts the request measured by the timing middleware (see timing.py).
+
+    Args:
+
+        * request (`HttpRequest`): the request;
+        * response (`HttpResponse`): its response;
+        * state (`Timings`): the measurements of the request;
+        * total (`float`): the time of the request, seconds.
+    """
+    match = request.resolver_match
+    url_name = (match.view_name if match else None) or 'not_found'
+    REQUEST_LATENCY.observe(total, url_name=url_name, method=request.method)
+    REQUESTS.inc(url_name=url_name, method=request.method, status=response.status_code)
+    values = shard()
+    values[DB_QUERIES.key({})] += state.db_queries
+    values[DB_TIME.key({})] += state.db_time
+    values[CACHE_READS.key({'result': 'hit'})] += state.cache_hits
+    values[CACHE_READS.key({'result': 'miss'})] += state.cache_misses
+    values[CACHE_TIME.key({})] += state.cache_time
+    values[TEMPLATE_TIME.key({})] += state.template_time
+
+
+def collect_process():
+    """Returns the values of the current process summed over its threads."""
+    values = defaultdict(float)
+    # under the lock, so the values of a finishing thread are never counted twice or missed
+    with _shards_lock:
+        for thread_values in _shards:
+            for key, value in list(thread_values.items()):
+                values[key] += value
+    return values
+
+
+def process_file(pid, directory=None):
+    """Returns the path of the file of the values of the worker in the directory, by default the one of the settings."""
+    return os.path.join(directory or settings.METRICS_DIR, f'{pid}.json')
+
+
+def write_values(path, values):
+    """Writes the values to the file atomically, so a scrape never reads a half-written file."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump([[name, list(labels), suffix, value] for (name, labels, suffix), value in values.items()], file)
+    os.replace(temporary, path)
+
+
+def read_values(path):
+    """Returns the values written to the file."""
+    with open(path, encoding='utf-8') as file:
+        return {(name, tuple(labels), suffix): value for name, labels, suffix, value in json.load(file)}
+
+
+def flush():
+    """Writes the values of the current process to its file, unless another thread is already writing them."""
+    if not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        write_values(process_file(os.getpid()), collect_process())
+        for hook in FLUSH_HOOKS:
+            hook(settings.METRICS_DIR, os.getpid())
+    finally:
+        _flush_lock.release()
+
+
+def start_flushing():
+    """Starts the thread writing the values of the process to its file in the multiprocess mode."""
+    if not settings.METRICS_DIR or getattr(start_flushing, 'started', False):
+        return
+    start_flushing.started = True
+
+    def run():
+        while True:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            flush()
+
+    threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+
+
+def mark_process_dead(pid, directory):
+    """Drops the gauges of a stopped worker from its file, keeping its counters and histograms.
+    It is called by the master process of gunicorn, which has no Django settings, so the directory is passed."""
+    path = process_file(pid, directory)
+    if not os.path.exists(path):
+        return
+    gauges = {metric.name for metric in REGISTRY if metric.kind == 'gauge'}
+    write_values(path, {key: value for key, value in read_values(path).items() if key[0] not in gauges})
+
+
+def collect():
+    """Returns the values of all workers in the multiprocess mode, otherwise of the current process."""
+    if not settings.METRICS_DIR:
+        return collect_process()
+    flush()
+    values = defaultdict(float)
+    for name in os.listdir(settings.METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            for key, value in read_values(os.path.join(settings.METRICS_DIR, name)).items():
+                values[key] += value
+        except (OSError, ValueError):  # the file of a worker being replaced
+            continue
+    return values
+
+
+def exposition():
+    """Returns the metrics in the text format of Prometheus."""
+    values = collect()
+    lines = [line for metric in REGISTRY for line in metric.samples(values)]
+    return '\n'.join(lines) + '\n'
+
+
+def allowed(request):
+    """Checks that the request may read the metrics: it has the token of ``settings.METRICS_TOKEN``,
+    or it has come directly (not through nginx) from an address of ``settings.METRICS_ALLOWED_IPS``."""
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme == 'Bearer' and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    if 'HTTP_X_FORWARDED_FOR' in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_IPS)
+
+
+def metrics(request):
+    """Returns the metrics for Prometheus."""
+    if not allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
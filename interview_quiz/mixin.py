@@ -1,14 +1,27 @@
 from django.contrib.auth.decorators import user_passes_test
+from django.db import models
 from django.utils.decorators import method_decorator
 from django.views.generic.base import View, ContextMixin
 
+from interview_quiz.conditional import make_validators, not_modified, set_validators
+from interview_quiz.db.router import primary_only
+
 
 class UserDispatchMixin(View):
+    # the admin panel shows the data just changed by the administrators, so it never reads from the replicas
+    @method_decorator(primary_only)
     @method_decorator(user_passes_test(lambda u: u.is_superuser))
     def dispatch(self, request, *args, **kwargs):
         return super().dispatch(request, *args, **kwargs)
 
 
+class StaffDispatchMixin(View):
+    # the pages for the whole staff, not only the administrators, such as the statistics of the site
+    @method_decorator(user_passes_test(lambda u: u.is_staff))
+    def dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+
 class TitleMixin(ContextMixin):
     title = ''
 
@@ -22,3 +35,102 @@ class AuthorizedOnlyDispatchMixin(View):
     @method_decorator(user_passes_test(lambda u: u.is_authenticated))
     def dispatch(self, request, *args, **kwargs):
         return super().dispatch(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(View):
+    """View mixin answering GET and HEAD requests of unchanged pages with 304.
+
+    The page is considered unchanged while the versions of its models (and of its object)
+    are the same; the path, the user and the staff status of the user are also a part
+    of the ETag, because the pages differ for anonymous users, users and staff.
+
+    Attributes:
+
+        * version_models (`tuple`): the models whose changes change the page;
+        * version_object_model (`Model`): the model of the object of the page taken by
+          its 'pk' from the url, None if the page has no object.
+    """
+    version_models = ()
+    version_object_model = None
+
+    def get_version_dependencies(self):
+        """Returns the pairs (model, pk) the page depends on."""
+        dependencies = [(model, None) for model in self.version_models]
+        if self.version_object_model is not None:
+            dependencies.append((self.version_object_model, self.kwargs.get('pk')))
+        return dependencies
+
+    def get_validator_parts(self):
+        """Returns the other values the page depends on."""
+        user = self.request.user
+        return [self.request.get_full_path(), user.pk, user.is_staff]
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = make_validators(self.get_version_dependencies(), *self.get_validator_parts())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = set_validators(super().dispatch(request, *args, **kwargs), etag, last_modified)
+        return response
+
+
+class DirtyFieldsMixin:
+    """Model mixin that remembers the values of the fields loaded from the database.
+
+    Saving an existing object without ``update_fields`` writes only the fields changed since
+    it was loaded (or last saved); if nothing has changed, no query is made at all and
+    the save signals are not sent. New objects are saved completely.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self.remember_loaded_values(fields)
+
+    def tracked_value(self, field):
+        """Returns the value of the field used to detect its changes.
+        A file is compared by its name, a newly assigned (not yet stored) file is always a change."""
+        value = getattr(self, field.attname)
+        if isinstance(field, models.FileField):
+            return value.name or '', getattr(value, '_committed', True)
+        return value
+
+    def remember_loaded_values(self, fields=None):
+        """Remembers the current values of the fields (of all loaded ones by default) as saved ones."""
+        if fields is None:
+            deferred = self.get_deferred_fields()
+            self._loaded_values = {field.name: self.tracked_value(field) for field in self._meta.concrete_fields
+                                   if not field.primary_key and field.attname not in deferred}
+        elif hasattr(self, '_loaded_values'):
+            for name in fields:
+                field = self._meta.get_field(name)
+                self._loaded_values[field.name] = self.tracked_value(field)
+
+    def get_dirty_fields(self):
+        """Returns the names of the fields changed since loading,
+        or None if the object is new or its loaded values are unknown."""
+        if self._state.adding or not hasattr(self, '_loaded_values'):
+            return None
+        return [name for name, value in self._loaded_values.items()
+                if self.tracked_value(self._meta.get_field(name)) != value]
+
+    def get_fields_to_save(self, update_fields=None, force_insert=False, **kwargs):
+        """Returns the names of the fields that will be written by the save:
+        the explicitly passed ones, the changed ones, or None for all fields.
+        Accepts the keyword arguments of ``save()``."""
+        if update_fields is not None:
+            return [self._meta.get_field(name).name for name in update_fields]
+        if force_insert:
+            return None
+        return self.get_dirty_fields()
+
+    def save(self, **kwargs):
+        kwargs['update_fields'] = self.get_fields_to_save(**kwargs)
+        super().save(**kwargs)
+        self.remember_loaded_values(kwargs['update_fields'])
@@ -1,4 +1,6 @@
 import os
+import sys
+from importlib.util import find_spec
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -12,12 +14,14 @@ SECRET_KEY = str(os.getenv('SECRET_KEY'))
 
 DEBUG = os.getenv('DEBUG')
 
+# the process runs the tests (python manage.py test), in either profile
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS').split(' ')
 
 # Application definition
 
 INSTALLED_APPS = [
-    'graphene_django',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -31,7 +35,6 @@ INSTALLED_APPS = [
     'posts',
     'social_django',
     'django_cleanup.apps.CleanupConfig',
-    'debug_toolbar',
     'analytical',
     'rest_framework',
     'django_filters',
@@ -41,7 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'interview_quiz.timing.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'interview_quiz.db.router.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,15 +54,24 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# the development tools are not imported by production workers; graphene_django is needed
+# in production only by the GraphQL view, which is imported on its first request (see urls.py),
+# so the application is installed only for its management commands, and its templates
+# and static files are found by the path of the package, without importing it
+GRAPHENE_DJANGO_DIR = Path(find_spec('graphene_django').origin).parent
+
+if DEBUG:
+    INSTALLED_APPS += ['graphene_django', 'debug_toolbar']
+    MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
 ROOT_URLCONF = 'interview_quiz.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'templates'],
+        'DIRS': [BASE_DIR / 'templates', GRAPHENE_DJANGO_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -86,8 +100,9 @@ if DEBUG:
             'OPTIONS': {
                 'timeout': 20,
             }
-        }
+        },
     }
+    DATABASE_REPLICAS = []
 else:
     DATABASES = {
         'default': {
@@ -100,8 +115,43 @@ else:
             'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'password'),
             'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
             'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # persistent connections, reused by the requests of a thread for DB_CONN_MAX_AGE seconds
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            # a connection left from a previous request is checked before its first use
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_HEALTH_CHECKS', '1') != '0',
+            # the in-process pool: at most DB_POOL_SIZE connections per worker process (0 - no pool)
+            'POOL_SIZE': int(os.environ.get('DB_POOL_SIZE', 0)),
+            'POOL_TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
         }
     }
+    if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        # the postgresql backend with the health checks and the pool, see interview_quiz/db
+        DATABASES['default']['ENGINE'] = 'interview_quiz.db'
+    if DATABASES['default']['POOL_SIZE']:
+        # connections are returned to the pool at the end of every request
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    if os.environ.get('DB_PGBOUNCER') == '1':
+        # pgbouncer in the transaction pooling mode: a connection to Postgres is shared between
+        # transactions, so the cursors cannot outlive them
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    # read replicas of the primary: a space-separated list of their hosts
+    DATABASE_REPLICAS = []
+    for number, host in enumerate(os.environ.get('DB_REPLICA_HOSTS', '').split(), start=1):
+        DATABASES[f'replica_{number}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+        DATABASE_REPLICAS.append(f'replica_{number}')
+
+if TESTING:
+    # a stand-in for a read replica, used only by the tests of the router;
+    # it is not a mirror, so the data of a response shows which database has served it
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+    }
+
+# reads of GET and HEAD requests go to the replicas, see interview_quiz/db/router.py
+DATABASE_ROUTERS = ['interview_quiz.db.router.ReplicaRouter']
+# the time the reads of a client are pinned to the primary after its write: longer than the replication lag
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 10))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,16 +180,26 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
-if DEBUG:
-    STATICFILES_DIRS = (BASE_DIR / 'static',)
-else:
-    # STATIC_ROOT = BASE_DIR / 'static'
-    STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+STATICFILES_DIRS = (BASE_DIR / 'static', GRAPHENE_DJANGO_DIR / 'static')
+# the files collected by collectstatic and served by nginx
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# the generated documents of the OpenAPI schema, see interview_quiz/api_views.py
+OPENAPI_SCHEMA_DIR = STATIC_ROOT / 'openapi'
+
+if not DEBUG and not TESTING:
+    # content-hashed names and precompressed copies, see interview_quiz/storage.py;
+    # the tests run without collected static files, so their names are not hashed
+    STATICFILES_STORAGE = 'interview_quiz.storage.CompressedManifestStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# the limits of the sizes of the files uploaded for the import of questions and posts, bytes
+IMPORT_MAX_FILE_SIZE = int(os.getenv('IMPORT_MAX_FILE_SIZE', 20 * 1024 * 1024))
+IMPORT_MAX_ARCHIVE_SIZE = int(os.getenv('IMPORT_MAX_ARCHIVE_SIZE', 100 * 1024 * 1024))
+
 AUTH_USER_MODEL = 'users.MyUser'
 LOGIN_URL = '/users/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -184,12 +244,35 @@ CACHE_MIDDLEWARE_KEY_PREFIX = 'interview_quiz'
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
-        'LOCATION': '127.0.0.1:11211',
+        # the stand-in of the load tests of the user journeys listens on another port (see myadmin/journeys)
+        'LOCATION': os.getenv('MEMCACHED_LOCATION', '127.0.0.1:11211'),
+        # an unavailable memcached must not break the site: operations just miss
+        'OPTIONS': {'ignore_exc': True},
     }
 }
 
 LOW_CACHE = True
 
+# a part of the ETags of pages and api responses: a new release with changed templates
+# or serializers must not be answered with 304 for the data of the previous one
+RELEASE = os.getenv('RELEASE', '')
+
+# the share of the requests whose measurements are written to timing.log (see interview_quiz/timing.py)
+TIMING_SAMPLE_RATE = float(os.getenv('TIMING_SAMPLE_RATE', '0.01'))
+
+# the metrics for Prometheus (see interview_quiz/metrics.py): the directory of the files of the gunicorn
+# workers (gunicorn.conf.py sets it), the bearer token of the scrapes and the networks scraping without it
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '5'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
+# the statistics of the queries of the requests by their fingerprints and the time of the queries
+# kept as slow samples (see interview_quiz/db/queries.py); off by default, as every query of every
+# request is fingerprinted, turned on while the queries of the site are being investigated
+QUERY_STATS = os.getenv('QUERY_STATS', '0') == '1'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+
 # DOMAIN_NAME = 'http://127.0.0.1:8000'
 DOMAIN_NAME = 'https://int-quiz.online'
 
@@ -203,7 +286,9 @@ EMAIL_USE_TLS = False
 
 SERVER_EMAIL = EMAIL_HOST_USER
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# the SMTP backend counting the emails in the metrics; the local server of the load tests
+# does not send the emails of its registrations
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'interview_quiz.mail.EmailBackend')
 EMAIL_FILE_PATH = 'tmp/emails'
 
 ADMIN_USERNAME = os.getenv('ADMIN_USERNAME')
@@ -218,7 +303,10 @@ LOGGING = {
         'file': {
             'format': '%(asctime)s %(name)-12s %(levelname)-8s %(message)s'
         },
-        "rich": {"datefmt": "[%X]"}
+        "rich": {"datefmt": "[%X]"},
+        'record': {
+            'format': '%(message)s'
+        }
     },
     'handlers': {
         # 'console': {
@@ -230,6 +318,12 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'formatter': 'file',
             'filename': 'debug.log'
+        },
+        'timing': {
+            'level': 'INFO',
+            'class': 'logging.FileHandler',
+            'formatter': 'record',
+            'filename': 'timing.log'
         }
     },
     'loggers': {
@@ -259,6 +353,12 @@ LOGGING = {
             'handlers': ['file'],
             # 'propagate': True
         },
+        # the measurements of the sampled requests, one JSON per line (see the slow_views command)
+        'interview_quiz.timing': {
+            'level': 'INFO',
+            'handlers': ['timing'],
+            'propagate': False
+        },
     }
 }
 
@@ -0,0 +1,83 @@
+"""
+Contains the storage of the static files of the production build.
+
+``collectstatic`` with this storage copies the files with the hash of their content in
+the names (``css/admin.css`` -> ``css/admin.1a2b3c4d5e6f.css``), so nginx can serve them
+with caching for a year: a changed file gets a new name, and the templates refer to it
+through the manifest. Next to every compressible hashed file it writes precompressed
+``.gz`` and ``.br`` copies served by nginx with ``gzip_static``/``brotli_static``,
+so the files are not compressed again on every request.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # the .br copies are optional, nginx falls back to the .gz ones
+    brotli = None
+
+#: the extensions of the files worth compressing (images and fonts like woff2 are compressed already)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html',
+                           '.ttf', '.otf', '.eot', '.ico')
+
+#: files smaller than this size (in bytes) are not compressed
+COMPRESS_MIN_SIZE = 1024
+
+
+def compress_gzip(data):
+    """Returns the data compressed with gzip, without the time in the header so builds are repeatable."""
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data):
+    """Returns the data compressed with brotli."""
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes precompressed copies of the hashed files."""
+
+    def get_compressors(self):
+        """Returns pairs (suffix, function) of the available compressions."""
+        compressors = [('.gz', compress_gzip)]
+        if brotli is not None:
+            compressors.append(('.br', compress_brotli))
+        return compressors
+
+    def compress(self, name):
+        """Writes the compressed copies of the file, if the file is compressible and they are smaller.
+
+        Args:
+
+            * name (`str`): the name of the file in the storage.
+
+        Returns:
+
+            * list: the names of the written copies.
+        """
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return []
+        with self.open(name) as file:
+            data = file.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return []
+        written = []
+        for suffix, compressor in self.get_compressors():
+            compressed = compressor(data)
+            if len(compressed) < len(data):
+                with open(self.path(name + suffix), 'wb') as file:
+                    file.write(compressed)
+                written.append(name + suffix)
+        return written
+
+    def post_process(self, paths, dry_run=False, **options):
+        """Hashes the files as the parent storage does, then compresses the final hashed files."""
+        hashed_names = {}
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names[name] = hashed_name
+            yield name, hashed_name, processed
+        if not dry_run:
+            for hashed_name in hashed_names.values():
+                self.compress(hashed_name)
@@ -0,0 +1,201 @@
+"""
+Contains the measurement of the time spent by the requests in the database, the cache
+and the templates (see ``TimingMiddleware``).
+
+The measurements of a request are collected into a ``Timings`` object kept in a context variable,
+so code outside requests (management commands, workers' warmup) is not measured and pays only
+for the check of the variable. The queries are counted by the execute wrappers of the connections;
+the cache backends and Django templates have no hooks, so their methods are wrapped once,
+when the middleware is created (see ``install``).
+
+The staff sees the measurements of its requests in the ``Server-Timing`` header (the Network tab
+of the browser developer tools). A sample of the requests (``settings.TIMING_SAMPLE_RATE``)
+is written to the ``interview_quiz.timing`` logger as JSON lines, which the slow_views command
+summarises. The measurements of all requests are added to the metrics (see metrics.py).
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.base import Template
+from django.utils.functional import empty
+
+from interview_quiz.db import queries
+from interview_quiz.metrics import REQUESTS_IN_FLIGHT, observe_request, start_flushing
+
+logger = logging.getLogger(__name__)
+
+#: the measurements of the current request, None outside requests
+timings = ContextVar('timings', default=None)
+
+#: the methods of the cache backends reading the cache, the other wrapped methods write to it
+CACHE_READS = ('get', 'get_many')
+CACHE_WRITES = ('set', 'add', 'set_many', 'delete', 'delete_many', 'incr', 'decr', 'touch')
+
+#: the default passed to the ``get`` of the cache to tell a miss from a cached value
+MISSING = object()
+
+
+class Timings:
+    """The measurements of a request. The times are in seconds."""
+
+    def __init__(self):
+        self.view = None
+        self.db_queries = 0
+        self.db_time = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0
+        self.template_time = 0
+        # a cache call made inside another one (get_or_set) or a template rendered inside another one
+        # (include) is not counted twice; the cache calls of the templates are still counted
+        self.depth = {'cache': 0, 'template': 0}
+
+    def as_record(self, request, response, total):
+        """Returns the measurements as a dict for the log, with the times in milliseconds."""
+        return {
+            'view': self.view, 'method': request.method, 'path': request.path, 'status': response.status_code,
+            'total': round(total * 1000, 2), 'db_queries': self.db_queries, 'db': round(self.db_time * 1000, 2),
+            'cache_hits': self.cache_hits, 'cache_misses': self.cache_misses,
+            'cache': round(self.cache_time * 1000, 2), 'template': round(self.template_time * 1000, 2),
+        }
+
+    def as_header(self, total):
+        """Returns the value of the Server-Timing header."""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.1f};desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'template;dur={self.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def timed(method, kind):
+    """Wraps a method of a cache backend or of the template so that its calls made
+    by a request are timed and, for the reads of the cache, counted as hits and misses."""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        state = timings.get()
+        if state is None or state.depth[kind]:
+            return method(self, *args, **kwargs)
+        if method.__name__ == 'get':
+            # a value equal to the default is still a hit, so the default is replaced with a marker;
+            # the arguments of get(key, default=None, version=None) may be passed by position or by name
+            kwargs.update(zip(('key', 'default', 'version'), args))
+            args = args[3:]
+            default = kwargs.get('default')
+            kwargs['default'] = MISSING
+        state.depth[kind] += 1
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        finally:
+            state.depth[kind] -= 1
+            elapsed = time.perf_counter() - started
+            if kind == 'template':
+                state.template_time += elapsed
+            else:
+                state.cache_time += elapsed
+        if method.__name__ == 'get':
+            state.cache_hits += result is not MISSING
+            state.cache_misses += result is MISSING
+            return default if result is MISSING else result
+        if method.__name__ == 'get_many':
+            keys = args[0] if args else kwargs['keys']
+            state.cache_hits += len(result)
+            state.cache_misses += len(keys) - len(result)
+        return result
+    wrapper.timed = True
+    return wrapper
+
+
+def install():
+    """Wraps the methods of the configured cache backends and the rendering of Django templates, once."""
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed(Template.render, 'template')
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        for name in CACHE_READS + CACHE_WRITES:
+            method = getattr(backend, name)
+            if not getattr(method, 'timed', False):
+                setattr(backend, name, timed(method, 'cache'))
+
+
+def count_query(execute, sql, params, many, context):
+    """The execute wrapper of the connections counting the queries of the request and their time
+    and adding them to the statistics of the queries (see db/queries.py)."""
+    state = timings.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if state is not None:
+            elapsed = time.perf_counter() - started
+            state.db_queries += 1
+            state.db_time += elapsed
+            if settings.QUERY_STATS:
+                queries.record(sql, elapsed, state.view)
+
+
+def view_name(view_func, method):
+    """Returns the dotted path of the view: of the class of a class-based view (with the action
+    of the method for DRF viewsets), of the real view of a lazily loaded one (see lazy.py)."""
+    if hasattr(view_func, 'lazy_path'):
+        return view_func.lazy_path
+    view = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None) or view_func
+    name = f'{view.__module__}.{view.__qualname__}'
+    action = getattr(view_func, 'actions', {}).get(method.lower())
+    return f'{name}.{action}' if action else name
+
+
+def loaded_user(request):
+    """Returns the user of the request if the request has already loaded it, otherwise None:
+    loading it here would read the session and the user after the measured time of the request."""
+    user = getattr(request, 'user', None)
+    return None if getattr(user, '_wrapped', None) is empty else user
+
+
+class TimingMiddleware:
+    """Measures the requests: the view, the number and time of the database queries, the cache hits,
+    misses and time, the time of rendering templates and the total time. The measurements
+    are sent to the staff in the Server-Timing header, if the request has loaded its user,
+    and written to the log for a sample of requests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+        start_flushing()
+
+    def __call__(self, request):
+        state = Timings()
+        token = timings.set(state)
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(count_query))
+                response = self.get_response(request)
+        finally:
+            timings.reset(token)
+            REQUESTS_IN_FLIGHT.dec()
+        total = time.perf_counter() - started
+        observe_request(request, response, state, total)
+        user = loaded_user(request)
+        if settings.DEBUG or user is not None and user.is_staff:
+            response['Server-Timing'] = state.as_header(total)
+        if random.random() < settings.TIMING_SAMPLE_RATE:
+            logger.info(json.dumps(state.as_record(request, response, total)))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Remembers the name of the view of the request."""
+        timings.get().view = view_name(view_func, request.method)
@@ -3,27 +3,13 @@ from django.conf.urls import handler404
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include, re_path
-from graphene_django.views import GraphQLView
 from rest_framework import routers
-from rest_framework.permissions import AllowAny
 
 from api_rest.api import QuestionCategoryViewSet, QuestionViewSet, PostViewSet, UserViewSet
+from interview_quiz.lazy import lazy_view
+from interview_quiz.metrics import metrics
+from interview_quiz.warmup import readiness
 from questions.views import MainView, my_handler404
-from drf_yasg2.views import get_schema_view
-from drf_yasg2 import openapi
-
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Interview Quiz",
-      default_version='2.0',
-      description="Documentation to Interview Quiz, my pet project",
-      contact=openapi.Contact(email="inspiracion@yandex.ru"),
-      license=openapi.License(name="MIT License"),
-   ),
-   public=True,
-   permission_classes=(AllowAny,)
-)
 
 router = routers.DefaultRouter()
 router.register('categories', QuestionCategoryViewSet)
@@ -44,14 +30,17 @@ urlpatterns = [
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
     path('api/', include(router.urls)),
 
+    # graphene and drf_yasg2 are imported on the first request of these urls
     re_path(r'^swagger(?P<format>\.json|\.yaml)$',
-    schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0),
+    lazy_view('interview_quiz.api_views.schema_json'), name='schema-json'),
+    path('swagger/', lazy_view('interview_quiz.api_views.schema_swagger_ui'),
     name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0),
+    path('redoc/', lazy_view('interview_quiz.api_views.schema_redoc'),
     name='schema-redoc'),
 
-    path('graphql/', GraphQLView.as_view(graphiql=True)),
+    path('graphql/', lazy_view('interview_quiz.api_views.graphql')),
+    path('ready/', readiness, name='ready'),
+    path('metrics', metrics, name='metrics'),
 ]
 
 handler404 = 'questions.views.my_handler404'
@@ -0,0 +1,164 @@
+"""
+Contains version counters of the site content kept in the cache.
+
+Every content model (categories, questions, posts, users) has a version that is increased
+on each change of its objects. Cached data derived from the content includes the version
+in its key, so increasing the version invalidates all of it at once, without searching
+for and deleting individual cache keys.
+
+Single objects increase the version from the ``post_save``/``post_delete`` receivers of
+their models. Bulk queries (``update()``, ``bulk_create()``, ``bulk_update()``) do not
+send signals, so the code performing them calls ``bump_version`` itself, once per batch.
+
+Besides the version of the model, a saved object increases its own version, so data derived
+from one object (a page of a post) stays valid while other objects change. The objects changed
+by a bulk query are unknown, so ``bump_version`` without a primary key increases the common
+version of the bulk changes of the model, which is a part of the version of every object
+(see ``get_validators``). The time of the last change of the model is kept next to its version.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+from interview_quiz.db.router import use_primary
+
+
+#: the key of the version of the objects changed by bulk queries
+BULK = 'bulk'
+
+
+def version_key(model, pk=None):
+    """Returns the cache key of the version of the model, or of one of its objects if the pk is passed."""
+    key = f'version:{model._meta.label_lower}'
+    return key if pk is None else f'{key}:{pk}'
+
+
+def modified_key(model):
+    """Returns the cache key of the time of the last change of the model."""
+    return f'modified:{model._meta.label_lower}'
+
+
+def initial_version():
+    """Returns the starting value of a version - the current time in microseconds.
+    If the version is lost from the cache, the new value is still greater than any value
+    issued before, so stale data is never taken for fresh."""
+    return time.time_ns() // 1000
+
+
+def get_versions(keys):
+    """Returns the versions stored under the cache keys with one query, creating the missing ones.
+
+    Args:
+
+        * keys (`list`): cache keys of versions.
+
+    Returns:
+
+        * list: the versions in the order of the keys.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = initial_version()
+            cache.add(key, versions[key], timeout=None)
+    return [versions[key] for key in keys]
+
+
+def get_version(model, pk=None):
+    """Returns the current version of the model or of its object, creating it if necessary.
+
+    Args:
+
+        * model (`Model`): a content model class;
+        * pk (optional): the primary key of the object.
+
+    Returns:
+
+        * int: the current version.
+    """
+    return get_versions([version_key(model, pk)])[0]
+
+
+def get_validators(dependencies):
+    """Returns the versions of the data derived from the models and objects
+    and the time of their last change, reading the cache once.
+
+    Args:
+
+        * dependencies (`list`): pairs (model, pk), the pk is None for the whole model.
+
+    Returns:
+
+        * tuple: the list of versions and the time of the last change
+          (`datetime`, None if it is unknown).
+    """
+    keys = []
+    for model, pk in dependencies:
+        keys.extend([version_key(model)] if pk is None else [version_key(model, pk), version_key(model, BULK)])
+    modified_keys = [modified_key(model) for model, _ in dependencies]
+    modified = cache.get_many(modified_keys)
+    versions = get_versions(keys)
+    if not modified_keys or len(modified) < len(set(modified_keys)):
+        return versions, None
+    return versions, datetime.fromtimestamp(max(modified.values()), tz=timezone.utc)
+
+
+def increase(key):
+    """Increases the version stored under the cache key and returns the new value."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def bump_version(model, pk=None):
+    """Increases the version of the model, which invalidates all cached data derived from it.
+    With a primary key the version of the object is increased as well, without it -
+    the version of the bulk changes, which invalidates the data of every object of the model.
+
+    Args:
+
+        * model (`Model`): a content model class;
+        * pk (optional): the primary key of the changed object.
+
+    Returns:
+
+        * int: the new version of the model.
+    """
+    increase(version_key(model, BULK if pk is None else pk))
+    cache.set(modified_key(model), time.time(), timeout=None)
+    return increase(version_key(model))
+
+
+#: how long the data derived from the content is kept in the cache, seconds;
+#: the data of old versions is never read again and just expires
+CACHED_DATA_TIMEOUT = 24 * 60 * 60
+
+
+def get_cached(name, models, compute, timeout=CACHED_DATA_TIMEOUT):
+    """Returns the data derived from the models, computing it only if the cache has no data
+    for their current versions.
+
+    Args:
+
+        * name (`str`): the name of the data, unique with its parameters (for example 'pool:3:NB');
+        * models (`tuple`): the models the data is derived from;
+        * compute (`callable`): the function computing the data without arguments;
+        * timeout (`int`, optional): the lifetime of the cached data, seconds.
+
+    Returns:
+
+        * the cached or computed data.
+    """
+    versions = get_versions([version_key(model) for model in models])
+    key = f'{name}:' + ':'.join(map(str, versions))
+    data = cache.get(key)
+    if data is None:
+        # a lagging replica would store the rows preceding the change under the new version
+        use_primary()
+        data = compute()
+        cache.set(key, data, timeout)
+    return data
@@ -0,0 +1,154 @@
+"""
+Contains the warm-up of a worker process before it starts serving requests.
+
+Without it the first requests after a deploy pay for the construction of the url resolver,
+the compilation of templates, the building of the GraphQL and OpenAPI schemas,
+and find memcached empty. ``warm_up`` does all of it in advance; gunicorn runs it from
+the ``post_worker_init`` hook (see gunicorn.conf.py), so a worker accepts connections only
+after the warm-up, and the readiness view reports the process as ready only then.
+With WARM_UP=0 the workers are not warmed up and are ready at once.
+A broken template of the project fails the warm-up, so a broken release is not served.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.template import engines, TemplateDoesNotExist, TemplateSyntaxError
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+#: True when the warm-up of the process is complete
+ready = False
+
+
+class WarmUpError(Exception):
+    """An error of the project found by the warm-up: the process must not serve requests with it."""
+
+
+def enabled():
+    """Checks whether the workers are warmed up before serving requests (unless WARM_UP=0)."""
+    return os.getenv('WARM_UP', '1') != '0'
+
+
+def load_urls():
+    """Builds the url resolver with all included patterns and the api router."""
+    get_resolver()._populate()
+    reverse('index')
+
+
+def is_project_path(path):
+    """Checks whether the path belongs to the project, not to an installed third-party package."""
+    path = Path(path).resolve()
+    return settings.BASE_DIR in path.parents and 'site-packages' not in path.parts
+
+
+def load_templates():
+    """Compiles all templates of the project and of the applications into the cache of the template loader.
+    An error in a template of the project is raised as ``WarmUpError``.
+
+    Returns:
+
+        * int: the number of loaded templates.
+    """
+    loaded = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _, files in os.walk(directory):
+                for file in files:
+                    if not file.endswith(('.html', '.txt')):
+                        continue
+                    name = os.path.relpath(os.path.join(root, file), directory).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                        loaded += 1
+                    except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                        if is_project_path(directory):
+                            raise WarmUpError(f'Шаблон {name} не загружен: {exc}') from exc
+                        # templates of third-party applications may need libraries that are not installed
+                        logger.warning(f'Шаблон {name} не загружен при прогреве')
+    return loaded
+
+
+def build_graphql_schema():
+    """Builds the GraphQL schema and its introspection used by GraphiQL."""
+    from interview_quiz.schema import schema
+    schema.introspect()
+
+
+def load_openapi_schema():
+    """Loads the OpenAPI schema of the current version of the code, generating it if necessary."""
+    from interview_quiz.api_views import get_schema
+    get_schema('json')
+
+
+def prime_caches():
+    """Fills memcached with the content versions and the data of the most requested pages:
+    the categories, the leaderboard and the question pools of every category and level.
+
+    Returns:
+
+        * int: the number of primed question pools.
+    """
+    from questions.models import Question
+    from questions.views import get_available_categories, get_question_pool
+    from users.views import get_leaderboard
+
+    get_leaderboard()
+    pools = 0
+    for category in get_available_categories():
+        for level, _ in Question.DIFFICULTY_LEVEL_CHOICES:
+            get_question_pool(category.pk, level)
+            pools += 1
+    return pools
+
+
+#: the steps of the warm-up in the order of execution
+STEPS = (
+    ('urls', load_urls),
+    ('templates', load_templates),
+    ('graphql', build_graphql_schema),
+    ('openapi', load_openapi_schema),
+    ('caches', prime_caches),
+)
+
+
+def warm_up():
+    """Performs all steps of the warm-up and marks the process as ready.
+    A failed step is logged and does not prevent the process from serving requests, except an error
+    of the project (``WarmUpError``): it is raised and the process is not marked as ready,
+    so gunicorn stops the worker that has failed to boot.
+    The connections to the databases opened by the steps are closed: the requests are served
+    by other threads with their own connections, so these would only stay idle.
+
+    Returns:
+
+        * list: triples (step, seconds, result or the exception).
+    """
+    global ready
+    timings = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            result = step()
+        except WarmUpError:
+            logger.exception(f'Ошибка прогрева: {name}')
+            raise
+        except Exception as exc:
+            logger.exception(f'Ошибка прогрева: {name}')
+            result = exc
+        timings.append((name, time.perf_counter() - started, result))
+    connections.close_all()
+    ready = True
+    logger.info('Прогрев завершен: ' + ', '.join(f'{name} {seconds * 1000:.0f} мс' for name, seconds, _ in timings))
+    return timings
+
+
+def readiness(request):
+    """Returns 200 if the warm-up of the process is complete or disabled, otherwise 503."""
+    is_ready = ready or not enabled()
+    return JsonResponse({'ready': is_ready}, status=200 if is_ready else 503)
@@ -6,3 +6,7 @@ class MyadminConfig(AppConfig):
     """Myadmin app configuration, automatically created Django class."""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myadmin'
+
+    def ready(self):
+        """Connects the receivers that keep the dashboard statistics up to date."""
+        from myadmin import stats  # noqa: F401
@@ -0,0 +1,244 @@
+"""Contains the micro-benchmarks of the hot code paths of the site and the comparison of their results.
+
+Every benchmark measures one piece of code called in-process, without the network and the server:
+the choice of the questions of a test, the check of an answer, the rank of a user in the profile,
+the serialization of the categories by the REST api, the list of the questions of the GraphQL api,
+the search of posts and the saving of a post with an image. They run against the synthetic data
+(see synthetic.py), so the cost of the queries growing with the tables is visible.
+
+A benchmark calls its code ``number`` times per round for ``repeat`` rounds after a warm-up call
+and keeps the time per call of every round, milliseconds, and the number of database queries
+of one call. The results are written to JSON with the environment and the size of the data,
+and two results are compared by ``compare``: the time or the number of the queries
+that has grown is a regression.
+"""
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+from importlib import import_module
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import RequestFactory
+from django.urls import reverse
+
+from myadmin.synthetic import SYNTHETIC_DOMAIN, SYNTHETIC_MARK
+from posts.models import Post
+from posts.views import SearchPostView
+from questions.models import QuestionCategory, Question
+from questions.views import AnswerQuestion, QuestionView
+from users.models import MyUser
+from users.views import ProfileView
+
+#: the difficulty level of the tests of the benchmarks
+LEVEL = Question.NEWBIE
+
+#: the metrics of the time the results may be compared by
+METRICS = ('min', 'median', 'mean')
+
+#: a slower benchmark is a regression only when its time has grown by at least this many milliseconds,
+#: a smaller difference of a fast benchmark is mostly noise
+MIN_DIFFERENCE_MS = 0.1
+
+
+class Dataset:
+    """The objects of the synthetic data used by the benchmarks, chosen the same way for the same data:
+    the active user with the median score, the category with the most questions of the level,
+    its first question and the tag of the first post."""
+
+    def __init__(self):
+        users = MyUser.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}', is_active=True)
+        number = users.count()
+        if not number:
+            raise LookupError('there are no synthetic users')
+        self.user = users.order_by('score', 'username')[number // 2]
+        self.category = QuestionCategory.objects.filter(description__startswith=SYNTHETIC_MARK, available=True) \
+            .annotate(questions=Count('question', filter=Q(question__available=True,
+                                                           question__difficulty_level=LEVEL))) \
+            .order_by('-questions', 'pk').first()
+        self.question = Question.objects.filter(subject=self.category, available=True).order_by('pk').first()
+        self.tag = Post.objects.filter(available=True, author__email__endswith=f'@{SYNTHETIC_DOMAIN}') \
+            .order_by('pk').values_list('tag', flat=True).first()
+        if self.category is None or self.question is None or self.tag is None:
+            raise LookupError('there are no synthetic categories, questions or posts')
+        self.factory = RequestFactory()
+
+    def request(self, path, data=None, user=None):
+        """Returns a GET request of the user, by default of the chosen one, with an empty session."""
+        request = self.factory.get(path, data)
+        request.user = user or self.user
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        return request
+
+
+def question_set(data):
+    """The questions of a new test: ``QuestionView.get_question_set``."""
+    return lambda: QuestionView.get_question_set(data.category, LEVEL)
+
+
+def answer_question(data):
+    """The check of an answer of a test with the rendered page: ``AnswerQuestion.get``."""
+    view = AnswerQuestion.as_view()
+    path = reverse('questions:answers', args=[data.question.pk])
+
+    def run():
+        request = data.request(path, {'csrfmiddlewaretoken': '', 'answer': data.question.right_answer})
+        request.session.update({'dif': LEVEL, 'context': {'right_ans': 0, 'wrong_ans': 0}})
+        return view(request, item_id=data.question.pk)
+
+    return run
+
+
+def profile_rank(data):
+    """The profile page with the rank of the user by the score: ``ProfileView``."""
+    view = ProfileView.as_view()
+    path = reverse('users:profile')
+    return lambda: view(data.request(path)).render()
+
+
+def category_serializer(data):
+    """The list of the categories of the REST api with the numbers of their posts and questions:
+    ``QuestionCategorySerializer``."""
+    from api_rest.serializers import QuestionCategorySerializer
+
+    request = data.request('/api/categories/')
+    return lambda: QuestionCategorySerializer(QuestionCategory.objects.all(), many=True,
+                                              context={'request': request}).data
+
+
+def graphql_all_questions(data):
+    """The ``allQuestions`` query of the GraphQL api."""
+    from interview_quiz.schema import schema
+
+    def run():
+        result = schema.execute('{ allQuestions { id question tag difficultyLevel available } }')
+        if result.errors:
+            raise result.errors[0]
+        return result.data
+
+    return run
+
+
+def search_posts(data):
+    """The rendered page of the search of posts by a tag: ``SearchPostView``."""
+    view = SearchPostView.as_view()
+    path = reverse('posts:search_results_post')
+    return lambda: view(data.request(path, {'search_panel': data.tag}, AnonymousUser())).render()
+
+
+def post_save_image(data):
+    """The saving of a post with a new image, which is reduced: ``Post.save``.
+    Every call writes the uploaded image anew, under one of two names, so the image is always changed."""
+    from PIL import Image
+
+    upload = BytesIO()
+    Image.new('RGB', (1600, 1000), (52, 152, 219)).save(upload, 'PNG')
+    os.makedirs(os.path.join(settings.MEDIA_ROOT, 'post_images'), exist_ok=True)
+    post = Post.objects.create(title='benchmark', author=data.user, category=data.category, body='<div></div>',
+                               tag=data.tag)
+    names = ['post_images/benchmark_a.png', 'post_images/benchmark_b.png']
+
+    def run():
+        names.reverse()
+        with open(os.path.join(settings.MEDIA_ROOT, names[0]), 'wb') as file:
+            file.write(upload.getvalue())
+        post.image = names[0]
+        post.save()
+
+    return run
+
+
+#: the benchmarks by their names, in the order of the runs
+BENCHMARKS = {
+    'question_set': question_set,
+    'answer_question': answer_question,
+    'profile_rank': profile_rank,
+    'category_serializer': category_serializer,
+    'graphql_all_questions': graphql_all_questions,
+    'search_posts': search_posts,
+    'post_save_image': post_save_image,
+}
+
+
+def measure(function, repeat, number):
+    """Measures the calls of the function.
+
+    Args:
+
+        * function (`callable`): the measured code;
+        * repeat (`int`): the number of rounds;
+        * number (`int`): the number of calls per round.
+
+    Returns:
+
+        * dict: the minimal, median, mean and maximal time per call of the rounds and their standard
+          deviation, milliseconds, the numbers of the rounds and the calls and the queries of one call.
+    """
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    function()  # the warm-up: the caches, the lazy imports and the compiled templates
+    with connection.execute_wrapper(count):
+        function()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - started) * 1000 / number)
+    return {'min': min(times), 'median': statistics.median(times), 'mean': statistics.mean(times),
+            'max': max(times), 'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'rounds': repeat, 'number': number, 'queries': queries}
+
+
+def environment():
+    """Returns the environment of the results: the versions, the database, the cache and the size of the data."""
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'dataset': {'users': MyUser.objects.count(), 'categories': QuestionCategory.objects.count(),
+                    'questions': Question.objects.count(), 'posts': Post.objects.count()},
+    }
+
+
+def compare(results, baseline, threshold, metric='min'):
+    """Compares the results with the baseline.
+
+    Args:
+
+        * results (`dict`): the current results;
+        * baseline (`dict`): the results they are compared with;
+        * threshold (`float`): the allowed growth of the time, percent;
+        * metric (`str`, optional): the compared time: min, median or mean.
+
+    Returns:
+
+        * list: the rows of the benchmarks with the times (milliseconds), the change of the time (percent,
+          None for a new benchmark), the queries and whether the benchmark has regressed.
+    """
+    rows = []
+    for name, current in results['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        row = {'name': name, 'current': current[metric], 'queries': current['queries'],
+               'baseline': None, 'baseline_queries': None, 'change': None, 'regressed': False}
+        if base is not None:
+            difference = current[metric] - base[metric]
+            row.update(baseline=base[metric], baseline_queries=base['queries'],
+                       change=difference / base[metric] * 100 if base[metric] else 0.0)
+            row['regressed'] = (row['change'] > threshold and difference >= MIN_DIFFERENCE_MS
+                                or current['queries'] > base['queries'])
+        rows.append(row)
+    return rows
@@ -1,9 +1,13 @@
 """Contains forms used to create or modify user, category, question, or post objects in the admin panel.
 """
 
+import zipfile
+
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from django.template.defaultfilters import filesizeformat
 from django.utils.translation import gettext_lazy as _
 
 from posts.models import Post
@@ -150,3 +154,41 @@ class PostForm(ModelForm):
             else:
                 field.widget.attrs['class'] = 'form-control py-4'
         self.fields['image'].widget.attrs['id'] = 'post_image'
+
+
+class ImportForm(forms.Form):
+    """Form for bulk import of questions or posts from a CSV or JSONL file in the admin panel.
+    """
+    CONTENT_CHOICES = (
+        ('questions', 'Вопросы'),
+        ('posts', 'Статьи'),
+    )
+
+    content = forms.ChoiceField(choices=CONTENT_CHOICES)
+    file = forms.FileField(widget=forms.FileInput)
+    archive = forms.FileField(widget=forms.FileInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        """Manages the classes of form fields for their correct display on the page.
+        """
+        super().__init__(*args, **kwargs)
+        for field_name, field in self.fields.items():
+            field.widget.attrs['class'] = 'form-control'
+
+    @staticmethod
+    def check_size(uploaded, limit):
+        """Raises the error of the form if the uploaded file is larger than the limit (bytes)."""
+        if uploaded and uploaded.size > limit:
+            raise ValidationError(f'Размер файла не должен превышать {filesizeformat(limit)}')
+        return uploaded
+
+    def clean_file(self):
+        """Checks the size of the file with the rows."""
+        return self.check_size(self.cleaned_data['file'], settings.IMPORT_MAX_FILE_SIZE)
+
+    def clean_archive(self):
+        """Checks the size of the archive with the images and that it is a zip archive."""
+        archive = self.check_size(self.cleaned_data['archive'], settings.IMPORT_MAX_ARCHIVE_SIZE)
+        if archive and not zipfile.is_zipfile(archive):
+            raise ValidationError('Архив должен быть в формате zip')
+        return archive
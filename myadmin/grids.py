@@ -0,0 +1,208 @@
+"""Contains the server side of the data grids of the admin panel: sorting and filtering
+on any column and keyset pagination of users, categories, questions and posts.
+
+Unlike the paginated lists, a page of a grid is not located with OFFSET and the grid does
+not count its rows. The next page is requested with a cursor - the values of the sort column
+and of the primary key of the last row received - and is selected with a condition on them:
+
+    WHERE (column > value) OR (column = value AND id > last_id) ORDER BY column, id LIMIT n
+
+so the cost of a page does not depend on how deep it is. Rows are returned as compact
+lists of values in the order of the columns of the grid.
+"""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+from posts.models import Post
+from questions.models import Question, QuestionCategory
+from users.models import MyUser
+
+#: the number of rows of a page if the request does not specify it
+GRID_PAGE_SIZE = 100
+#: the maximum number of rows of a page
+GRID_MAX_PAGE_SIZE = 500
+
+
+class GridError(ValueError):
+    """An incorrect parameter of a grid request."""
+
+
+def encode_cursor(values):
+    """Packs the values of the sort column and of the primary key into an opaque cursor string."""
+    data = json.dumps(values, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Unpacks the cursor created by ``encode_cursor``."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise GridError('Некорректный курсор')
+    if not isinstance(values, list) or len(values) != 2:
+        raise GridError('Некорректный курсор')
+    return values
+
+
+class BaseGrid:
+    """Parent class of the grids of the admin panel.
+
+    Request parameters:
+
+        * sort: the column to sort by, '-column' for the descending order (by default the primary key);
+        * <column>: a filter by the column - a case-insensitive substring for text columns,
+          an exact value for the others;
+        * limit: the number of rows of the page;
+        * cursor: the cursor of the next page returned with the previous one.
+
+    Attributes:
+
+        * model (`Model`): the model of the rows;
+        * columns (`tuple`): the lookups of the columns, related fields are reached with '__'.
+    """
+    model = None
+    columns = ()
+
+    def get_field(self, column):
+        """Returns the model field of the column, following the relations of the lookup.
+        For a foreign key, the field of the related model it refers to is returned."""
+        if column == 'pk':
+            return self.model._meta.pk
+        model, field = self.model, None
+        for name in column.split('__'):
+            field = model._meta.get_field(name)
+            if field.is_relation:
+                model = field.related_model
+        return field.target_field if field.is_relation else field
+
+    def get_lookup(self, column):
+        """Returns the lookup used to filter by the text of the column.
+        Foreign keys are filtered by the field of the related model they refer to."""
+        if self.model._meta.get_field(column.split('__')[0]).is_relation and '__' not in column:
+            return f'{column}__{self.get_field(column).name}'
+        return column
+
+    def get_labels(self):
+        """Returns the headers of the columns."""
+        labels = []
+        for column in self.columns:
+            field = self.get_field(column)
+            labels.append(str(field.verbose_name) if '__' not in column else column.split('__')[0])
+        return labels
+
+    def clean_value(self, column, value):
+        """Converts a value of the request to the python value of the column.
+        Boolean columns also accept 'true' and 'false' in any case."""
+        field = self.get_field(column)
+        if isinstance(field, models.BooleanField) and isinstance(value, str) and \
+                value.lower() in ('true', 'false'):
+            return value.lower() == 'true'
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise GridError(f'Некорректное значение {value} для колонки {column}')
+
+    def filter(self, queryset, params):
+        """Applies the filters of the request to the queryset."""
+        for column in self.columns:
+            value = params.get(column)
+            if value in (None, ''):
+                continue
+            if isinstance(self.get_field(column), (models.CharField, models.TextField)):
+                queryset = queryset.filter(**{f'{self.get_lookup(column)}__icontains': value})
+            else:
+                queryset = queryset.filter(**{column: self.clean_value(column, value)})
+        return queryset
+
+    def get_sort(self, params):
+        """Returns the sort column and whether the order is descending."""
+        sort = params.get('sort') or 'pk'
+        descending = sort.startswith('-')
+        column = sort.lstrip('-')
+        if column != 'pk' and column not in self.columns:
+            raise GridError(f'Неизвестная колонка {column}')
+        return column, descending
+
+    def get_page(self, params):
+        """Returns one page of the grid.
+
+        Args:
+
+            * params (`QueryDict`): the parameters of the request.
+
+        Returns:
+
+            * dict: the columns, the rows as lists of values and the cursor of the next page
+                    (None if this page is the last one).
+        """
+        try:
+            limit = max(1, min(int(params.get('limit', GRID_PAGE_SIZE)), GRID_MAX_PAGE_SIZE))
+        except ValueError:
+            raise GridError('Некорректный размер страницы')
+        column, descending = self.get_sort(params)
+        sign = '-' if descending else ''
+        queryset = self.filter(self.model.objects.all(), params)
+
+        if params.get('cursor'):
+            value, pk = decode_cursor(params['cursor'])
+            pk = self.clean_value('pk', pk)
+            after = 'lt' if descending else 'gt'
+            if column == 'pk':
+                queryset = queryset.filter(**{f'pk__{after}': pk})
+            else:
+                value = self.clean_value(column, value)
+                queryset = queryset.filter(Q(**{f'{column}__{after}': value}) |
+                                           Q(**{column: value, f'pk__{after}': pk}))
+
+        order = [f'{sign}pk'] if column == 'pk' else [f'{sign}{column}', f'{sign}pk']
+        # one extra row tells whether there is a next page without counting the rows
+        rows = list(queryset.order_by(*order).values_list(*self.columns, 'pk', column)[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][-1], rows[-1][-2]])
+        return {
+            'columns': list(self.columns),
+            'rows': [row[:len(self.columns)] for row in rows],
+            'next': next_cursor,
+        }
+
+
+class UserGrid(BaseGrid):
+    """Grid of the users of the site."""
+    model = MyUser
+    columns = ('id', 'username', 'first_name', 'last_name', 'email', 'score', 'is_staff', 'is_active',
+               'date_joined')
+
+
+class CategoryGrid(BaseGrid):
+    """Grid of the categories of questions."""
+    model = QuestionCategory
+    columns = ('id', 'name', 'description', 'available')
+
+
+class QuestionGrid(BaseGrid):
+    """Grid of the questions."""
+    model = Question
+    columns = ('id', 'question', 'subject__name', 'author__username', 'difficulty_level', 'right_answer', 'tag',
+               'available')
+
+
+class PostGrid(BaseGrid):
+    """Grid of the posts."""
+    model = Post
+    columns = ('id', 'title', 'category__name', 'author__username', 'created_on', 'tag', 'available')
+
+
+GRIDS = {
+    'users': UserGrid,
+    'categories': CategoryGrid,
+    'questions': QuestionGrid,
+    'posts': PostGrid,
+}
@@ -0,0 +1,56 @@
+"""Contains the registry of the hot queries of the site checked by the explain_queries command.
+
+Every entry is the name of the query, the place it is made in, and a function building the
+queryset with the same shape (filters, ordering, slicing) as the site does. The parameters
+of the queries are taken from the existing rows, so the plans are those of real values.
+"""
+from django.db.models import Q
+
+from posts.models import Post
+from questions.models import Question, QuestionCategory
+from users.models import MyUser
+
+
+def first_value(model, field, default):
+    """Returns the value of the field of some row of the model, or the default for an empty table."""
+    value = model.objects.values_list(field, flat=True).first()
+    return default if value is None else value
+
+
+def question_pool():
+    """The pool of questions of a test."""
+    return Question.objects.filter(subject_id=first_value(Question, 'subject_id', 1),
+                                   difficulty_level=first_value(Question, 'difficulty_level', Question.NEWBIE),
+                                   available=True).values_list('pk', flat=True)
+
+
+def questions_by_category_name():
+    """The questions of a category found by its name."""
+    return Question.objects.filter(subject__name=first_value(QuestionCategory, 'name', 'Python'))
+
+
+def answer_posts():
+    """The posts of the tag of a question shown with the answer."""
+    return Post.objects.filter(Q(tag=first_value(Post, 'tag', 'IT')) & Q(available=True))[:4] \
+        .defer('author', 'category', 'body', 'image', 'created_on')
+
+
+def category_posts():
+    """The available posts of a category."""
+    return Post.objects.filter(Q(category_id=first_value(Post, 'category_id', 1)), Q(available=True)) \
+        .defer('author', 'tag', 'body', 'image', 'created_on')
+
+
+def leaderboard():
+    """The best participants."""
+    return MyUser.objects.filter(Q(is_active=True) & Q(score__gt=0)).order_by('-score')[:5]
+
+
+#: the name of the query, the place it is made in, the function returning its queryset
+HOT_QUERIES = (
+    ('question_pool', 'questions.views.get_question_pool', question_pool),
+    ('questions_by_category_name', 'api_graphene resolve_get_questions_by_category', questions_by_category_name),
+    ('answer_posts', 'questions.views.AnswerQuestion, posts.views.TagPostView', answer_posts),
+    ('category_posts', 'posts.views.CategoryPostView', category_posts),
+    ('leaderboard', 'users.views.get_leaderboard', leaderboard),
+)
@@ -0,0 +1,340 @@
+"""Contains importers for loading questions and posts in bulk from CSV or JSONL files.
+
+Rows are read from the stream one by one and collected into batches of a fixed size,
+so the memory used by the import does not depend on the size of the file.
+Each row is validated when it is read. If an archive with images is given, the images
+of the batch are extracted and reduced in a pool of workers, after which the whole batch
+is written with a single ``bulk_create`` query.
+
+``bulk_create`` does not call ``save()`` and does not send ``pre_save`` signals,
+so instead of an email for every new object, the admin receives one summary email
+at the end of the import.
+"""
+
+import csv
+import json
+import logging
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.mail import send_mail
+from django.db import DatabaseError, transaction
+from django.template.loader import render_to_string
+
+from interview_quiz.images import shrink_image
+from interview_quiz.settings import DOMAIN_NAME, EMAIL_HOST_USER
+from interview_quiz.versions import bump_version
+from myadmin.forms import QuestionForm
+from myadmin.stats import count_changes
+from posts.models import Post
+from questions.models import Question, QuestionCategory
+from users.models import MyUser, DEFAULT_AUTHOR
+
+logger = logging.getLogger(__name__)
+
+#: the maximum number of row errors kept for the report
+MAX_REPORTED_ERRORS = 100
+
+#: the maximum size of an unpacked image of the archive, bytes
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
+
+
+class ImportFileError(Exception):
+    """Raised when the rest of the imported file cannot be read: it is not in UTF-8 or not a correct CSV."""
+
+
+def read_rows(stream, file_format):
+    """Lazily reads rows from a text stream.
+
+    Args:
+
+        * stream (`file`): a text stream with the data;
+        * file_format (`str`): 'csv' (the first line contains the names of the columns) or 'jsonl'
+                               (each line contains one JSON object).
+
+    Yields:
+
+        * tuple: the number of the line and the row as a dictionary.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_num, json.loads(line)
+                except ValueError as e:
+                    yield line_num, e
+    else:
+        raise ValueError(f'Неизвестный формат файла {file_format}')
+
+
+def guess_format(filename):
+    """Returns the format of the file to import by its extension ('csv' by default)."""
+    extension = os.path.splitext(filename)[1].lower()
+    return 'jsonl' if extension in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+
+class ImportResult:
+    """Stores the results of the import: the number of created objects and images
+    and the first errors found in the rows."""
+
+    def __init__(self):
+        """Sets up empty counters."""
+        self.created = 0
+        self.images = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_num, error):
+        """Counts a rejected row and keeps its error if the report is not full yet."""
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            if isinstance(error, ValidationError):
+                error = '; '.join(error.messages)
+            self.errors.append((line_num, str(error)))
+
+    def __str__(self):
+        """Forms a short printable summary of the import."""
+        return f'Создано объектов: {self.created}, загружено изображений: {self.images}, ' \
+               f'отклонено строк: {self.failed}'
+
+
+class BaseImporter:
+    """Parent class for importers, required to comply with the DRY pattern.
+
+    Attributes:
+
+        * model (`Model`): the model of imported objects;
+        * fields (`tuple`): the columns copied into the object as is;
+        * category_field (`str`): the name of the foreign key to the category;
+        * image_fields (`tuple`): the columns with names of images in the archive;
+        * image_size (`tuple`): the size to which the images are reduced;
+        * verbose_name (`str`): the name of the imported objects for the summary email.
+    """
+    model = None
+    fields = ()
+    category_field = ''
+    image_fields = ()
+    image_size = (600, 600)
+    verbose_name = ''
+
+    def __init__(self, author=None, archive=None, batch_size=500, workers=4):
+        """Prepares the importer.
+
+        Args:
+
+            * author (`str`, optional): the username of the author for rows without the 'author' column,
+                                        by default the default author of the model is used;
+            * archive (`str` or `file`, optional): a zip archive with the images of the rows;
+            * batch_size (`int`, optional): the number of objects saved by one query;
+            * workers (`int`, optional): the number of workers processing the images.
+        """
+        self.author = author or DEFAULT_AUTHOR
+        self.archive = zipfile.ZipFile(archive) if archive else None
+        self.batch_size = batch_size
+        self.workers = workers
+        self.categories = {}
+        for category in QuestionCategory.objects.all():
+            self.categories[str(category.id)] = self.categories[category.name] = category
+        self.authors = {}
+
+    def run(self, stream, file_format):
+        """Imports all rows of the stream and sends a summary email to the admin.
+
+        Args:
+
+            * stream (`file`): a text stream with the data;
+            * file_format (`str`): 'csv' or 'jsonl'.
+
+        Returns:
+
+            * ImportResult: the results of the import.
+
+        Raises:
+
+            * ImportFileError: if the rest of the file cannot be read, the batches saved before stay.
+        """
+        result = ImportResult()
+        batch = []
+        line_num = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for line_num, row in read_rows(stream, file_format):
+                    try:
+                        if isinstance(row, Exception):
+                            raise row
+                        batch.append(self.build(line_num, row))
+                    except (ValidationError, ValueError, KeyError, AttributeError) as e:
+                        result.add_error(line_num, e)
+                    if len(batch) >= self.batch_size:
+                        self.save_batch(batch, result, pool)
+                        batch = []
+                if batch:
+                    self.save_batch(batch, result, pool)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFileError(f'Файл не читается после строки {line_num}: {e}. {result}')
+        finally:
+            if self.archive:
+                self.archive.close()
+        self.notify(result)
+        return result
+
+    def build(self, line_num, row):
+        """Creates an unsaved object from the row and validates it.
+
+        Args:
+
+            * line_num (`int`): the number of the line of the row, used in the error report;
+            * row (`dict`): the data of the row.
+
+        Raises:
+
+            * ValidationError: if the data of the row is incorrect.
+        """
+        if isinstance(row.get('available'), str):
+            row['available'] = row['available'].strip().lower() in ('1', 'true', 'yes')
+        data = {field: row[field] for field in self.fields if row.get(field) not in (None, '')}
+        # the author is passed to the constructor, so the default author is not queried for every row
+        instance = self.model(author_id=self.get_author(row.get('author') or self.author), **data)
+        category = self.categories.get(str(row.get(self.category_field, '')).strip())
+        if category is None:
+            raise ValidationError(f'Категория {row.get(self.category_field)} не существует')
+        setattr(instance, self.category_field, category)
+        instance.clean_fields(exclude=(self.category_field, 'author') + self.image_fields)
+        self.validate(instance)
+
+        instance.import_line = line_num
+        instance.import_images = {field: row[field] for field in self.image_fields if row.get(field)}
+        if instance.import_images and not self.archive:
+            raise ValidationError('Для строк с изображениями необходим архив')
+        return instance
+
+    def validate(self, instance):
+        """Checks the rules of the model that are not described by its fields.
+        Does nothing by default, child classes can extend it."""
+
+    def get_author(self, username):
+        """Returns the primary key of the author with the username.
+        Users already found are remembered, so each author is queried only once.
+
+        Raises:
+
+            * ValidationError: if there is no such user.
+        """
+        if username not in self.authors:
+            self.authors[username] = MyUser.objects.filter(username=username).values_list('pk', flat=True).first()
+        if self.authors[username] is None:
+            raise ValidationError(f'Пользователь {username} не существует')
+        return self.authors[username]
+
+    def save_batch(self, batch, result, pool):
+        """Processes the images of the batch in the pool of workers and then saves
+        all objects of the batch with one query.
+        An object whose image could not be processed is saved without this image."""
+        jobs = []
+        for instance in batch:
+            for field_name, member in instance.import_images.items():
+                try:
+                    if self.archive.getinfo(member).file_size > MAX_IMAGE_SIZE:
+                        result.add_error(instance.import_line, f'Изображение {member} слишком большое')
+                        continue
+                    data = self.archive.read(member)
+                except KeyError:
+                    result.add_error(instance.import_line, f'Изображение {member} не найдено в архиве')
+                    continue
+                jobs.append((instance, field_name,
+                             pool.submit(self.store_image, instance, field_name, member, data)))
+        for instance, field_name, job in jobs:
+            try:
+                setattr(instance, field_name, job.result())
+                result.images += 1
+            except (OSError, ValueError) as e:
+                logger.error(f'Ошибка обработки изображения при импорте {e}')
+                result.add_error(instance.import_line, e)
+
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(batch)
+                count_changes([], batch)
+        except DatabaseError:
+            self.delete_images(batch)
+            raise
+        bump_version(self.model)
+        result.created += len(batch)
+
+    def delete_images(self, batch):
+        """Deletes the images stored for the objects of the batch that has not been saved."""
+        for instance in batch:
+            for field_name in instance.import_images:
+                image = getattr(instance, field_name)
+                if image:
+                    image.storage.delete(image.name)
+
+    def store_image(self, instance, field_name, member, data):
+        """Saves the image from the archive along the path generated by the model field
+        and reduces it. Called in the workers of the pool.
+
+        Returns:
+
+            * str: the name of the saved image file.
+        """
+        field = self.model._meta.get_field(field_name)
+        name = field.generate_filename(instance, os.path.basename(member))
+        name = field.storage.save(name, ContentFile(data))
+        shrink_image(field.storage.path(name), self.image_size)
+        return name
+
+    def notify(self, result):
+        """Sends one summary email about the import to the admin."""
+        context = {
+            'my_site_name': DOMAIN_NAME,
+            'verbose_name': self.verbose_name,
+            'result': result,
+        }
+        message = render_to_string('emails/import_summary.html', context)
+        try:
+            send_mail(f'Импорт: {self.verbose_name}', message, EMAIL_HOST_USER, [EMAIL_HOST_USER],
+                      html_message=message, fail_silently=False)
+        except Exception as e:
+            logger.error(f'Ошибка отправки отчета об импорте - {e}')
+
+
+class QuestionImporter(BaseImporter):
+    """Importer for Question objects.
+    The category is taken from the 'subject' column by its name or id."""
+    model = Question
+    fields = ('question', 'right_answer', 'answer_01', 'answer_02', 'answer_03', 'answer_04',
+              'difficulty_level', 'available', 'tag')
+    category_field = 'subject'
+    image_fields = ('image_01', 'image_02', 'image_03')
+    verbose_name = 'вопросы'
+
+    def validate(self, instance):
+        """Checks the presence of the correct answer among the suggested options,
+        as QuestionForm and QuestionSerializer do."""
+        if instance.right_answer not in (instance.answer_01, instance.answer_02,
+                                         instance.answer_03, instance.answer_04):
+            raise ValidationError(QuestionForm.error_messages['invalid_answer'],
+                                  code='invalid_answer', params={'value': instance.right_answer})
+
+
+class PostImporter(BaseImporter):
+    """Importer for Post objects.
+    The category is taken from the 'category' column by its name or id."""
+    model = Post
+    fields = ('title', 'body', 'available', 'tag')
+    category_field = 'category'
+    image_fields = ('image',)
+    verbose_name = 'статьи'
+
+
+IMPORTERS = {
+    'questions': QuestionImporter,
+    'posts': PostImporter,
+}
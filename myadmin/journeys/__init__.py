@@ -0,0 +1,13 @@
+"""
+Contains the harness of the load tests of the user journeys run by the loadtest_journeys command.
+
+The virtual users of the harness go through the real flows of the site with their own sessions,
+rather than requesting a fixed list of pages: they register and verify
+their profiles, start tests, answer the questions and look at the top of the users.
+
+    * client.py - the virtual user: an HTTP client with a persistent connection, cookies and CSRF tokens;
+    * scenarios.py - the scripted scenarios the virtual users follow;
+    * report.py - the throughput and the latency percentiles of the steps, their CSV and HTML
+      reports and the comparison with the committed baseline (baseline.csv);
+    * memcached.py - a stand-in of memcached for the local server, speaking the text protocol of memcached.
+"""
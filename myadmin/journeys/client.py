@@ -0,0 +1,108 @@
+"""Contains the virtual user of the load tests of the user journeys."""
+import http.client
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+
+class StepFailed(Exception):
+    """A step of a scenario has got an unexpected response, so the scenario cannot go on."""
+
+
+class VirtualUser:
+    """A user of the site with its own connection and cookies, recording the time of every step.
+
+    Args:
+
+        * address (`tuple`): the host and the port of the site;
+        * results (`list`): the list the results of the steps are added to: (step, status, seconds, failed),
+          the status is None if the request has not got a response, failed is True for an unexpected status;
+        * timeout (`float`, optional): the time limit of a request, seconds.
+    """
+
+    def __init__(self, address, results, timeout=30):
+        self.address = address
+        self.results = results
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, step, method, path, data=None, expect=(200,)):
+        """Makes a request of the step over the persistent connection, reconnecting if the server has closed it.
+        The redirects are not followed.
+
+        Args:
+
+            * step (`str`): the name of the step in the report;
+            * method (`str`): GET or POST;
+            * path (`str`): the path of the request;
+            * data (`dict`, optional): the query string of GET or the form of POST;
+            * expect (`tuple`, optional): the expected status codes.
+
+        Returns:
+
+            * str: the body of the response.
+
+        Raises:
+
+            * StepFailed: the request has failed or its status is unexpected.
+        """
+        body = None
+        headers = {'Host': f'{self.address[0]}:{self.address[1]}'}
+        if method == 'GET' and data:
+            path = f'{path}?{urlencode(data)}'
+        elif data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+
+        started = time.perf_counter()
+        try:
+            response = self.send(method, path, body, headers)
+            content = response.read().decode('utf-8', errors='replace')
+        except (OSError, http.client.HTTPException) as e:
+            self.results.append((step, None, time.perf_counter() - started, True))
+            self.close()
+            raise StepFailed(f'{step}: {e}')
+        self.results.append((step, response.status, time.perf_counter() - started, response.status not in expect))
+
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel['max-age'] == '0' or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+        if response.status not in expect:
+            raise StepFailed(f'{step}: status {response.status}')
+        return content
+
+    def send(self, method, path, body, headers):
+        """Sends the request and returns its response, retrying once over a new connection
+        if the persistent connection has been closed by the server."""
+        for attempt in (1, 2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(*self.address, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body, headers)
+                response = self.connection.getresponse()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                self.close()
+                if attempt == 2:
+                    raise
+                continue
+            if response.getheader('Connection', '').lower() == 'close':
+                response.will_close = True
+                self.connection = None
+            return response
+
+    @property
+    def csrf_token(self):
+        """The CSRF token of the user taken from its cookie."""
+        return self.cookies.get('csrftoken', '')
+
+    def close(self):
+        """Closes the connection of the user."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
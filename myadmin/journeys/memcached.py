@@ -0,0 +1,177 @@
+"""
+Contains a stand-in of memcached for the local server of the load tests.
+
+It speaks the text protocol of memcached (the commands used by pymemcache: get, gets, set, add,
+replace, append, prepend, cas, delete, incr, decr, touch, flush_all, version), keeps the items
+in the memory of the process and expires them lazily. It has no limit of memory and no eviction,
+it is not meant for anything but the short runs of the load tests on a machine without memcached.
+"""
+import asyncio
+import itertools
+import threading
+import time
+
+#: exptime values larger than 30 days are unix timestamps in the protocol of memcached
+RELATIVE_EXPTIME_LIMIT = 60 * 60 * 24 * 30
+
+STORAGE_COMMANDS = {b'set', b'add', b'replace', b'append', b'prepend', b'cas'}
+
+
+class MemcachedStandIn:
+    """The server of the stand-in run by the event loop of its own thread.
+
+    Args:
+
+        * host (`str`, optional): the address the server listens on;
+        * port (`int`, optional): the port, 0 - any free port.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.host = host
+        self.port = port
+        self.items = {}
+        self.cas_numbers = itertools.count(1)
+        self.loop = None
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Starts the server in a daemon thread and returns its location for the CACHES setting: host:port."""
+        started = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.server = self.loop.run_until_complete(asyncio.start_server(self.serve, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+            self.loop.run_forever()
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name='memcached-stand-in', daemon=True)
+        self.thread.start()
+        started.wait()
+        return f'{self.host}:{self.port}'
+
+    def stop(self):
+        """Stops the server, closing the connections of its clients."""
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+
+    async def shutdown(self):
+        """Stops listening and cancels the tasks serving the connections."""
+        self.server.close()
+        await self.server.wait_closed()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_item(self, key):
+        """Returns the item (flags, data, expires, cas) of the key, None if there is none or it has expired."""
+        item = self.items.get(key)
+        if item is not None and item[2] and item[2] <= time.time():
+            del self.items[key]
+            return None
+        return item
+
+    @staticmethod
+    def expires(exptime):
+        """Returns the unix time of the expiration by the exptime of the protocol, 0 - never,
+        a negative exptime expires the item at once."""
+        exptime = int(exptime)
+        if exptime == 0:
+            return 0
+        if exptime < 0:
+            return -1
+        return exptime if exptime > RELATIVE_EXPTIME_LIMIT else time.time() + exptime
+
+    async def serve(self, reader, writer):
+        """Answers the commands of a connection until the client closes it."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.split()
+                if not parts:
+                    continue
+                if parts[0] == b'quit':
+                    break
+                if parts[0] in STORAGE_COMMANDS:
+                    data = await reader.readexactly(int(parts[4]) + 2)
+                    answer = self.store(parts, data[:-2])
+                else:
+                    answer = self.execute(parts)
+                if parts[-1] != b'noreply':
+                    writer.write(answer)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    def store(self, parts, data):
+        """Executes a storage command and returns its answer."""
+        command, key, flags, exptime = parts[0], parts[1], parts[2], parts[3]
+        item = self.get_item(key)
+        if command == b'add' and item is not None or command in (b'replace', b'append', b'prepend') and item is None:
+            return b'NOT_STORED\r\n'
+        if command == b'cas':
+            if item is None:
+                return b'NOT_FOUND\r\n'
+            if item[3] != int(parts[5]):
+                return b'EXISTS\r\n'
+        if command == b'append':
+            flags, data, expires = item[0], item[1] + data, item[2]
+        elif command == b'prepend':
+            flags, data, expires = item[0], data + item[1], item[2]
+        else:
+            expires = self.expires(exptime)
+        if expires < 0:
+            self.items.pop(key, None)
+        else:
+            self.items[key] = (flags, data, expires, next(self.cas_numbers))
+        return b'STORED\r\n'
+
+    def execute(self, parts):
+        """Executes a command other than a storage one and returns its answer."""
+        command = parts[0]
+        if command in (b'get', b'gets'):
+            answer = []
+            for key in parts[1:]:
+                item = self.get_item(key)
+                if item is not None:
+                    cas = b' %d' % item[3] if command == b'gets' else b''
+                    answer.append(b'VALUE %s %s %d%s\r\n%s\r\n' % (key, item[0], len(item[1]), cas, item[1]))
+            return b''.join(answer) + b'END\r\n'
+        if command == b'delete':
+            if self.get_item(parts[1]) is None:
+                return b'NOT_FOUND\r\n'
+            del self.items[parts[1]]
+            return b'DELETED\r\n'
+        if command in (b'incr', b'decr'):
+            item = self.get_item(parts[1])
+            if item is None:
+                return b'NOT_FOUND\r\n'
+            value = int(item[1]) + (int(parts[2]) if command == b'incr' else -int(parts[2]))
+            value = max(value, 0) % 2 ** 64
+            self.items[parts[1]] = (item[0], b'%d' % value, item[2], next(self.cas_numbers))
+            return b'%d\r\n' % value
+        if command == b'touch':
+            item = self.get_item(parts[1])
+            if item is None:
+                return b'NOT_FOUND\r\n'
+            expires = self.expires(parts[2])
+            if expires < 0:
+                del self.items[parts[1]]
+            else:
+                self.items[parts[1]] = (item[0], item[1], expires, item[3])
+            return b'TOUCHED\r\n'
+        if command == b'flush_all':
+            self.items.clear()
+            return b'OK\r\n'
+        if command == b'version':
+            return b'VERSION 1.6.0-stand-in\r\n'
+        return b'ERROR\r\n'
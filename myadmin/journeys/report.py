@@ -0,0 +1,101 @@
+"""Contains the reports of the load tests of the user journeys and their comparison with a baseline."""
+import csv
+
+from django.template.loader import render_to_string
+
+
+#: the columns of the CSV report
+COLUMNS = ('step', 'requests', 'errors', 'rps', 'mean', 'p50', 'p90', 'p95', 'p99', 'max')
+
+#: the p95 of a step is compared with the baseline only when both runs have this many requests of the step
+#: and the baseline p95 is at least this long, milliseconds: otherwise it is mostly noise
+MIN_COMPARED_REQUESTS = 50
+MIN_COMPARED_MS = 5
+
+
+def percentile(values, share):
+    """Returns the value below which the share (0..1) of the sorted values lies."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def summarize(results, elapsed, order=()):
+    """Returns the rows of the report: the throughput and the latency percentiles (milliseconds)
+    of every step, and the total of all steps.
+
+    Args:
+
+        * results (`list`): the results of the requests: (step, status, seconds, failed) (see ``VirtualUser``);
+        * elapsed (`float`): the duration of the run, seconds;
+        * order (`tuple`, optional): the steps in the order of the rows, the other steps follow them.
+    """
+    steps = {}
+    for step, _, seconds, failed in results:
+        steps.setdefault(step, []).append((seconds, failed))
+    steps = dict(sorted(steps.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
+    steps['total'] = [(seconds, failed) for _, _, seconds, failed in results]
+    rows = []
+    for step, values in steps.items():
+        latencies = sorted(seconds * 1000 for seconds, _ in values)
+        rows.append({
+            'step': step, 'requests': len(values), 'errors': sum(1 for _, failed in values if failed),
+            'rps': len(values) / elapsed if elapsed else 0,
+            'mean': sum(latencies) / len(latencies) if latencies else 0,
+            'p50': percentile(latencies, 0.5), 'p90': percentile(latencies, 0.9),
+            'p95': percentile(latencies, 0.95), 'p99': percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0,
+        })
+    return rows
+
+
+def write_csv(path, rows):
+    """Writes the rows of the report to the CSV file."""
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({column: round(value, 2) if isinstance(value, float) else value
+                             for column, value in row.items()})
+
+
+def read_csv(path):
+    """Returns the rows of a CSV report by their steps."""
+    with open(path, newline='', encoding='utf-8') as file:
+        return {row['step']: {column: row[column] if column == 'step' else float(row[column]) for column in COLUMNS}
+                for row in csv.DictReader(file)}
+
+
+def compare(rows, baseline, tolerance):
+    """Adds the change of p95 against the baseline to the rows and returns the regressions.
+
+    Args:
+
+        * rows (`list`): the rows of the report;
+        * baseline (`dict`): the rows of the baseline by their steps (see ``read_csv``);
+        * tolerance (`float`): the allowed growth of p95, percent.
+
+    Returns:
+
+        * list: the rows whose p95 has grown more than allowed.
+    """
+    regressions = []
+    for row in rows:
+        before = baseline.get(row['step'])
+        if before is None or min(before['requests'], row['requests']) < MIN_COMPARED_REQUESTS \
+                or before['p95'] < MIN_COMPARED_MS:
+            continue
+        row['baseline_p95'] = before['p95']
+        row['change'] = (row['p95'] / before['p95'] - 1) * 100
+        if row['change'] > tolerance:
+            regressions.append(row)
+    return regressions
+
+
+def write_html(path, context):
+    """Writes the HTML report of the run; the context has the rows, the regressions and the settings of the run."""
+    longest = max((row['p95'] for row in context['rows']), default=0)
+    for row in context['rows']:
+        row['width'] = 100 * row['p95'] / longest if longest else 0
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(render_to_string('myadmin/journeys_report.html', context))
@@ -0,0 +1,155 @@
+"""
+Contains the scripted scenarios of the load tests of the user journeys.
+
+A scenario is a function taking a virtual user (see client.py) and the plan of the run;
+it makes the requests of its steps one after another, pausing for the think time of the plan
+between them, and stops at the first unexpected response (``StepFailed``).
+"""
+import html
+import random
+import re
+import threading
+from itertools import count
+
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from myadmin.journeys.client import StepFailed
+from questions.models import Question
+from users.models import MyUser
+
+#: the domain of the emails of the users created by the load tests
+EMAIL_DOMAIN = 'loadtest.invalid'
+
+#: the password of the users created by the load tests
+PASSWORD = 'Kx7-mirror-Quill'
+
+ANSWER_ACTION = re.compile(r'action="[^"]*/questions/answers/(\d+)/"')
+ANSWER_VALUE = re.compile(r'id="answer_0\d"\s+value="([^"]*)"')
+
+
+class Plan:
+    """The data and the settings of a run shared by its virtual users.
+
+    Args:
+
+        * run (`str`): the identifier of the run, a part of the names of its users;
+        * pools (`list`): the pairs (category pk, difficulty level) that have available questions;
+        * answers (`int`): the maximum number of the answered questions of a test;
+        * think (`float`): the mean pause between the steps, seconds;
+        * stop (`threading.Event`): set when the run is over, it interrupts the pauses.
+    """
+
+    def __init__(self, run, pools, answers, think, stop):
+        self.run = run
+        self.pools = pools
+        self.answers = answers
+        self.think_time = think
+        self.stop = stop
+        self.accounts = []
+        self._numbers = count(1)
+        self._lock = threading.Lock()
+
+    def think(self):
+        """Pauses like a user reading the page: a random time around the mean think time.
+        The scenario is interrupted when the run is over."""
+        if self.think_time:
+            self.stop.wait(random.uniform(0, 2 * self.think_time))
+        if self.stop.is_set():
+            raise StepFailed('the run is over')
+
+    def new_username(self, kind):
+        """Returns a unique name of a user of the run."""
+        with self._lock:
+            return f'lt{self.run}{kind}{next(self._numbers)}'
+
+    def create_accounts(self, number):
+        """Creates the active users that the quiz scenario logs in as.
+        The password is hashed once for all of them."""
+        password = make_password(PASSWORD)
+        names = [self.new_username('q') for _ in range(number)]
+        users = [MyUser(username=name, email=f'{name}@{EMAIL_DOMAIN}', first_name='Load', last_name='Test',
+                        password=password, is_active=True) for name in names]
+        MyUser.objects.bulk_create(users)
+        self.accounts = [user.username for user in users]
+
+
+def users_of_runs():
+    """Returns the users created by the load tests."""
+    return MyUser.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+
+
+def activation_key(email):
+    """Returns the activation key of the registered user, as if it were taken from the email."""
+    return MyUser.objects.filter(email=email).values_list('activation_key', flat=True).first()
+
+
+def take_test(user, plan):
+    """Starts a test of a random category and level and answers its questions with random answers."""
+    category, level = random.choice(plan.pools)
+    user.request('category', 'GET', reverse('questions:start_test', args=[category]))
+    plan.think()
+    page = user.request('quiz:start', 'POST', reverse('questions:test_body', args=[category]),
+                        {'csrfmiddlewaretoken': user.csrf_token, 'dif': level, 'limit': 'False'})
+    for _ in range(plan.answers):
+        item = ANSWER_ACTION.search(page)
+        if item is None:  # the questions of the test are over
+            break
+        plan.think()
+        answers = [html.unescape(value) for value in ANSWER_VALUE.findall(page)]
+        user.request('quiz:answer', 'GET', reverse('questions:answers', args=[item.group(1)]),
+                     {'csrfmiddlewaretoken': user.csrf_token, 'answers': random.choice(answers or [''])})
+        plan.think()
+        page = user.request('quiz:next', 'GET', reverse('questions:test_body', args=[category]))
+    plan.think()
+    user.request('top_users', 'GET', reverse('users:top_users'))
+
+
+def journey(user, plan):
+    """A new user: registers, verifies the profile by the link of the email, takes a test
+    and looks at the top of the users."""
+    username = plan.new_username('j')
+    email = f'{username}@{EMAIL_DOMAIN}'
+    user.request('register:form', 'GET', reverse('users:register'))
+    plan.think()
+    user.request('register:submit', 'POST', reverse('users:register'), {
+        'csrfmiddlewaretoken': user.csrf_token, 'username': username, 'email': email,
+        'first_name': 'Load', 'last_name': 'Test', 'password1': PASSWORD, 'password2': PASSWORD,
+    }, expect=(302,))
+    plan.think()
+    user.request('verify', 'GET', reverse('users:verify', args=[email, activation_key(email) or 'missing']))
+    plan.think()
+    take_test(user, plan)
+
+
+def quiz(user, plan):
+    """A returning user: logs in, takes a test and looks at the top of the users."""
+    user.request('login:form', 'GET', reverse('users:login'))
+    plan.think()
+    user.request('login:submit', 'POST', reverse('users:login'), {
+        'csrfmiddlewaretoken': user.csrf_token, 'username': random.choice(plan.accounts), 'password': PASSWORD,
+    }, expect=(302,))
+    plan.think()
+    take_test(user, plan)
+
+
+def browse(user, plan):
+    """An anonymous visitor: the main page, the categories, the posts and the api of the questions."""
+    for step, path in (('browse:index', reverse('index')), ('browse:categories', reverse('questions:categories')),
+                       ('browse:posts', reverse('posts:all')), ('browse:api', '/api/questions/')):
+        user.request(step, 'GET', path)
+        plan.think()
+
+
+#: the steps of the scenarios in the order of the reports
+STEPS = ('register:form', 'register:submit', 'verify', 'login:form', 'login:submit', 'category', 'quiz:start',
+         'quiz:answer', 'quiz:next', 'top_users', 'browse:index', 'browse:categories', 'browse:posts', 'browse:api')
+
+#: the scenarios by their names
+SCENARIOS = {'journey': journey, 'quiz': quiz, 'browse': browse}
+
+
+def get_pools():
+    """Returns the pairs (category pk, difficulty level) of the available categories that have available questions."""
+    return list(Question.objects.filter(available=True, subject__available=True)
+                .values_list('subject_id', 'difficulty_level').distinct().order_by('subject_id', 'difficulty_level'))
@@ -0,0 +1,55 @@
+"""Contains custom commands for easy launch by manage.py."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+
+from interview_quiz.db.author_keys import BATCH_SIZE, backfill
+
+#: the app and model, the migration adding the new author column and the migration switching to it
+MODELS = (
+    ('questions', 'Question', '0004_question_author_ref', '0006_switch_question_author'),
+    ('posts', 'Post', '0004_post_author_ref', '0006_switch_post_author'),
+)
+
+
+class Command(BaseCommand):
+    """A command filling the primary keys of the authors of questions and posts in batches
+    (see interview_quiz/db/author_keys.py), for big tables before the rest of the migrations:
+
+        python manage.py migrate questions 0004 && python manage.py migrate posts 0004
+        python manage.py backfill_author_keys --pause 0.1
+        python manage.py migrate
+
+    The models are taken from the migrations, so the command works with the code of the new release.
+
+    Example:
+        python manage.py backfill_author_keys --batch-size 2000
+    """
+    help = 'Fills the primary keys of the authors of questions and posts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='seconds to wait between the batches')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        loader = MigrationLoader(connection)
+        for app, model_name, added, switched in MODELS:
+            if (app, switched) in loader.applied_migrations:
+                self.stdout.write(f'{app}.{model_name}: the author has already been switched to the primary key')
+                continue
+            if (app, added) not in loader.applied_migrations:
+                self.stdout.write(f'{app}.{model_name}: apply the migration {added} first')
+                continue
+            apps = loader.project_state((app, added)).apps
+            model, user_model = apps.get_model(app, model_name), apps.get_model('users', 'MyUser')
+            started, total = time.perf_counter(), 0
+            for updated in backfill(model, user_model, connection.alias, options['batch_size']):
+                total += updated
+                self.stdout.write(f'{app}.{model_name}: {total} rows filled')
+                time.sleep(options['pause'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{app}.{model_name}: {total} rows filled in {time.perf_counter() - started:.1f}s'))
@@ -0,0 +1,100 @@
+"""Contains custom commands for easy launch by manage.py."""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from myadmin.management.commands.bench_grid import Rollback
+from users.models import MyUser
+
+#: the compared kinds of keys of the authors: the name and the referenced field of the user
+KEYS = (
+    ('username', 'username'),
+    ('primary key', 'id'),
+)
+
+
+def index_size(cursor, name):
+    """Returns the size of the index in bytes, or None when the database does not report it."""
+    if connection.vendor == 'postgresql':
+        cursor.execute('SELECT pg_relation_size(%s::regclass)', [name])
+    elif connection.vendor == 'sqlite':
+        try:
+            cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [name])
+        except Exception:  # SQLite built without the dbstat table
+            return None
+    else:
+        return None
+    return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    """A command comparing the foreign keys of the authors of questions and posts referencing
+    the username and the primary key of the user: the time of a join with the users,
+    of the lookup of the rows of an author and the size of the index of the key.
+
+    The users and two tables with the same rows keyed both ways are generated inside
+    a transaction that is rolled back at the end.
+
+    Example:
+        python manage.py bench_author_keys --users 10000 --rows 500000
+    """
+    help = 'Compares the username and primary key foreign keys of the authors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help='the number of generated users')
+        parser.add_argument('--rows', type=int, default=200000, help='the number of rows referencing the users')
+        parser.add_argument('--lookups', type=int, default=200, help='the number of lookups of the rows of an author')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                users = self.generate_users(options['users'])
+                with connection.cursor() as cursor:
+                    self.stdout.write(f'{"key":>12} {"join, ms":>10} {"lookup, ms":>11} {"index, KiB":>11}')
+                    for name, field in KEYS:
+                        self.measure(cursor, name, field, users, options['rows'], options['lookups'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('The generated rows have been rolled back')
+
+    def generate_users(self, count, batch_size=5000):
+        """Creates the users of the benchmark and returns their usernames and primary keys."""
+        users = [MyUser(username=f'bench_author_{number}', email=f'bench_author_{number}@example.com',
+                        password='!') for number in range(count)]
+        MyUser.objects.bulk_create(users, batch_size=batch_size)
+        return [(user.username, user.pk) for user in users]
+
+    def measure(self, cursor, name, field, users, rows, lookups, batch_size=5000):
+        """Fills a table referencing the users by the field and prints the times and the index size."""
+        users_table = MyUser._meta.db_table
+        key_field = MyUser._meta.get_field(field)
+        table = f'bench_author_{field}'
+        cursor.execute(f'CREATE TABLE {table} (id integer PRIMARY KEY, '
+                       f'author_id {key_field.db_type(connection)} NOT NULL)')
+        cursor.execute(f'CREATE INDEX {table}_idx ON {table} (author_id)')
+        position = 0 if field == 'username' else 1
+        keys = [key_field.get_db_prep_value(user[position], connection) for user in users]
+        for start in range(0, rows, batch_size):
+            cursor.executemany(f'INSERT INTO {table} (id, author_id) VALUES (%s, %s)',
+                               [(number, keys[number % len(keys)])
+                                for number in range(start, min(start + batch_size, rows))])
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'ANALYZE {table}')
+
+        started = time.perf_counter()
+        cursor.execute(f'SELECT COUNT(*), MAX(u.email) FROM {table} b '
+                       f'JOIN {users_table} u ON u.{key_field.column} = b.author_id')
+        cursor.fetchone()
+        join = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for key in random.sample(keys, min(lookups, len(keys))):
+            cursor.execute(f'SELECT id FROM {table} WHERE author_id = %s', [key])
+            cursor.fetchall()
+        lookup = (time.perf_counter() - started) * 1000
+
+        size = index_size(cursor, f'{table}_idx')
+        size = 'n/a' if size is None else f'{size / 1024:.0f}'
+        self.stdout.write(f'{name:>12} {join:>10.1f} {lookup:>11.1f} {size:>11}')
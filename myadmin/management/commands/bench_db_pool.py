@@ -0,0 +1,96 @@
+"""Contains custom commands for easy launch by manage.py."""
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_started, request_finished
+from django.db import connection, connections
+
+from interview_quiz.db.pool import close_pools, get_pool_stats
+from myadmin.journeys.report import percentile
+from questions.models import Question
+
+#: the compared connection settings: the name and the changed database settings
+MODES = (
+    ('new per request', {'CONN_MAX_AGE': 0, 'POOL_SIZE': 0}),
+    ('persistent', {'CONN_MAX_AGE': 60, 'POOL_SIZE': 0}),
+    ('pool', {'CONN_MAX_AGE': 0}),
+)
+
+
+class Command(BaseCommand):
+    """A command comparing the latency of requests to the database with connections opened per request,
+    with persistent connections and with the in-process pool, under concurrency.
+
+    Every thread imitates requests of a gunicorn thread: it sends the request_started
+    and request_finished signals, which open and close or return the connections,
+    around a few queries. The latency of the whole site with the pool is measured
+    by the loadtest_journeys command against gunicorn started with DB_POOL_SIZE.
+
+    Example:
+        python manage.py bench_db_pool --threads 16 --pool-size 4 --requests 500
+    """
+    help = 'Compares the latency of database requests with and without the connection pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='the number of concurrent threads')
+        parser.add_argument('--requests', type=int, default=200, help='the number of requests of a thread')
+        parser.add_argument('--pool-size', type=int, default=4, help='the size of the pool of the process')
+        parser.add_argument('--queries', type=int, default=3, help='the number of queries of a request')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Сравнение соединений имеет смысл только для PostgreSQL')
+        settings_dict = connections.databases[connection.alias]
+        saved = {key: settings_dict.get(key) for key in ('CONN_MAX_AGE', 'POOL_SIZE')}
+        self.stdout.write(f'{"mode":>16} {"rps":>8} {"p50, ms":>9} {"p95, ms":>9} {"p99, ms":>9} {"opened":>7}')
+        try:
+            for name, changes in MODES:
+                connection.close()
+                settings_dict.update(changes)
+                if name == 'pool':
+                    settings_dict['POOL_SIZE'] = options['pool_size']
+                self.measure(name, options['threads'], options['requests'], options['queries'])
+                close_pools()
+        finally:
+            settings_dict.update(saved)
+
+    def measure(self, name, threads, requests, queries):
+        """Runs the requests in the threads and prints the throughput and latency percentiles."""
+        latencies, opened = [], []
+        lock = threading.Lock()
+
+        def run():
+            own, own_opened = [], 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                if connection.connection is None:
+                    own_opened += 1
+                for _ in range(queries):
+                    list(Question.objects.filter(available=True).values_list('pk', flat=True)[:10])
+                request_finished.send(sender=self.__class__)
+                own.append(time.perf_counter() - started)
+            connection.close()
+            with lock:
+                latencies.extend(own)
+                opened.append(own_opened)
+
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        pool = get_pool_stats().get(connection.alias)
+        # a connection taken from the pool is not a new connection to the database
+        total_opened = pool['opened'] if pool else sum(opened)
+        self.stdout.write(f'{name:>16} {len(latencies) / elapsed:>8.0f} '
+                          f'{percentile(latencies, 0.5) * 1000:>9.2f} {percentile(latencies, 0.95) * 1000:>9.2f} '
+                          f'{percentile(latencies, 0.99) * 1000:>9.2f} {total_opened:>7}')
+        if pool:
+            self.stdout.write(f'{"":>16} pool: waits {pool["waits"]}, wait time {pool["wait_time"] * 1000:.0f} ms, '
+                              f'max wait {pool["max_wait_time"] * 1000:.1f} ms, timeouts {pool["timeouts"]}')
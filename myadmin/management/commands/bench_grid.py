@@ -0,0 +1,92 @@
+"""Contains custom commands for easy launch by manage.py."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import QueryDict
+
+from myadmin.grids import QuestionGrid, encode_cursor
+from questions.models import Question, QuestionCategory
+from users.models import MyUser
+
+
+class Rollback(Exception):
+    """Raised to roll back the generated rows at the end of the benchmark."""
+
+
+class Command(BaseCommand):
+    """A command comparing the pages of the admin panel lists (OFFSET and COUNT per page)
+    with the pages of the question grid (keyset pagination) on a large table of questions.
+
+    The questions are generated inside a transaction that is rolled back at the end,
+    unless --keep is passed.
+
+    Example:
+        python manage.py bench_grid --rows 500000
+    """
+    help = 'Compares OFFSET pagination with keyset pagination of the question grid'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000, help='the number of generated questions')
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--keep', action='store_true', help='keep the generated questions')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.generate(options['rows'])
+                self.measure(options['page_size'])
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write('The generated questions have been rolled back')
+
+    def generate(self, rows, batch_size=5000):
+        """Creates the category, the author and the questions of the benchmark."""
+        started = time.perf_counter()
+        category, _ = QuestionCategory.objects.get_or_create(name='bench_grid')
+        author = MyUser.objects.filter(username='bench_grid').first() or \
+            MyUser.objects.create_user(username='bench_grid', email='bench_grid@example.com')
+        levels = [choice for choice, _ in Question.DIFFICULTY_LEVEL_CHOICES]
+        for start in range(0, rows, batch_size):
+            Question.objects.bulk_create(
+                [Question(question=f'question {number}', subject=category, author=author,
+                          difficulty_level=levels[number % len(levels)], available=number % 2 == 0,
+                          tag=f'tag {number % 100}')
+                 for number in range(start, min(start + batch_size, rows))],
+                batch_size=batch_size)
+        self.stdout.write(f'{rows} questions generated in {time.perf_counter() - started:.1f}s')
+
+    @staticmethod
+    def timed(function, repeat=3):
+        """Returns the best time of several calls of the function, in milliseconds."""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def measure(self, page_size):
+        """Prints the time of the first, middle and last pages with both kinds of pagination,
+        sorted by the primary key and by a text column."""
+        grid = QuestionGrid()
+        total = Question.objects.count()
+        self.stdout.write(f'{"sort":>6} {"page":>8} {"offset, ms":>12} {"keyset, ms":>12}')
+        for sort in ('pk', 'tag'):
+            order = ['pk'] if sort == 'pk' else [sort, 'pk']
+            queryset = Question.objects.select_related('subject').order_by(*order)
+            for position, label in ((0, 'first'), (total // 2, 'middle'), (total - page_size, 'last')):
+                paginator = Paginator(queryset, page_size)
+                number = position // page_size + 1
+                offset_time = self.timed(lambda: list(paginator.page(number).object_list))
+
+                params = QueryDict(mutable=True)
+                params.update({'limit': page_size, 'sort': sort})
+                if position > 0:
+                    value, pk = queryset.values_list(sort, 'pk')[position - 1]
+                    params['cursor'] = encode_cursor([value, pk])
+                keyset_time = self.timed(lambda: grid.get_page(params))
+                self.stdout.write(f'{sort:>6} {label:>8} {offset_time:>12.1f} {keyset_time:>12.1f}')
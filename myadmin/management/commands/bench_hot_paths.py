@@ -0,0 +1,58 @@
+"""Contains custom commands for easy launch by manage.py."""
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from myadmin.benchmarks import BENCHMARKS, Dataset, environment, measure
+from myadmin.management.commands.bench_grid import Rollback
+
+
+class Command(BaseCommand):
+    """A command running the micro-benchmarks of the hot code paths (see myadmin/benchmarks.py)
+    against the synthetic data created by the generate_data command.
+
+    The changes made by the benchmarks (the scores of the answers, the saved post) are rolled back
+    at the end, their images are written to a temporary directory and their emails are not sent.
+    The results are printed and, with --json, written to a file to be compared
+    by the compare_benchmarks command.
+
+    Example:
+        python manage.py generate_data --users 100000 --questions 50000 --posts 10000
+        python manage.py bench_hot_paths --json baseline.json
+        python manage.py bench_hot_paths --json current.json --only question_set profile_rank
+    """
+    help = 'Runs the micro-benchmarks of the hot code paths against the synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='the benchmarks to run, all by default')
+        parser.add_argument('--repeat', type=int, default=7, help='the number of rounds of a benchmark')
+        parser.add_argument('--number', type=int, default=3, help='the number of calls per round')
+        parser.add_argument('--json', help='the file the results are written to')
+
+    def handle(self, *args, **options):
+        results = environment()
+        results['benchmarks'] = {}
+        try:
+            with transaction.atomic(), tempfile.TemporaryDirectory() as media, \
+                    override_settings(MEDIA_ROOT=media, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+                try:
+                    data = Dataset()
+                except LookupError:
+                    raise CommandError('Нет синтетических данных, создайте их командой generate_data')
+                self.stdout.write(f'{"benchmark":<24} {"median, ms":>11} {"min, ms":>9} {"stdev":>7} '
+                                  f'{"queries":>8}')
+                for name in options['only'] or BENCHMARKS:
+                    result = measure(BENCHMARKS[name](data), options['repeat'], options['number'])
+                    results['benchmarks'][name] = result
+                    self.stdout.write(f'{name:<24} {result["median"]:>11.2f} {result["min"]:>9.2f} '
+                                      f'{result["stdev"]:>7.2f} {result["queries"]:>8}')
+                raise Rollback
+        except Rollback:
+            pass
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'The results are written to {options["json"]}')
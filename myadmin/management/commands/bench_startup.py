@@ -0,0 +1,85 @@
+"""Contains custom commands for easy launch by manage.py."""
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+#: the code of the measured process: it loads the application the way a gunicorn worker does
+WORKER_CODE = '''
+import json, resource, time
+started = time.perf_counter()
+from interview_quiz.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({'seconds': time.perf_counter() - started,
+                  'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+'''
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s*(\S+)')
+
+
+def measure(env):
+    """Starts a process loading the application with ``-X importtime`` and returns its measurements.
+
+    Args:
+
+        * env (`dict`): the environment variables of the process.
+
+    Returns:
+
+        * dict: the load time (seconds), the peak RSS (megabytes) and the import time of every
+          top-level package (microseconds) - the sum of the own times of its modules.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', WORKER_CODE], env=env,
+                             capture_output=True, text=True)
+    if process.returncode:
+        raise CommandError(process.stderr.strip().splitlines()[-1])
+    packages = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            package = match.group(2).split('.')[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1))
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['packages'] = packages
+    return result
+
+
+class Command(BaseCommand):
+    """A command measuring the startup of a worker process: the time of loading the application
+    with its urls, the peak memory (RSS) of the process and the heaviest imported packages.
+    The measurement is made in new processes, by default both in the production
+    (DEBUG unset) and the development profile; with --budget the command fails
+    if the production startup is slower, so it can guard the import time in CI.
+
+    Example:
+        python manage.py bench_startup --repeat 5 --budget 2.5
+    """
+    help = 'Measures the import time and memory of a worker process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='the number of measured processes per profile')
+        parser.add_argument('--top', type=int, default=15, help='the number of listed packages')
+        parser.add_argument('--budget', type=float, help='the maximal production startup time, seconds')
+
+    def handle(self, *args, **options):
+        profiles = (('production', {'DEBUG': ''}), ('development', {'DEBUG': 'True'}))
+        production_seconds = None
+        for name, variables in profiles:
+            env = dict(os.environ, **variables)
+            runs = [measure(env) for _ in range(options['repeat'])]
+            best = min(runs, key=lambda run: run['seconds'])
+            self.stdout.write(f'{name}: {best["seconds"]:.2f}s (best of {len(runs)}), '
+                              f'RSS {max(run["rss_mb"] for run in runs):.0f} MB')
+            heaviest = sorted(best['packages'].items(), key=lambda item: item[1], reverse=True)
+            for package, microseconds in heaviest[:options['top']]:
+                self.stdout.write(f'    {package:<30} {microseconds / 1000:>8.1f} ms')
+            if name == 'production':
+                production_seconds = best['seconds']
+
+        if options['budget'] is not None and production_seconds > options['budget']:
+            raise CommandError(f'The production startup takes {production_seconds:.2f}s, '
+                               f'the budget is {options["budget"]:.2f}s')
@@ -0,0 +1,95 @@
+"""Contains custom commands for easy launch by manage.py."""
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from interview_quiz.db.keys import uuid7
+from myadmin.management.commands.bench_author_keys import index_size
+from myadmin.management.commands.bench_grid import Rollback
+from users.models import MyUser
+
+#: the compared generators of the primary keys of the users
+KEYS = (
+    ('uuid4', uuid.uuid4),
+    ('uuid7', uuid7),
+)
+
+
+def leaf_density(cursor, name):
+    """Returns the share of the leaf pages of the index filled with data, in percent,
+    or None when the database does not report it (PostgreSQL needs the pgstattuple extension)."""
+    try:
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT avg_leaf_density FROM pgstatindex(%s)', [name])
+            elif connection.vendor == 'sqlite':
+                cursor.execute("SELECT 100.0 * SUM(pgsize - unused) / SUM(pgsize) FROM dbstat "
+                               "WHERE name = %s AND pagetype = 'leaf'", [name])
+            else:
+                return None
+            return cursor.fetchone()[0]
+    except Exception:  # no pgstattuple or SQLite built without the dbstat table
+        return None
+
+
+class Command(BaseCommand):
+    """A command comparing random (uuid4) and time-ordered (uuid7) primary keys of the users:
+    the speed of the inserts of new users and the size and fill of the primary key index
+    and of the index of a foreign key referencing the users.
+
+    Every kind of key gets a table of users and a table of their activity (like questions
+    and posts) whose rows reference the recently registered users. The tables are created
+    inside a transaction that is rolled back at the end.
+
+    Example:
+        python manage.py bench_user_keys --users 5000000
+    """
+    help = 'Compares the insert speed and index bloat of uuid4 and uuid7 keys of the users'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000000, help='the number of inserted users')
+        parser.add_argument('--batch-size', type=int, default=1000, help='the number of users of an insert')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    self.stdout.write(f'{"key":>6} {"users/s":>9} {"pk index, MiB":>14} {"pk fill, %":>11} '
+                                      f'{"fk index, MiB":>14} {"fk fill, %":>11}')
+                    for name, generate in KEYS:
+                        self.measure(cursor, name, generate, options['users'], options['batch_size'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('The generated tables have been rolled back')
+
+    def measure(self, cursor, name, generate, users, batch_size):
+        """Inserts the users with the keys of the generator and their activity,
+        and prints the speed of the inserts and the statistics of the indexes."""
+        key_type = MyUser._meta.pk.db_type(connection)
+        prepare = MyUser._meta.pk.get_db_prep_value
+        table, refs = f'bench_user_keys_{name}', f'bench_user_refs_{name}'
+        cursor.execute(f'CREATE TABLE {table} (id {key_type} PRIMARY KEY, number integer NOT NULL)')
+        cursor.execute(f'CREATE TABLE {refs} (id integer PRIMARY KEY, user_id {key_type} NOT NULL)')
+        cursor.execute(f'CREATE INDEX {refs}_idx ON {refs} (user_id)')
+
+        recent, elapsed = [], 0
+        for start in range(0, users, batch_size):
+            keys = [prepare(generate(), connection) for _ in range(start, min(start + batch_size, users))]
+            started = time.perf_counter()
+            cursor.executemany(f'INSERT INTO {table} (id, number) VALUES (%s, %s)',
+                               [(key, start + offset) for offset, key in enumerate(keys)])
+            elapsed += time.perf_counter() - started
+            recent = (recent + keys)[-10 * batch_size:]
+            cursor.executemany(f'INSERT INTO {refs} (id, user_id) VALUES (%s, %s)',
+                               [(start + offset, random.choice(recent)) for offset in range(len(keys))])
+
+        pk_index = f'{table}_pkey' if connection.vendor == 'postgresql' else f'sqlite_autoindex_{table}_1'
+        row = [f'{users / elapsed:>9.0f}']
+        for index in (pk_index, f'{refs}_idx'):
+            size, density = index_size(cursor, index), leaf_density(cursor, index)
+            row.append(f'{"n/a" if size is None else f"{size / 1024 / 1024:.1f}":>14}')
+            row.append(f'{"n/a" if density is None else f"{density:.0f}":>11}')
+        self.stdout.write(f'{name:>6} ' + ' '.join(row))
@@ -0,0 +1,19 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.core.management.base import BaseCommand
+
+from interview_quiz.api_views import build_schemas, get_schema_version
+
+
+class Command(BaseCommand):
+    """A command generating the OpenAPI schema of the REST api for the current version of the code.
+    It is run at deploy after collectstatic, so no request has to wait for the generation.
+
+    Example:
+        python manage.py build_openapi_schema
+    """
+    help = 'Generates the OpenAPI schema files of the current version of the code'
+
+    def handle(self, *args, **options):
+        for path in build_schemas():
+            self.stdout.write(f'{path}')
+        self.stdout.write(self.style.SUCCESS(f'The schema of version {get_schema_version()} is built'))
@@ -0,0 +1,57 @@
+"""Contains custom commands for easy launch by manage.py."""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myadmin.benchmarks import METRICS, compare
+
+
+def read_results(path):
+    """Returns the results of the benchmarks written to the file by the bench_hot_paths command."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError) as error:
+        raise CommandError(f'Не удалось прочитать результаты {path}: {error}')
+
+
+class Command(BaseCommand):
+    """A command comparing the results of the micro-benchmarks of the hot code paths with a baseline
+    (see the bench_hot_paths command). It fails when the time of a benchmark has grown by more
+    than the threshold or it makes more database queries, so it can guard the hot paths in CI.
+    The results are comparable only on the same machine and the same synthetic data,
+    a different size of the data is reported.
+
+    Example:
+        python manage.py compare_benchmarks current.json baseline.json --threshold 40 --metric median
+    """
+    help = 'Compares the results of the micro-benchmarks with a baseline and fails on a regression'
+
+    def add_arguments(self, parser):
+        parser.add_argument('results', help='the file of the current results')
+        parser.add_argument('baseline', help='the file of the baseline results')
+        parser.add_argument('--threshold', type=float, default=25, help='the allowed growth of the time, percent')
+        parser.add_argument('--metric', choices=METRICS, default='min',
+                            help='the compared time, the minimum is the least disturbed by the other processes')
+
+    def handle(self, *args, **options):
+        results, baseline = read_results(options['results']), read_results(options['baseline'])
+        if results.get('dataset') != baseline.get('dataset'):
+            self.stdout.write(self.style.WARNING(
+                f'The data differs: {results.get("dataset")} and {baseline.get("dataset")} in the baseline'))
+        rows = compare(results, baseline, options['threshold'], options['metric'])
+        self.stdout.write(f'{"benchmark":<24} {"baseline, ms":>13} {"current, ms":>12} {"change":>8} '
+                          f'{"queries":>9}')
+        for row in rows:
+            if row['baseline'] is None:
+                self.stdout.write(f'{row["name"]:<24} {"-":>13} {row["current"]:>12.2f} {"new":>8} '
+                                  f'{row["queries"]:>9}')
+                continue
+            line = f'{row["name"]:<24} {row["baseline"]:>13.2f} {row["current"]:>12.2f} {row["change"]:>+7.1f}% ' \
+                   f'{row["baseline_queries"]:>4} → {row["queries"]:<4}'
+            self.stdout.write(self.style.ERROR(line) if row['regressed'] else line)
+        regressed = [row['name'] for row in rows if row['regressed']]
+        if regressed:
+            raise CommandError(f'Регрессия производительности: {", ".join(regressed)} '
+                               f'(порог {options["threshold"]:g}%)')
+        self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,43 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+
+from interview_quiz.db.author_keys import drop_author_username
+from myadmin.management.commands.backfill_author_keys import MODELS
+
+
+class Command(BaseCommand):
+    """A command dropping the sync triggers and the old username columns of the authors of questions
+    and posts, the last step of the migration of the authors to the primary keys of the users
+    (see interview_quiz/db/author_keys.py). The columns are still read and written by the workers
+    of the previous release, so the command is run after a rolling deploy, once they have all stopped:
+
+        python manage.py migrate
+        # the workers of the previous release are stopped
+        python manage.py drop_author_usernames
+
+    On SQLite the old columns have already been dropped by the migrations.
+
+    Example:
+        python manage.py drop_author_usernames --database default
+    """
+    help = 'Drops the old username columns of the authors of questions and posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        loader = MigrationLoader(connection)
+        for app, model_name, _, switched in MODELS:
+            if (app, switched) not in loader.applied_migrations:
+                raise CommandError(f'Сначала примените миграцию {app}.{switched}')
+        if connection.vendor != 'postgresql':
+            self.stdout.write('The old columns have been dropped by the migrations')
+            return
+        for app, model_name, _, _ in MODELS:
+            with connection.schema_editor() as schema_editor:
+                drop_author_username(f'{app}.{model_name}')(apps, schema_editor)
+            self.stdout.write(self.style.SUCCESS(f'{app}.{model_name}: the old author column has been dropped'))
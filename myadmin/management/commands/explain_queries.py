@@ -0,0 +1,65 @@
+"""Contains custom commands for easy launch by manage.py."""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from myadmin.hot_queries import HOT_QUERIES
+
+#: the lines of the plans reading a whole table: PostgreSQL and SQLite ("SCAN x", but not "SCAN x USING INDEX")
+SEQ_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)'),
+}
+
+
+def seq_scans(plan, vendor):
+    """Returns the tables read sequentially by the plan of the query."""
+    pattern = SEQ_SCAN.get(vendor)
+    return [] if pattern is None else sorted(set(pattern.findall(plan)))
+
+
+class Command(BaseCommand):
+    """A command showing the plans of the hot queries of the site (see myadmin/hot_queries.py)
+    and flagging the ones reading whole tables.
+
+    On a small database PostgreSQL prefers sequential scans even when there is a suitable index,
+    so by default the plans are made with sequential scans disabled: a query still scanning a table
+    has no index it could use. Pass --planner-choice on a database of production size to see
+    the plans chosen for its data.
+
+    Example:
+        python manage.py explain_queries --strict
+    """
+    help = 'Shows the plans of the hot queries and flags sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', action='append', default=[], help='the name of a query, may be repeated')
+        parser.add_argument('--analyze', action='store_true', help='run the queries (PostgreSQL only)')
+        parser.add_argument('--planner-choice', action='store_true',
+                            help='do not disable sequential scans (PostgreSQL only)')
+        parser.add_argument('--strict', action='store_true', help='fail if any query reads a whole table')
+
+    def handle(self, *args, **options):
+        unknown = set(options['only']) - {name for name, _, _ in HOT_QUERIES}
+        if unknown:
+            raise CommandError(f'Неизвестные запросы: {", ".join(sorted(unknown))}')
+        postgresql = connection.vendor == 'postgresql'
+        flagged = []
+        for name, place, query in HOT_QUERIES:
+            if options['only'] and name not in options['only']:
+                continue
+            with transaction.atomic():
+                if postgresql and not options['planner_choice']:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_seqscan = off')
+                plan = query().explain(analyze=True) if options['analyze'] and postgresql else query().explain()
+            tables = seq_scans(plan, connection.vendor)
+            status = self.style.ERROR(f'SEQ SCAN: {", ".join(tables)}') if tables else self.style.SUCCESS('OK')
+            self.stdout.write(f'{name:<28} {status}  ({place})')
+            if tables or options['verbosity'] > 1:
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+            if tables:
+                flagged.append(name)
+        if flagged and options['strict']:
+            raise CommandError(f'Запросы читают таблицы целиком: {", ".join(flagged)}')
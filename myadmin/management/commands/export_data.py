@@ -0,0 +1,50 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from api_rest.api import QuestionCategoryViewSet, QuestionViewSet, PostViewSet, UserViewSet
+from api_rest.exports import EXPORT_CONTENT_TYPES, export_rows
+
+#: the sets of api views whose querysets, filters and exported fields are used by the command
+EXPORTS = {
+    'categories': QuestionCategoryViewSet,
+    'questions': QuestionViewSet,
+    'posts': PostViewSet,
+    'users': UserViewSet,
+}
+
+
+class Command(BaseCommand):
+    """A command for streaming export of categories, questions, posts or users in CSV or NDJSON format.
+    The same fields and filters as in the export of the api are used.
+
+    Example:
+        python manage.py export_data questions --format ndjson --filter available=true -o questions.ndjson
+    """
+    help = 'Exports objects to a CSV or NDJSON file without loading the whole table into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(EXPORT_CONTENT_TYPES), default='csv',
+                            dest='file_format')
+        parser.add_argument('--filter', action='append', default=[], metavar='NAME=VALUE',
+                            help='a filter of the api filterset, can be repeated')
+        parser.add_argument('-o', '--output', help='the file to write, by default stdout')
+
+    def handle(self, *args, **options):
+        viewset = EXPORTS[options['content']]
+        filters = QueryDict(mutable=True)
+        for item in options['filter']:
+            name, _, value = item.partition('=')
+            filters.appendlist(name, value)
+        filterset = viewset.filterset_class(data=filters, queryset=viewset.queryset.all())
+        if not filterset.is_valid():
+            raise CommandError(filterset.errors.as_text())
+
+        lines = export_rows(filterset.qs, viewset.export_fields, options['file_format'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
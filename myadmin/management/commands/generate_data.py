@@ -0,0 +1,163 @@
+"""Contains custom commands for easy launch by manage.py."""
+import random
+import time
+from datetime import date
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.timezone import localdate
+
+from interview_quiz.versions import bump_version
+from myadmin.models import StatCounter
+from myadmin.stats import ANSWERS, reconcile, replace_counters
+from myadmin.synthetic import Generator, SYNTHETIC_DOMAIN, SYNTHETIC_MARK, hashed_password, make_images
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+
+def batches(objects, size):
+    """Yields the lists of at most the given number of the objects."""
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, size))
+        if not batch:
+            return
+        yield batch
+
+
+def next_pk(model):
+    """Returns the primary key following the largest existing one."""
+    return (model.objects.aggregate(largest=Max('pk'))['largest'] or 0) + 1
+
+
+def synthetic_querysets():
+    """Returns the generated objects in the order of their deletion: the content before the users and categories."""
+    users = MyUser.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}')
+    return (Question.objects.filter(author__in=users), Post.objects.filter(author__in=users), users,
+            QuestionCategory.objects.filter(description__startswith=SYNTHETIC_MARK))
+
+
+class Command(BaseCommand):
+    """A command generating synthetic data for testing the site at scale (see myadmin/synthetic.py):
+    categories, questions with answers and tags, posts with Russian text and users with the scores
+    of their simulated answers. The numbers of the answers by days are added to the dashboard.
+
+    The objects are created with ``bulk_create``, one transaction per batch, without the model
+    signals; the counters of the dashboard are reconciled and the cached data is invalidated
+    at the end. The same seed and the same last day give the same data. All generated users
+    have the password ``myadmin.synthetic.PASSWORD``. The simulated answers stay in the counters
+    of the dashboard when the data is replaced, as the answers of deleted users do.
+
+    The users can log in with the known password, so the command runs only with DEBUG=True,
+    unless --allow-production is passed for a staging database.
+
+    Example:
+        python manage.py generate_data --users 1000000 --questions 500000 --posts 100000 --seed 7
+        python manage.py generate_data --replace --images 16
+    """
+    help = 'Generates synthetic categories, questions, posts and users for testing the site at scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--questions', type=int, default=20000)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=100,
+                            help='the number of the first users who are the authors of the questions and posts')
+        parser.add_argument('--days', type=int, default=365, help='the number of days the data is spread over')
+        parser.add_argument('--until', type=date.fromisoformat, default=localdate(),
+                            help='the last day of the data, YYYY-MM-DD, today by default')
+        parser.add_argument('--seed', type=int, default=1, help='the seed of the random data')
+        parser.add_argument('--images', type=int, default=0,
+                            help='the number of the placeholder images of the categories, questions and posts')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--replace', action='store_true', help='delete the previously generated data first')
+        parser.add_argument('--allow-production', action='store_true',
+                            help='run with DEBUG=False: the users with the known password can log in to the site')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['allow_production']:
+            raise CommandError('Синтетические данные создаются только при DEBUG=True, '
+                               'для другой базы укажите --allow-production')
+        if (options['questions'] or options['posts']) and not (options['users'] and options['categories']):
+            raise CommandError('Для вопросов и статей нужны пользователи (--users) и категории (--categories)')
+        if options['replace']:
+            self.delete(options['batch_size'])
+        elif synthetic_querysets()[2].exists():
+            raise CommandError('Синтетические данные уже созданы, используйте --replace для их замены')
+
+        generator = Generator(random.Random(options['seed']), options['until'], options['days'],
+                              make_images(options['images']) if options['images'] else ())
+        batch_size = options['batch_size']
+
+        authors = []
+        users = generator.users(options['users'], hashed_password(options['seed']))
+        self.insert(MyUser, users, batch_size,
+                    collect=lambda batch: authors.extend(user.pk for user in batch[:options['authors'] - len(authors)]))
+        categories = []
+        self.insert(QuestionCategory, generator.categories(options['categories'], next_pk(QuestionCategory)),
+                    batch_size, collect=lambda batch: categories.extend((item.pk, item.name) for item in batch))
+        self.insert(Question, generator.questions(options['questions'], next_pk(Question), categories, authors),
+                    batch_size)
+        self.insert(Post, generator.posts(options['posts'], next_pk(Post), categories, authors), batch_size,
+                    keep=('created_on',))
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [QuestionCategory, Question, Post]):
+                cursor.execute(sql)
+        answers = dict(StatCounter.objects.filter(name=ANSWERS).values_list('key', 'value'))
+        for day, number in generator.answer_counts().items():
+            answers[day] = answers.get(day, 0) + number
+        replace_counters(ANSWERS, answers)
+        reconcile()
+        for model in (MyUser, QuestionCategory, Question, Post):
+            bump_version(model)
+        self.stdout.write(self.style.SUCCESS(f'{sum(generator.answers.values())} answers are simulated'))
+
+    def insert(self, model, objects, batch_size, keep=(), collect=None):
+        """Creates the objects in batches, one transaction per batch.
+
+        Args:
+
+            * model (`Model`): the model of the objects;
+            * objects (`iterable`): the objects, made lazily;
+            * batch_size (`int`): the number of objects created by one transaction;
+            * keep (`tuple`, optional): the auto_now_add fields whose generated values are written
+              back after ``bulk_create`` has replaced them with the current time;
+            * collect (`callable`, optional): called with every created batch.
+        """
+        started = time.perf_counter()
+        created = 0
+        for batch in batches(objects, batch_size):
+            values = [[getattr(obj, name) for name in keep] for obj in batch]
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+                if keep:
+                    for obj, kept in zip(batch, values):
+                        for name, value in zip(keep, kept):
+                            setattr(obj, name, value)
+                    model.objects.bulk_update(batch, keep)
+            if collect is not None:
+                collect(batch)
+            created += len(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'{model._meta.label}: {created} created in {elapsed:.1f}s'
+                          f'{f" ({created / elapsed:.0f} per second)" if created else ""}')
+
+    def delete(self, batch_size):
+        """Deletes the previously generated data in batches, so the deleted objects never fill the memory."""
+        for queryset in synthetic_querysets():
+            deleted = 0
+            while True:
+                pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                with transaction.atomic():
+                    queryset.model.objects.filter(pk__in=pks).delete()
+                deleted += len(pks)
+            self.stdout.write(f'{queryset.model._meta.label}: {deleted} deleted')
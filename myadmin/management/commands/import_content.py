@@ -0,0 +1,40 @@
+"""Contains custom commands for easy launch by manage.py."""
+import zipfile
+from django.core.management.base import BaseCommand, CommandError
+
+from myadmin.importers import IMPORTERS, ImportFileError, guess_format
+
+
+class Command(BaseCommand):
+    """A command for bulk import of questions or posts from a CSV or JSONL file.
+
+    Example:
+        python manage.py import_content questions questions.csv --archive images.zip
+    """
+    help = 'Imports questions or posts from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='CSV or JSONL file with the rows')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), dest='file_format',
+                            help='the format of the file, by default it is guessed by the extension')
+        parser.add_argument('--archive', help='zip archive with the images named in the rows')
+        parser.add_argument('--author', help='username of the author of rows without the "author" column')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='the number of workers processing the images')
+
+    def handle(self, *args, **options):
+        file_format = options['file_format'] or guess_format(options['path'])
+        try:
+            with open(options['path'], encoding='utf-8', newline='') as stream:
+                # the archive is opened by the importer, so a missing or broken one is reported here too
+                importer = IMPORTERS[options['content']](author=options['author'], archive=options['archive'],
+                                                         batch_size=options['batch_size'],
+                                                         workers=options['workers'])
+                result = importer.run(stream, file_format)
+        except (OSError, zipfile.BadZipFile, ImportFileError) as e:
+            raise CommandError(e)
+        for line_num, error in result.errors:
+            self.stderr.write(f'{line_num}: {error}')
+        self.stdout.write(self.style.SUCCESS(str(result)))
@@ -0,0 +1,224 @@
+"""Contains custom commands for easy launch by manage.py."""
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myadmin.journeys.client import VirtualUser, StepFailed
+from myadmin.journeys.memcached import MemcachedStandIn
+from myadmin.journeys.report import summarize, compare, read_csv, write_csv, write_html
+from myadmin.journeys.scenarios import SCENARIOS, STEPS, Plan, get_pools, users_of_runs
+from myadmin.stats import reconcile
+
+#: the committed result of the load test the runs are compared with
+BASELINE = settings.BASE_DIR / 'myadmin' / 'journeys' / 'baseline.csv'
+
+#: the commands starting the local server, the port is added to them
+SERVERS = {
+    'runserver': lambda port: [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+    'gunicorn': lambda port: [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                              '--bind', f'127.0.0.1:{port}'],
+}
+
+
+def free_port():
+    """Returns a free local port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_scenario(value):
+    """Returns the name and the weight of a scenario given as name[:weight]."""
+    name, _, weight = value.partition(':')
+    if name not in SCENARIOS:
+        raise CommandError(f'Неизвестный сценарий {name}, доступны: {", ".join(SCENARIOS)}')
+    try:
+        return name, int(weight or 1)
+    except ValueError:
+        raise CommandError(f'Некорректный вес сценария {value}')
+
+
+class Command(BaseCommand):
+    """A command running the load test of the user journeys: virtual users with their own sessions
+    go through the scripted scenarios (see myadmin/journeys/scenarios.py) until the time is over:
+
+        * journey - registration, verification of the profile, a test and the top of the users;
+        * quiz - login of a prepared user, a test and the top of the users;
+        * browse - the pages of an anonymous visitor.
+
+    The site is either a running one given by its address, or a local server started by the command
+    (runserver or gunicorn) with the environment of the command, so it uses the same database,
+    SQLite or Postgres, and a stand-in of memcached (see myadmin/journeys/memcached.py). The command
+    reads the activation keys of the registered users from the database, so it must share
+    the database with the site. The users of the run are deleted at the end.
+
+    The throughput and the latency percentiles of every step are printed, written to the CSV
+    and HTML reports and compared with the committed baseline: the command fails if the p95 of
+    a step has grown more than allowed. The committed baseline was recorded with runserver, SQLite
+    and DEBUG=True, compare with it only the runs made under the same conditions::
+
+        python manage.py loadtest_journeys --serve runserver --users 10 --duration 180 --think 0.5 \\
+            --random-seed 1 --save-baseline
+
+    Example:
+        python manage.py loadtest_journeys --serve runserver --prepare --users 20 --duration 60 \\
+            --scenario journey:1 --scenario quiz:3 --csv journeys.csv --html journeys.html
+    """
+    help = 'Runs the load test of the user journeys with reports and a comparison with the baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?', help='the address of a running site, for example http://127.0.0.1:8000')
+        parser.add_argument('--serve', choices=SERVERS, help='start a local server with a stand-in of memcached')
+        parser.add_argument('--prepare', action='store_true', help='migrate the database and load the fixtures')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='a scenario with its weight, name[:weight], may be repeated '
+                                 '(by default journey:1, quiz:2, browse:1)')
+        parser.add_argument('--users', type=int, default=10, help='the number of virtual users')
+        parser.add_argument('--duration', type=float, default=60, help='the duration of the test, seconds')
+        parser.add_argument('--ramp-up', type=float, default=0, help='the time of starting all users, seconds')
+        parser.add_argument('--think', type=float, default=1, help='the mean pause between the steps, seconds')
+        parser.add_argument('--answers', type=int, default=5, help='the maximum number of answers of a test')
+        parser.add_argument('--timeout', type=float, default=30, help='the time limit of a request, seconds')
+        parser.add_argument('--random-seed', type=int, help='the seed of the random choices of the users')
+        parser.add_argument('--csv', help='the path of the CSV report')
+        parser.add_argument('--html', help='the path of the HTML report')
+        parser.add_argument('--baseline', default=str(BASELINE), help='the CSV report the run is compared with')
+        parser.add_argument('--tolerance', type=float, default=50, help='the allowed growth of p95, percent')
+        parser.add_argument('--save-baseline', action='store_true', help='write the result as the new baseline')
+        parser.add_argument('--keep-users', action='store_true', help='do not delete the users of the run')
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == bool(options['serve']):
+            raise CommandError('Укажите адрес работающего сайта или --serve')
+        scenarios = [parse_scenario(value) for value in options['scenarios'] or ('journey:1', 'quiz:2', 'browse:1')]
+        if options['random_seed'] is not None:
+            random.seed(options['random_seed'])
+        if options['prepare']:
+            call_command('migrate', interactive=False, verbosity=0)
+            call_command('seed', stdout=self.stdout)
+        pools = get_pools()
+        if not pools:
+            raise CommandError('Нет доступных вопросов: загрузите данные (manage.py seed) или используйте --prepare')
+
+        stop = threading.Event()
+        plan = Plan(secrets.token_hex(3), pools, options['answers'], options['think'], stop)
+        server = memcached = None
+        try:
+            if any(name == 'quiz' for name, _ in scenarios):
+                plan.create_accounts(options['users'])
+            if options['serve']:
+                memcached = MemcachedStandIn()
+                port = free_port()
+                server = self.start_server(options['serve'], port, memcached.start())
+                url = f'http://127.0.0.1:{port}'
+            else:
+                url = options['url']
+            started = datetime.now()
+            results, elapsed = self.run(urlsplit(url), plan, scenarios, options)
+        finally:
+            stop.set()
+            if server is not None:
+                server.terminate()
+                server.wait(30)
+            if memcached is not None:
+                memcached.stop()
+            if not options['keep_users']:
+                users_of_runs().delete()
+            # the prepared users are created in bulk, without the signals updating the counters
+            reconcile()
+
+        self.report(results, elapsed, url, started, scenarios, options)
+
+    def start_server(self, name, port, memcached):
+        """Starts the local server with the stand-in of memcached and waits until it answers."""
+        environment = {**os.environ, 'MEMCACHED_LOCATION': memcached,
+                       'EMAIL_BACKEND': 'django.core.mail.backends.dummy.EmailBackend'}
+        server = subprocess.Popen(SERVERS[name](port), cwd=settings.BASE_DIR, env=environment,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Сервер {name} завершился с кодом {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                self.stdout.write(f'{name} is listening on 127.0.0.1:{port}, memcached stand-in on {memcached}')
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'Сервер {name} не запустился за минуту')
+
+    def run(self, url, plan, scenarios, options):
+        """Runs the virtual users until the time is over and returns the results of their requests and the duration."""
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError(f'Некорректный адрес сайта: {url.geturl()}')
+        address = (url.hostname, url.port or 80)
+        names, weights = zip(*scenarios)
+        results = []
+        deadline = time.monotonic() + options['ramp_up'] + options['duration']
+
+        def user(number):
+            plan.stop.wait(options['ramp_up'] * number / options['users'])
+            while time.monotonic() < deadline and not plan.stop.is_set():
+                # every scenario is run by a new visitor, with its own connection and cookies
+                visitor = VirtualUser(address, results, options['timeout'])
+                try:
+                    SCENARIOS[random.choices(names, weights)[0]](visitor, plan)
+                except StepFailed:
+                    pass
+                finally:
+                    visitor.close()
+            connection.close()
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=user, args=(number,), daemon=True) for number in range(options['users'])]
+        for thread in threads:
+            thread.start()
+        timer = threading.Timer(max(0, deadline - time.monotonic()), plan.stop.set)
+        timer.daemon = True
+        timer.start()
+        for thread in threads:
+            thread.join()
+        timer.cancel()
+        return results, time.monotonic() - started
+
+    def report(self, results, elapsed, url, started, scenarios, options):
+        """Prints the result of the run, writes its reports and compares it with the baseline."""
+        rows = summarize(results, elapsed, STEPS)
+        baseline = options['baseline'] if options['baseline'] and os.path.exists(options['baseline']) else None
+        regressions = compare(rows, read_csv(baseline), options['tolerance']) if baseline else []
+
+        self.stdout.write(f'{options["users"]} users, {elapsed:.1f}s, {url}')
+        self.stdout.write(f'{"step":<18} {"requests":>9} {"errors":>7} {"rps":>8} {"p50":>8} {"p90":>8} '
+                          f'{"p95":>8} {"p99":>8} {"max":>8} {"vs base":>8}')
+        for row in rows:
+            change = f'{row["change"]:+.0f}%' if 'change' in row else '-'
+            self.stdout.write(f'{row["step"]:<18} {row["requests"]:>9} {row["errors"]:>7} {row["rps"]:>8.2f} '
+                              f'{row["p50"]:>8.1f} {row["p90"]:>8.1f} {row["p95"]:>8.1f} {row["p99"]:>8.1f} '
+                              f'{row["max"]:>8.1f} {change:>8}')
+        if options['csv']:
+            write_csv(options['csv'], rows)
+        if options['html']:
+            write_html(options['html'], {
+                'rows': rows, 'regressions': regressions, 'url': url, 'started': started, 'elapsed': elapsed,
+                'users': options['users'], 'think': options['think'], 'scenarios': scenarios,
+                'baseline': baseline, 'tolerance': options['tolerance'],
+            })
+        if options['save_baseline']:
+            write_csv(options['baseline'], rows)
+            self.stdout.write(f'The baseline is saved to {options["baseline"]}')
+        elif regressions:
+            raise CommandError('Рост p95 выше допустимого: ' + ', '.join(
+                f'{row["step"]} {row["baseline_p95"]:.1f} -> {row["p95"]:.1f} ms' for row in regressions))
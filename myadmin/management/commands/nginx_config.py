@@ -0,0 +1,104 @@
+"""Contains custom commands for easy launch by manage.py."""
+from string import Template
+
+from django.core.management.base import BaseCommand
+
+NGINX_CONFIG = Template('''# Generated by "python manage.py nginx_config$options", do not edit by hand.
+
+upstream interview_quiz {
+    server web:8000;
+}
+
+server {
+
+    listen 80;
+    location = /favicon.ico { access_log off; log_not_found off; }
+
+    # compression of the dynamic pages and api responses
+    gzip on;
+    gzip_proxied any;
+    gzip_comp_level 5;
+    gzip_min_length $min_length;
+    gzip_types text/css application/javascript application/json text/csv application/x-ndjson image/svg+xml;
+    gzip_vary on;
+$brotli
+    location / {
+        proxy_pass http://interview_quiz;
+        proxy_set_header X-Forwarded-For $$proxy_add_x_forwarded_for;
+        proxy_set_header Host $$host;
+        proxy_redirect off;
+    }
+
+    # the metrics are scraped from the workers directly, not through the public server
+    location = /metrics {
+        return 404;
+    }
+
+    # files with the hash of the content in the name never change
+    location ~ "^$static_url(?<static_path>.+\\.[0-9a-f]{12}\\.\\w+)$$" {
+        alias $static_root/$$static_path;
+        gzip_static on;$brotli_static
+        add_header Cache-Control "public, max-age=31536000, immutable";
+        access_log off;
+    }
+    location $static_url {
+        alias $static_root/;
+        gzip_static on;$brotli_static
+        add_header Cache-Control "public, max-age=3600";
+    }
+    location /media/ {
+        alias $media_root/;
+        add_header Cache-Control "public, max-age=86400";
+    }
+
+}
+''')
+
+BROTLI = '''
+    brotli on;
+    brotli_comp_level 5;
+    brotli_min_length $min_length;
+    brotli_types text/css application/javascript application/json text/csv application/x-ndjson image/svg+xml;
+'''
+
+
+class Command(BaseCommand):
+    """A command that generates the configuration of nginx serving the site.
+
+    The static files collected with the hashed names are served with caching for a year
+    and their precompressed copies (see interview_quiz/storage.py); the responses of django
+    larger than the threshold are compressed on the fly. The brotli directives need
+    the ngx_brotli module loaded in the main configuration of nginx, which the official
+    nginx image does not have, so they are added only with --brotli.
+
+    Example:
+        python manage.py nginx_config --output nginx/nginx.conf
+    """
+    help = 'Generates the nginx configuration with caching and compression of static files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='the file to write, by default the configuration is printed')
+        parser.add_argument('--brotli', action='store_true', help='enable the ngx_brotli module')
+        parser.add_argument('--min-length', type=int, default=1024,
+                            help='the minimal size of a compressed response, bytes')
+        parser.add_argument('--static-root', default='/home/interview_quiz/web/staticfiles')
+        parser.add_argument('--media-root', default='/home/interview_quiz/web/media')
+        parser.add_argument('--static-url', default='/static/')
+
+    def handle(self, *args, **options):
+        min_length = options['min_length']
+        config = NGINX_CONFIG.substitute(
+            options=' --brotli' if options['brotli'] else '',
+            brotli=Template(BROTLI).substitute(min_length=min_length) if options['brotli'] else '',
+            brotli_static='\n        brotli_static on;' if options['brotli'] else '',
+            min_length=min_length,
+            static_url=options['static_url'],
+            static_root=options['static_root'].rstrip('/'),
+            media_root=options['media_root'].rstrip('/'),
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(config)
+            self.stdout.write(self.style.SUCCESS(f'The configuration is written to {options["output"]}'))
+        else:
+            self.stdout.write(config, ending='')
@@ -0,0 +1,41 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from interview_quiz.db import queries
+
+
+class Command(BaseCommand):
+    """A command showing the database queries of the requests grouped by their fingerprints
+    and the slowest of them (see interview_quiz/db/queries.py).
+
+    The statistics are collected by the gunicorn workers started with QUERY_STATS=1
+    and read from their files in ``settings.METRICS_DIR``;
+    the times are in milliseconds, p95 is the upper bound of the range of time of 95% of the queries.
+
+    Example:
+        python manage.py query_report --top 10 --sort p95
+    """
+    help = 'Shows the database queries of the requests grouped by their fingerprints and the slowest of them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.METRICS_DIR, help='the directory of the metrics of the workers')
+        parser.add_argument('--top', type=int, default=20, help='the number of the shown fingerprints')
+        parser.add_argument('--sort', choices=queries.SORT_BY, default='total')
+        parser.add_argument('--samples', type=int, default=10, help='the number of the shown slow queries')
+
+    def handle(self, *args, **options):
+        if not options['dir']:
+            self.stdout.write('Каталог метрик не задан, показана статистика только этого процесса')
+        rows, samples = queries.report(queries.load(options['dir']), options['sort'], options['top'],
+                                       options['samples'])
+        self.stdout.write(f'{"count":>8} {"total":>10} {"mean":>8} {"p95":>8}  fingerprint')
+        for row in rows:
+            self.stdout.write(f'{row["count"]:>8} {row["total"]:>10.1f} {row["mean"]:>8.2f} {row["p95"]:>8.2f}  '
+                              f'{row["fingerprint"]}')
+            self.stdout.write(f'{"":>38}  {row["view"]} at {row["location"]}')
+        if samples:
+            self.stdout.write(f'\nThe slowest queries (from {settings.SLOW_QUERY_MS:g} ms):')
+        for sample in samples:
+            self.stdout.write(f'{sample["duration"]:>8.1f}  {sample["fingerprint"]}\n'
+                              f'{"":>8}  {sample["view"]} at {sample["location"]}')
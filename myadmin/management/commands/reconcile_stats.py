@@ -0,0 +1,18 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.core.management.base import BaseCommand
+
+from myadmin.stats import reconcile
+
+
+class Command(BaseCommand):
+    """A command that recomputes the counters of the admin panel dashboard from the tables.
+    It is run periodically to correct the counters after bulk queries, which do not send signals.
+
+    Example:
+        python manage.py reconcile_stats
+    """
+    help = 'Recomputes the materialised statistics of the admin panel dashboard'
+
+    def handle(self, *args, **options):
+        reconcile()
+        self.stdout.write(self.style.SUCCESS('Statistics reconciled'))
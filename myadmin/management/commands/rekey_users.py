@@ -0,0 +1,106 @@
+"""Contains custom commands for easy launch by manage.py."""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.timezone import now
+
+from interview_quiz.db.keys import BATCH_SIZE, rekey
+from interview_quiz.versions import bump_version
+from users.models import MyUser
+
+
+def index_sessions(using, since=None):
+    """Returns the keys of the unexpired sessions kept in the database by the keys of their users,
+    decoding every session once.
+
+    Args:
+
+        * using (`str`): the alias of the database;
+        * since (`datetime`, optional): only the sessions saved after this time are read
+          (their expiry is set to ``settings.SESSION_COOKIE_AGE`` from the time of saving).
+
+    Returns:
+
+        * defaultdict: the sets of the keys of the sessions by the keys of the users (strings).
+    """
+    expire = now() if since is None else since + timedelta(seconds=settings.SESSION_COOKIE_AGE)
+    index = defaultdict(set)
+    for session in Session.objects.using(using).filter(expire_date__gt=expire).iterator():
+        user = session.get_decoded().get(SESSION_KEY)
+        if user is not None:
+            index[user].add(session.pk)
+    return index
+
+
+def rekey_sessions(keys, index, using):
+    """Replaces the old keys of the users in their sessions found by the index,
+    so the re-keyed users stay logged in. Only the sessions of the re-keyed users are read.
+
+    Args:
+
+        * keys (`dict`): the new keys of the users by their old ones;
+        * index (`dict`): the keys of the sessions by the keys of the users (see ``index_sessions``),
+          the re-keyed users are removed from it;
+        * using (`str`): the alias of the database.
+
+    Returns:
+
+        * int: the number of changed sessions.
+    """
+    keys = {str(old): str(new) for old, new in keys.items()}
+    session_keys = set().union(*(index.pop(old, ()) for old in keys))
+    store = Session.get_session_store_class()()
+    changed = 0
+    for session in Session.objects.using(using).filter(pk__in=session_keys, expire_date__gt=now()):
+        data = session.get_decoded()
+        if data.get(SESSION_KEY) in keys:
+            data[SESSION_KEY] = keys[data[SESSION_KEY]]
+            Session.objects.using(using).filter(pk=session.pk).update(session_data=store.encode(data))
+            changed += 1
+    return changed
+
+
+class Command(BaseCommand):
+    """A command replacing the random primary keys of the existing users by time-ordered ones
+    (see interview_quiz/db/keys.py) while the site works, in small transactions.
+
+    The keys are made from the time of registration, so the old users take the left part
+    of the indexes and the new ones are appended after them. The foreign keys referencing
+    the users and the sessions of the re-keyed users are changed too: the sessions are read once
+    before the first batch, and after every batch only the sessions saved since the previous read.
+    The command may be interrupted and started again, the users already re-keyed are skipped.
+
+    Example:
+        python manage.py rekey_users --batch-size 500 --pause 0.1
+    """
+    help = 'Replaces the random primary keys of the users by time-ordered ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='seconds to wait between the batches')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        started, total, sessions = time.perf_counter(), 0, 0
+        indexed = now()
+        index = index_sessions(using)
+        for keys in rekey(MyUser, using, options['batch_size']):
+            # the cached data of the users is keyed by the old keys
+            bump_version(MyUser)
+            # the users may have logged in since the sessions were read
+            since, indexed = indexed, now()
+            for user, session_keys in index_sessions(using, since).items():
+                index[user] |= session_keys
+            sessions += rekey_sessions(keys, index, using)
+            total += len(keys)
+            self.stdout.write(f'{total} users re-keyed')
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} users re-keyed, {sessions} sessions changed in {time.perf_counter() - started:.1f}s'))
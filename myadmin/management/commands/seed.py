@@ -0,0 +1,123 @@
+"""Contains custom commands for easy launch by manage.py."""
+import hashlib
+import time
+from functools import partial
+from pathlib import Path
+
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from interview_quiz.settings import BASE_DIR
+from interview_quiz.versions import bump_version
+from myadmin.models import FixtureChecksum
+
+#: fixtures loaded at the start of the container, in the order of their dependencies
+DEFAULT_FIXTURES = ('users', 'categories', 'questions', 'posts')
+
+
+def file_checksum(path):
+    """Returns the sha256 checksum of the file, reading it in blocks."""
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as fixture:
+        for block in iter(lambda: fixture.read(65536), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
+
+
+class Command(BaseCommand):
+    """A command for idempotent loading of the initial data of the site.
+
+    Unlike loaddata, which saves every object of every fixture with separate queries
+    at each start, it remembers the checksums of loaded fixtures and skips the ones that
+    have not changed. Changed fixtures are upserted in bulk: existing objects are updated
+    with ``bulk_update``, new ones are created with ``bulk_create``. Neither ``save()``
+    nor the model signals are called.
+
+    Example:
+        python manage.py seed
+        python manage.py seed fixtures/questions.json --force
+    """
+    help = 'Loads fixtures that have changed since the previous run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='*',
+                            help='paths to JSON fixtures, by default the fixtures of the project')
+        parser.add_argument('--force', action='store_true',
+                            help='load the fixtures even if their checksums have not changed')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        paths = options['fixtures'] or [BASE_DIR / 'fixtures' / f'{name}.json' for name in DEFAULT_FIXTURES]
+        for path in map(Path, paths):
+            if not path.is_file():
+                raise CommandError(f'Fixture {path} does not exist')
+            checksum = file_checksum(path)
+            stored = FixtureChecksum.objects.filter(name=path.name).first()
+            if stored and stored.checksum == checksum and not options['force']:
+                self.stdout.write(f'{path.name}: unchanged, skipped')
+                continue
+            with transaction.atomic():
+                created, updated = self.load(path, options['batch_size'])
+                FixtureChecksum.objects.update_or_create(name=path.name, defaults={'checksum': checksum})
+            self.stdout.write(f'{path.name}: {created} created, {updated} updated')
+        self.stdout.write(self.style.SUCCESS(f'Seed finished in {time.perf_counter() - started:.2f}s'))
+
+    @staticmethod
+    def load(path, batch_size):
+        """Upserts all objects of the fixture in bulk.
+
+        Args:
+
+            * path (`Path`): the path to the JSON fixture;
+            * batch_size (`int`): the number of objects saved by one query.
+
+        Returns:
+
+            * tuple: the number of created and updated objects.
+        """
+        by_model = {}
+        with open(path, encoding='utf-8') as fixture:
+            for deserialized in serializers.deserialize('json', fixture, ignorenonexistent=True):
+                by_model.setdefault(type(deserialized.object), []).append(deserialized)
+
+        created = updated = 0
+        for model, items in by_model.items():
+            existing = set()
+            pks = [item.object.pk for item in items]
+            for start in range(0, len(pks), batch_size):
+                existing.update(model.objects.filter(pk__in=pks[start:start + batch_size])
+                                .values_list('pk', flat=True))
+            fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+            to_update = [item.object for item in items if item.object.pk in existing]
+            to_create = [item.object for item in items if item.object.pk not in existing]
+            model.objects.bulk_update(to_update, fields, batch_size=batch_size)
+
+            # bulk_create fills auto_now(_add) fields with the current time,
+            # the values from the fixture are written back with a second query
+            auto_fields = [field for field in model._meta.concrete_fields
+                           if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+            fixture_values = [[getattr(obj, field.attname) for field in auto_fields] for obj in to_create]
+            model.objects.bulk_create(to_create, batch_size=batch_size)
+            if auto_fields and to_create:
+                for obj, values in zip(to_create, fixture_values):
+                    for field, value in zip(auto_fields, values):
+                        setattr(obj, field.attname, value)
+                model.objects.bulk_update(to_create, [field.name for field in auto_fields],
+                                          batch_size=batch_size)
+            for item in items:
+                for name, values in (item.m2m_data or {}).items():
+                    if values:
+                        getattr(item.object, name).set(values)
+            transaction.on_commit(partial(bump_version, model))
+            created += len(to_create)
+            updated += len(to_update)
+
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(by_model))
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+        return created, updated
@@ -0,0 +1,77 @@
+"""Contains custom commands for easy launch by manage.py."""
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myadmin.journeys.report import percentile
+
+#: the measurements the views may be sorted by
+SORT_BY = ('total', 'db', 'cache', 'template', 'db_queries')
+
+
+def read_records(path):
+    """Returns the measurements of the requests from the log, skipping broken lines."""
+    records = []
+    with open(path, encoding='utf-8') as log:
+        for line in log:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+class Command(BaseCommand):
+    """A command showing the slowest views by the sampled measurements of the requests
+    written by the timing middleware (see interview_quiz/timing.py).
+
+    The views are sorted by the 95th percentile of the chosen measurement; the times are in milliseconds.
+
+    Example:
+        python manage.py slow_views --top 10 --sort db
+    """
+    help = 'Shows the slowest views by the sampled measurements of the requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.LOGGING['handlers']['timing']['filename'],
+                            help='the log of the measurements')
+        parser.add_argument('--top', type=int, default=10, help='the number of the shown views')
+        parser.add_argument('--sort', choices=SORT_BY, default='total')
+        parser.add_argument('--min-requests', type=int, default=1, help='skip the views with fewer requests')
+
+    def handle(self, *args, **options):
+        try:
+            records = read_records(options['log'])
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать журнал {options["log"]}: {error}')
+        views = defaultdict(list)
+        for record in records:
+            views[record.get('view') or 'not found'].append(record)
+
+        rows = []
+        for view, requests in views.items():
+            if len(requests) < options['min_requests']:
+                continue
+            total = sorted(record['total'] for record in requests)
+            reads = sum(record['cache_hits'] + record['cache_misses'] for record in requests)
+            rows.append({
+                'view': view, 'requests': len(requests), 'p50': percentile(total, 0.5),
+                'p95': percentile(total, 0.95), 'max': total[-1],
+                'key': percentile(sorted(record[options['sort']] for record in requests), 0.95),
+                'db_queries': sum(record['db_queries'] for record in requests) / len(requests),
+                'db': sum(record['db'] for record in requests) / len(requests),
+                'hits': 100 * sum(record['cache_hits'] for record in requests) / reads if reads else None,
+                'template': sum(record['template'] for record in requests) / len(requests),
+            })
+        rows.sort(key=lambda row: row['key'], reverse=True)
+
+        self.stdout.write(f'{len(records)} requests of {len(views)} views in {options["log"]}')
+        self.stdout.write(f'{"requests":>8} {"p50":>8} {"p95":>8} {"max":>8} {"queries":>8} {"db":>8} '
+                          f'{"hits, %":>8} {"template":>8}  view')
+        for row in rows[:options['top']]:
+            hits = '-' if row['hits'] is None else f'{row["hits"]:.0f}'
+            self.stdout.write(f'{row["requests"]:>8} {row["p50"]:>8.1f} {row["p95"]:>8.1f} {row["max"]:>8.1f} '
+                              f'{row["db_queries"]:>8.1f} {row["db"]:>8.1f} {hits:>8} {row["template"]:>8.1f}  '
+                              f'{row["view"]}')
@@ -0,0 +1,27 @@
+"""Contains custom commands for easy launch by manage.py."""
+from django.core.management.base import BaseCommand, CommandError
+
+from interview_quiz.warmup import WarmUpError, warm_up
+
+
+class Command(BaseCommand):
+    """A command performing the warm-up of a worker in a separate process and printing
+    the time of every step. gunicorn workers are warmed up by themselves (see gunicorn.conf.py);
+    the command shows what the first requests of a cold worker would pay for
+    and fills memcached in advance, for example right after the deploy.
+
+    Example:
+        python manage.py warmup
+    """
+    help = 'Performs the warm-up of the caches and prints the time of every step'
+
+    def handle(self, *args, **options):
+        try:
+            timings = warm_up()
+        except WarmUpError as exc:
+            raise CommandError(str(exc))
+        for name, seconds, result in timings:
+            if isinstance(result, Exception):
+                self.stdout.write(self.style.ERROR(f'{name:<10} {seconds * 1000:>8.0f} ms  {result!r}'))
+            else:
+                self.stdout.write(f'{name:<10} {seconds * 1000:>8.0f} ms')
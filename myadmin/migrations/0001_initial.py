@@ -0,0 +1,23 @@
+# Generated by Django 3.2.2 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FixtureChecksum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('checksum', models.CharField(max_length=64)),
+                ('loaded_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Stores service models of the admin panel that are not part of the site content.
+"""
+from django.db import models
+
+
+class FixtureChecksum(models.Model):
+    """The model for the checksum of the last loaded version of a fixture.
+    It allows the seed command to skip fixtures that have not changed since the previous start."""
+    name = models.CharField(max_length=255, unique=True)
+    checksum = models.CharField(max_length=64)
+    loaded_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """Forms a printable representation of the object.
+        Returns the name of the fixture and its checksum.
+        """
+        return f'{self.name} ({self.checksum[:12]})'
+
+
+class StatCounter(models.Model):
+    """The model for a materialised counter of the admin panel dashboard.
+
+    A counter is identified by its name and key, for example the number of pending
+    questions of a category ('pending_questions', '<category id>') or of users registered
+    on a day ('new_users', '2022-05-01'). Counters are changed incrementally by the model
+    signals and recomputed by the reconciliation job, so the dashboard only reads them.
+    """
+    name = models.CharField(max_length=64)
+    key = models.CharField(max_length=64, blank=True)
+    value = models.BigIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('name', 'key')
+
+    def __str__(self):
+        """Forms a printable representation of the object.
+        Returns the name, key and value of the counter.
+        """
+        return f'{self.name}[{self.key}] = {self.value}'
@@ -0,0 +1,261 @@
+"""Contains the materialised statistics of the admin panel dashboard.
+
+The dashboard does not aggregate the tables of the site. It reads a few rows of
+``StatCounter``, which are kept up to date in two ways:
+
+    * incrementally - the receivers of this module compare the saved or deleted object
+      with its values loaded from the database (see ``DirtyFieldsMixin``) and change
+      only the affected counters with a single ``UPDATE ... SET value = value + n``;
+    * by reconciliation - ``reconcile`` recomputes the counters from the tables. It aggregates
+      whole tables, so it is run only periodically by the reconcile_stats command (and by the
+      commands filling the tables), never while serving a request.
+
+Bulk queries (imports, bulk api requests, activation of a whole category) do not send signals,
+so the code performing them passes the states of the changed objects to ``count_changes``.
+
+The number of answers has no source table, so it is only counted incrementally.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.timezone import localdate, localtime
+
+from myadmin.models import StatCounter
+from posts.models import Post
+from questions.models import Question, QuestionCategory
+from users.models import MyUser
+
+PENDING_QUESTIONS = 'pending_questions'
+PENDING_POSTS = 'pending_posts'
+NEW_USERS = 'new_users'
+ACTIVATION_BACKLOG = 'activation_backlog'
+ANSWERS = 'answers'
+
+#: the number of days shown on the dashboard
+DASHBOARD_DAYS = 7
+
+#: for the models with pending (unavailable) objects: the counter and the category field
+PENDING = {
+    Question: (PENDING_QUESTIONS, 'subject'),
+    Post: (PENDING_POSTS, 'category'),
+}
+
+
+def increment(name, key='', delta=1):
+    """Changes the counter by the delta with one query, creating the counter if necessary.
+
+    Args:
+
+        * name (`str`): the name of the counter;
+        * key (`str`, optional): the key of the counter (a category id, a date);
+        * delta (`int`, optional): the change of the value.
+    """
+    key = str(key)
+    if StatCounter.objects.filter(name=name, key=key).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(name=name, key=key, value=delta)
+    except IntegrityError:
+        # the counter has been created by a concurrent request
+        StatCounter.objects.filter(name=name, key=key).update(value=F('value') + delta)
+
+
+def loaded_value(instance, name):
+    """Returns the value of the field loaded from the database, or None if it is unknown."""
+    return getattr(instance, '_loaded_values', {}).get(name)
+
+
+def move(name, old_key, new_key):
+    """Moves one unit of the counter from the old key to the new one (None - no key)."""
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        increment(name, old_key, -1)
+    if new_key is not None:
+        increment(name, new_key, 1)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Post)
+def content_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Updates the number of pending objects of the categories when a question or post is saved.
+    If the previous state of an existing object is unknown, the counters are left to the reconciliation."""
+    if raw or (not created and not hasattr(instance, '_loaded_values')):
+        return
+    name, category = PENDING[sender]
+    old_key = None
+    if not created and not loaded_value(instance, 'available'):
+        old_key = loaded_value(instance, category)
+    new_key = None if instance.available else getattr(instance, f'{category}_id')
+    move(name, old_key, new_key)
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Post)
+def content_deleted(sender, instance, **kwargs):
+    """Decreases the number of pending objects of the category when a question or post is deleted."""
+    name, category = PENDING[sender]
+    if not instance.available:
+        increment(name, getattr(instance, f'{category}_id'), -1)
+
+
+def in_backlog(is_active, activation_key):
+    """Returns True if the user has registered but has not activated the profile yet."""
+    return not is_active and bool(activation_key)
+
+
+@receiver(post_save, sender=MyUser)
+def user_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Counts new users and updates the activation backlog when a user is saved."""
+    if raw:
+        return
+    if created:
+        increment(NEW_USERS, localtime(instance.date_joined).date().isoformat())
+        was_in_backlog = False
+    elif hasattr(instance, '_loaded_values'):
+        was_in_backlog = in_backlog(loaded_value(instance, 'is_active'), loaded_value(instance, 'activation_key'))
+    else:
+        return
+    is_in_backlog = in_backlog(instance.is_active, instance.activation_key)
+    if was_in_backlog != is_in_backlog:
+        increment(ACTIVATION_BACKLOG, delta=1 if is_in_backlog else -1)
+
+
+@receiver(post_delete, sender=MyUser)
+def user_deleted(sender, instance, **kwargs):
+    """Removes the deleted user from the counters."""
+    increment(NEW_USERS, localtime(instance.date_joined).date().isoformat(), -1)
+    if in_backlog(instance.is_active, instance.activation_key):
+        increment(ACTIVATION_BACKLOG, delta=-1)
+
+
+#: the fields of the models the counters depend on, enough to load for ``counted_in``
+COUNTED_FIELDS = {
+    Question: ('subject', 'available'),
+    Post: ('category', 'available'),
+    MyUser: ('date_joined', 'is_active', 'activation_key'),
+}
+
+
+def counted_in(instance):
+    """Returns the counters (name, key) in which the question, post or user is counted, none for other objects."""
+    model = instance._meta.model
+    if model in PENDING:
+        name, category = PENDING[model]
+        return [] if instance.available else [(name, str(getattr(instance, f'{category}_id')))]
+    if model is not MyUser:
+        return []
+    counters = [(NEW_USERS, localtime(instance.date_joined).date().isoformat())]
+    if in_backlog(instance.is_active, instance.activation_key):
+        counters.append((ACTIVATION_BACKLOG, ''))
+    return counters
+
+
+def count_changes(before, after):
+    """Changes the counters by the changes of the objects made by a bulk query,
+    with one query per changed counter.
+
+    Args:
+
+        * before (`list`): the objects before the change (the created ones are not passed);
+        * after (`list`): the same objects after the change and the created ones.
+    """
+    deltas = Counter()
+    for instance in after:
+        deltas.update(counted_in(instance))
+    for instance in before:
+        deltas.subtract(counted_in(instance))
+    # the same order of the counters in all requests, so they do not wait for each other's locks in a circle
+    for (name, key), delta in sorted(deltas.items()):
+        if delta:
+            increment(name, key, delta)
+
+
+def count_answer():
+    """Counts an answer given today."""
+    increment(ANSWERS, localdate().isoformat())
+
+
+def replace_counters(name, values):
+    """Replaces the values of all counters with the name by the computed ones ({key: value}).
+    The counters are updated in place under a lock rather than deleted and created again,
+    so a concurrent ``increment`` waits for the replacement instead of missing the counter;
+    the counters missing from the values are set to zero.
+    """
+    values = {str(key): value for key, value in values.items()}
+    with transaction.atomic():
+        counters = {counter.key: counter for counter in StatCounter.objects.select_for_update().filter(name=name)}
+        changed = []
+        for key, counter in counters.items():
+            if counter.value != values.get(key, 0):
+                counter.value = values.get(key, 0)
+                changed.append(counter)
+        StatCounter.objects.bulk_update(changed, ['value'])
+        missing = [StatCounter(name=name, key=key, value=value) for key, value in values.items()
+                   if key not in counters]
+        try:
+            with transaction.atomic():
+                StatCounter.objects.bulk_create(missing)
+        except IntegrityError:
+            # some of the counters have been created by concurrent requests
+            for counter in missing:
+                StatCounter.objects.update_or_create(name=name, key=counter.key, defaults={'value': counter.value})
+
+
+def reconcile(models=(Question, Post, MyUser)):
+    """Recomputes the counters derived from the models with aggregate queries.
+
+    Args:
+
+        * models (`tuple`, optional): the models whose counters are recomputed, by default all.
+    """
+    with transaction.atomic():
+        for model in models:
+            if model in PENDING:
+                name, category = PENDING[model]
+                pending = model.objects.filter(available=False).values(category).annotate(total=Count('pk'))
+                replace_counters(name, {row[category]: row['total'] for row in pending})
+            elif model is MyUser:
+                by_day = MyUser.objects.annotate(day=TruncDate('date_joined')).values('day') \
+                    .annotate(total=Count('pk'))
+                replace_counters(NEW_USERS, {row['day'].isoformat(): row['total'] for row in by_day})
+                backlog = MyUser.objects.filter(is_active=False).exclude(activation_key__isnull=True) \
+                    .exclude(activation_key='').count()
+                replace_counters(ACTIVATION_BACKLOG, {'': backlog})
+
+
+def get_dashboard():
+    """Returns the statistics of the dashboard, reading only the counters.
+
+    Returns:
+
+        * dict: the pending questions and posts per category, the total numbers of them,
+          the new users and answers of the last days and the activation backlog.
+    """
+    days = [(localdate() - timedelta(days=number)).isoformat() for number in range(DASHBOARD_DAYS)]
+    counters = StatCounter.objects.filter(name__in=(PENDING_QUESTIONS, PENDING_POSTS, ACTIVATION_BACKLOG)) \
+        .union(StatCounter.objects.filter(name__in=(NEW_USERS, ANSWERS), key__in=days))
+    values = {}
+    for counter in counters:
+        values.setdefault(counter.name, {})[counter.key] = counter.value
+
+    category_ids = set(values.get(PENDING_QUESTIONS, {})) | set(values.get(PENDING_POSTS, {}))
+    categories = QuestionCategory.objects.filter(pk__in=category_ids).order_by('name')
+    pending = [(category.name,
+                values.get(PENDING_QUESTIONS, {}).get(str(category.pk), 0),
+                values.get(PENDING_POSTS, {}).get(str(category.pk), 0)) for category in categories]
+    return {
+        'pending': [row for row in pending if row[1] or row[2]],
+        'pending_questions': sum(values.get(PENDING_QUESTIONS, {}).values()),
+        'pending_posts': sum(values.get(PENDING_POSTS, {}).values()),
+        'activation_backlog': values.get(ACTIVATION_BACKLOG, {}).get('', 0),
+        'days': [(day, values.get(NEW_USERS, {}).get(day, 0), values.get(ANSWERS, {}).get(day, 0))
+                 for day in days],
+    }
@@ -0,0 +1,258 @@
+"""Contains the generator of synthetic data for testing the site at scale.
+
+The fixtures of the project have a few dozen questions, which hides the cost of the queries
+that grow with the tables: the choice of the questions of a test, the rank of a user in the profile,
+the searches by a part of a word. The generator makes categories, questions with answers and tags,
+posts with Russian text and users with the scores of their simulated answers, in any number.
+
+Everything is derived from a seeded ``random.Random``, including the primary keys of the users
+(see ``uuid7``), so the same seed and the same last day give the same data. The objects are made
+lazily, batch by batch, so millions of rows never stay in memory at once.
+
+The generated users have emails in the domain ``SYNTHETIC_DOMAIN`` and the descriptions of
+the generated categories start with ``SYNTHETIC_MARK``, so the data can be found and deleted.
+"""
+
+import os
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.utils.timezone import make_aware
+
+from interview_quiz.db.keys import uuid7
+from interview_quiz.variabls import POINTS_LEVEL
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+#: the domain of the emails of the generated users
+SYNTHETIC_DOMAIN = 'synthetic.invalid'
+
+#: the beginning of the descriptions of the generated categories
+SYNTHETIC_MARK = 'Синтетическая категория.'
+
+#: the password of the generated users
+PASSWORD = 'Synthetic-Quiz-7'
+
+#: the directory of the placeholder images in the media directory
+IMAGES_DIR = 'synthetic'
+
+#: the categories with the terms used as the tags and in the texts of their questions and posts
+CATEGORIES = {
+    'Python': ('список', 'кортеж', 'словарь', 'генератор', 'декоратор', 'итератор', 'GIL', 'контекстный менеджер',
+               'метакласс', 'срез', 'лямбда', 'исключение'),
+    'Django': ('модель', 'миграция', 'QuerySet', 'middleware', 'сигнал', 'шаблон', 'форма', 'представление',
+               'менеджер', 'транзакция'),
+    'SQL': ('индекс', 'JOIN', 'транзакция', 'подзапрос', 'GROUP BY', 'нормализация', 'первичный ключ',
+            'внешний ключ', 'представление', 'план запроса'),
+    'JavaScript': ('замыкание', 'промис', 'прототип', 'event loop', 'this', 'стрелочная функция', 'async',
+                   'деструктуризация', 'hoisting'),
+    'REST': ('ресурс', 'идемпотентность', 'статус', 'сериализатор', 'роутер', 'пагинация', 'версионирование',
+             'аутентификация'),
+    'Git': ('коммит', 'ветка', 'rebase', 'merge', 'stash', 'cherry-pick', 'тег', 'конфликт'),
+    'Linux': ('процесс', 'сигнал', 'права доступа', 'файловый дескриптор', 'пайп', 'cron', 'systemd'),
+    'Алгоритмы': ('сортировка', 'бинарный поиск', 'хеш-таблица', 'граф', 'куча', 'динамическое программирование',
+                  'сложность', 'рекурсия'),
+    'ООП': ('инкапсуляция', 'наследование', 'полиморфизм', 'абстракция', 'интерфейс', 'композиция', 'MRO'),
+    'Сети': ('TCP', 'UDP', 'DNS', 'HTTP', 'TLS', 'сокет', 'маршрутизация', 'NAT'),
+    'Docker': ('образ', 'контейнер', 'слой', 'том', 'сеть', 'Dockerfile', 'compose'),
+    'Тестирование': ('юнит-тест', 'мок', 'фикстура', 'покрытие', 'интеграционный тест', 'TDD', 'регрессия'),
+}
+
+QUESTIONS = (
+    'Что такое {term}?',
+    'Для чего используется {term}?',
+    'В чем разница между {term} и {other}?',
+    'Как работает {term} в {category}?',
+    'Когда не стоит использовать {term}?',
+    'Какое утверждение о {term} верно?',
+    'Чем {term} отличается от {other} в {category}?',
+    'Что произойдет, если {term} используется вместе с {other}?',
+)
+
+WORDS = (
+    'данные', 'объект', 'значение', 'функция', 'запрос', 'ответ', 'ошибка', 'память', 'время', 'сервер', 'клиент',
+    'код', 'модуль', 'пример', 'результат', 'порядок', 'структура', 'элемент', 'вызов', 'поток', 'процесс', 'кэш',
+    'строка', 'число', 'тип', 'класс', 'метод', 'атрибут', 'состояние', 'изменение', 'обработка', 'проверка',
+    'позволяет', 'возвращает', 'хранит', 'создает', 'изменяет', 'вызывает', 'передает', 'использует', 'сравнивает',
+    'быстро', 'всегда', 'иногда', 'только', 'обычно', 'заранее', 'повторно', 'одновременно', 'последовательно',
+    'новый', 'простой', 'неизменяемый', 'изменяемый', 'внутренний', 'внешний', 'общий', 'отдельный', 'случайный',
+    'каждый', 'любой', 'первый', 'последний', 'основной', 'дополнительный', 'большой', 'небольшой', 'важный',
+    'в', 'на', 'для', 'при', 'без', 'после', 'до', 'через', 'между', 'и', 'или', 'но', 'что', 'если', 'когда', 'не',
+)
+
+#: the shares of the difficulty levels among the questions and the answers
+LEVELS = ((Question.NEWBIE, 0.5), (Question.AVERAGE, 0.35), (Question.SMARTYPANTS, 0.15))
+
+#: the colors of the placeholder images
+COLORS = ((230, 126, 34), (52, 152, 219), (46, 204, 113), (155, 89, 182), (241, 196, 15), (231, 76, 60),
+          (26, 188, 156), (52, 73, 94))
+
+
+def category_name(number):
+    """Returns the name of the category by its number; the names repeat with a suffix after the known ones."""
+    names = list(CATEGORIES)
+    name = names[number % len(names)]
+    return name if number < len(names) else f'{name} {number // len(names) + 1}'
+
+
+def category_terms(name):
+    """Returns the terms of the category by its name, with or without the suffix."""
+    return CATEGORIES[name.rsplit(' ', 1)[0] if name not in CATEGORIES else name]
+
+
+class Generator:
+    """The generator of synthetic objects.
+
+    Args:
+
+        * rng (`random.Random`): the seeded source of all random choices;
+        * until (`date`): the last day of the registrations, the answers and the posts;
+        * days (`int`): the number of days the data is spread over;
+        * images (`list`, optional): the paths of the placeholder images in the media directory.
+    """
+
+    def __init__(self, rng, until, days, images=()):
+        self.rng = rng
+        self.end = make_aware(datetime.combine(until, time.max))
+        self.days = days
+        self.images = list(images)
+        self.answers = Counter()
+
+    def sentence(self, terms, low=6, high=16):
+        """Returns a Russian sentence of random words, mentioning a term from time to time."""
+        words = [self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high))]
+        if terms and self.rng.random() < 0.6:
+            words.insert(self.rng.randrange(len(words)), self.rng.choice(terms))
+        if len(words) > 8 and self.rng.random() < 0.4:
+            words[self.rng.randrange(3, len(words) - 2)] += ','
+        text = ' '.join(words)
+        return text[:1].upper() + text[1:] + '.'
+
+    def moment(self):
+        """Returns a random time within the days of the data."""
+        return self.end - timedelta(seconds=self.rng.uniform(0, self.days * 24 * 60 * 60))
+
+    def level(self):
+        """Returns a random difficulty level according to the shares of the levels."""
+        return self.rng.choices([level for level, _ in LEVELS], [share for _, share in LEVELS])[0]
+
+    def categories(self, number, first_pk):
+        """Yields the categories with the primary keys starting from the given one."""
+        for offset in range(number):
+            name = category_name(offset)
+            yield QuestionCategory(pk=first_pk + offset, name=name, available=self.rng.random() < 0.9,
+                                   description=f'{SYNTHETIC_MARK} {self.sentence(category_terms(name))}',
+                                   image=self.images[offset % len(self.images)] if self.images else '')
+
+    def users(self, number, password):
+        """Yields the users in the order of their registration with the scores of their simulated answers.
+        The answers are counted by their days in ``answers``.
+
+        Args:
+
+            * number (`int`): the number of the users;
+            * password (`str`): the hashed password of all users.
+        """
+        start, span, share = self.end - timedelta(days=self.days), timedelta(days=self.days), 0
+        for index in range(number):
+            # the next of the sorted random moments: the earliest of the remaining ones, without keeping them all
+            share += (1 - share) * (1 - self.rng.random() ** (1 / (number - index)))
+            date_joined = start + span * share
+            username = f'synthetic{index + 1:07d}'
+            active = self.rng.random() < 0.9
+            yield MyUser(
+                id=uuid7(date_joined.timestamp(), self.rng), username=username,
+                email=f'{username}@{SYNTHETIC_DOMAIN}', password=password, date_joined=date_joined,
+                first_name=self.rng.choice(('Анна', 'Иван', 'Мария', 'Петр', 'Ольга', 'Алексей', 'Елена', 'Дмитрий')),
+                last_name=self.rng.choice(('Иванов', 'Петрова', 'Смирнов', 'Кузнецова', 'Попов', 'Соколова')),
+                is_active=active, activation_key=None if active else f'{self.rng.getrandbits(160):040x}',
+                score=self.score(date_joined) if active else 0, info=self.rng.random() < 0.5,
+            )
+
+    def score(self, date_joined):
+        """Simulates the answers of a user since the registration and returns the score.
+        Most users answer a few questions and a few answer thousands; the share of the right
+        answers depends on the skill of the user. As on the site, the score never goes below zero."""
+        number = min(int(self.rng.paretovariate(1.2)) - 1, 5000)
+        skill = self.rng.betavariate(4, 3)
+        level = self.level()
+        points = POINTS_LEVEL[level]
+        first_day = max(0, (date_joined - (self.end - timedelta(days=self.days))).days)
+        score = 0
+        for _ in range(number):
+            self.answers[self.rng.randint(first_day, self.days)] += 1
+            score = score + points if self.rng.random() < skill else max(score - points, 0)
+        return score
+
+    def questions(self, number, first_pk, categories, authors):
+        """Yields the questions with the primary keys starting from the given one.
+
+        Args:
+
+            * number (`int`): the number of the questions;
+            * first_pk (`int`): the primary key of the first question;
+            * categories (`list`): the pairs of the primary key and the name of the categories;
+            * authors (`list`): the primary keys of the authors.
+        """
+        for offset in range(number):
+            category, name = self.rng.choice(categories)
+            terms = category_terms(name)
+            term, other = self.rng.sample(terms, 2)
+            answers = [self.sentence(terms, 3, 10)[:150] for _ in range(4)]
+            question = self.rng.choice(QUESTIONS).format(term=term, other=other, category=name)
+            yield Question(
+                pk=first_pk + offset, question=question[:250], subject_id=category,
+                author_id=self.rng.choice(authors), right_answer=self.rng.choice(answers), answer_01=answers[0],
+                answer_02=answers[1], answer_03=answers[2], answer_04=answers[3], difficulty_level=self.level(),
+                available=self.rng.random() < 0.9, tag=term,
+                image_01=self.rng.choice(self.images) if self.images and self.rng.random() < 0.1 else '',
+            )
+
+    def posts(self, number, first_pk, categories, authors):
+        """Yields the posts with the primary keys starting from the given one, the arguments as of ``questions``."""
+        for offset in range(number):
+            category, name = self.rng.choice(categories)
+            terms = category_terms(name)
+            tag = self.rng.choice(terms)
+            body = ''.join('<div>' + ' '.join(self.sentence(terms) for _ in range(self.rng.randint(2, 6))) + '</div>'
+                           for _ in range(self.rng.randint(3, 8)))
+            yield Post(
+                pk=first_pk + offset, title=f'{tag[:1].upper()}{tag[1:]}: {self.sentence(terms, 2, 6)}'[:150],
+                author_id=self.rng.choice(authors), category_id=category, body=body, tag=tag,
+                available=self.rng.random() < 0.9, created_on=self.moment(),
+                image=self.rng.choice(self.images) if self.images else '',
+            )
+
+    def answer_counts(self):
+        """Returns the numbers of the simulated answers by their days (ISO dates)."""
+        first = (self.end - timedelta(days=self.days)).date()
+        return {(first + timedelta(days=day)).isoformat(): count for day, count in self.answers.items()}
+
+
+def hashed_password(seed):
+    """Returns the hashed password of the generated users, with the salt derived from the seed.
+    Hashing once for all users keeps millions of users fast to generate."""
+    return make_password(PASSWORD, salt=f'synthetic{seed}')
+
+
+def make_images(number):
+    """Creates the placeholder images in the media directory and returns their paths in it."""
+    from PIL import Image, ImageDraw
+
+    directory = os.path.join(settings.MEDIA_ROOT, IMAGES_DIR)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index in range(number):
+        color = COLORS[index % len(COLORS)]
+        image = Image.new('RGB', (600, 400), color)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((40, 40, 560, 360), outline=(255, 255, 255), width=6)
+        draw.line((40, 40, 560, 360), fill=(255, 255, 255), width=4)
+        draw.line((40, 360, 560, 40), fill=(255, 255, 255), width=4)
+        name = f'{IMAGES_DIR}/placeholder_{index + 1:02d}.png'
+        image.save(os.path.join(settings.MEDIA_ROOT, name))
+        paths.append(name)
+    return paths
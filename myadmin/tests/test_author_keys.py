@@ -0,0 +1,117 @@
+"""
+Contains tests for checking the migration of the authors of questions and posts
+from usernames to the primary keys of the users (see interview_quiz/db/author_keys.py).
+The migrations are applied to a separate temporary SQLite database.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command, CommandError
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+#: the migrations before the backfill and the latest ones
+ADDED = [('questions', '0004_question_author_ref'), ('posts', '0004_post_author_ref')]
+LATEST = [('questions', '0007_remove_question_author_default'), ('posts', '0007_remove_post_author_default')]
+
+
+class TestAuthorKeys(SimpleTestCase):
+    """Test class for the migrations of the author keys."""
+    alias = 'author_keys'
+    # the default of the author field is looked up in the default database when SQLite rebuilds the table
+    databases = {'default'}
+
+    def setUp(self):
+        """Creating the temporary database migrated up to the new nullable author column."""
+        handle, self.path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        connections.databases[self.alias] = {**connections.databases['default'], 'NAME': self.path}
+        self.addCleanup(self.remove_database)
+        self.migrate(ADDED)
+        self.apps = self.executor.loader.project_state(ADDED).apps
+        users = self.apps.get_model('users', 'MyUser').objects.using(self.alias)
+        self.users = {name: users.create(username=name, email=f'{name}@example.com', password='!').pk
+                      for name in ('drf', 'author_1', 'author_2')}
+        category = self.apps.get_model('questions', 'QuestionCategory').objects.using(self.alias).create(name='Python')
+        questions = self.apps.get_model('questions', 'Question').objects.using(self.alias)
+        for number in range(5):
+            questions.create(question=f'question {number}', subject=category, tag='IT',
+                             author_id=f'author_{number % 2 + 1}')
+        self.apps.get_model('posts', 'Post').objects.using(self.alias).create(
+            title='post', tag='IT', category=category, body='body', author_id='author_1')
+
+    def remove_database(self):
+        """Closes the connection to the temporary database and removes it."""
+        connections[self.alias].close()
+        del connections[self.alias]
+        del connections.databases[self.alias]
+        os.remove(self.path)
+
+    def migrate(self, targets):
+        """Applies the migrations of the temporary database up to the targets."""
+        self.executor = MigrationExecutor(connections[self.alias])
+        self.executor.migrate(targets)
+        self.executor.loader.build_graph()
+
+    def test_backfill_command(self):
+        """Checks that the command fills the new column in batches and the migrations keep the authors."""
+        out = StringIO()
+        call_command('backfill_author_keys', batch_size=2, database=self.alias, stdout=out)
+        self.assertIn('questions.Question: 4 rows filled', out.getvalue())
+        self.assertIn('questions.Question: 5 rows filled in', out.getvalue())
+        self.assertIn('posts.Post: 1 rows filled in', out.getvalue())
+        questions = self.apps.get_model('questions', 'Question').objects.using(self.alias)
+        self.assertFalse(questions.filter(author_ref__isnull=True).exists())
+
+        self.migrate(LATEST)
+        out = StringIO()
+        call_command('backfill_author_keys', database=self.alias, stdout=out)
+        self.assertIn('already been switched', out.getvalue())
+        self.check_authors()
+
+    def test_migrations_backfill(self):
+        """Checks that the migrations fill the new column themselves without the command."""
+        self.migrate(LATEST)
+        self.check_authors()
+
+    def test_rollback(self):
+        """Checks that rolling the migrations back writes the usernames of the authors back,
+        including the authors changed after the switch."""
+        self.migrate(LATEST)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('UPDATE questions_question SET author_ref_id = %s WHERE question = %s',
+                           [self.users['author_2'].hex, 'question 0'])
+        self.migrate(ADDED)
+        questions = self.executor.loader.project_state(ADDED).apps.get_model('questions', 'Question')
+        self.assertEqual(list(questions.objects.using(self.alias).order_by('question').values_list('author_id', flat=True)),
+                         ['author_2', 'author_2', 'author_1', 'author_2', 'author_1'])
+
+    def test_drop_command(self):
+        """Checks that the old columns are dropped only after the switch, by the migrations on SQLite."""
+        with self.assertRaisesMessage(CommandError, '0006_switch_question_author'):
+            call_command('drop_author_usernames', database=self.alias, stdout=StringIO())
+        self.migrate(LATEST)
+        out = StringIO()
+        call_command('drop_author_usernames', database=self.alias, stdout=out)
+        self.assertIn('dropped by the migrations', out.getvalue())
+        self.check_authors()
+
+    def check_authors(self):
+        """Checks that the authors of the rows are the users by the primary keys."""
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('SELECT question, author_ref_id FROM questions_question ORDER BY question')
+            rows = cursor.fetchall()
+            columns = [column.name for column in
+                       connections[self.alias].introspection.get_table_description(cursor, 'posts_post')]
+        self.assertEqual([author for _, author in rows],
+                         [self.users[f'author_{number % 2 + 1}'].hex for number in range(5)])
+        self.assertIn('author_ref_id', columns)
+        self.assertNotIn('author_id', columns)
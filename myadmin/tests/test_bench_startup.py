@@ -0,0 +1,29 @@
+"""
+Contains integration tests for checking the startup benchmark command.
+"""
+
+import io
+import logging
+import sys
+
+from django.core.management import call_command, CommandError
+from django.test import SimpleTestCase
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestBenchStartup(SimpleTestCase):
+    """Test class for the measurement of the startup of a worker."""
+
+    def test_profiles_and_budget(self):
+        """Checks that both profiles are measured, that the production profile does not import
+        the development tools and GraphQL, and that exceeding the budget is reported."""
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, 'the budget is 0.00s'):
+            call_command('bench_startup', '--repeat', '1', '--top', '1000', '--budget', '0', stdout=out)
+        production, development = out.getvalue().split('development:')
+        self.assertIn('django ', production)
+        for package in ('debug_toolbar', 'graphene_django', 'graphql'):
+            self.assertNotIn(f' {package} ', production)
+            self.assertIn(f' {package} ', development)
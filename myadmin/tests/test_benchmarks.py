@@ -0,0 +1,105 @@
+"""
+Contains unit and integration tests for checking the micro-benchmarks of the hot code paths
+and the bench_hot_paths and compare_benchmarks commands.
+"""
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, SimpleTestCase
+
+from myadmin.benchmarks import BENCHMARKS, compare
+from posts.models import Post
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+def results(**benchmarks):
+    """Returns the results of the benchmarks with the given minimal times and numbers of queries."""
+    return {'dataset': {'users': 10}, 'benchmarks': {name: {'min': time, 'median': time, 'mean': time,
+                                                            'queries': queries}
+                                                     for name, (time, queries) in benchmarks.items()}}
+
+
+class TestCompare(SimpleTestCase):
+    """Test class for the comparison of the results with a baseline."""
+
+    def setUp(self):
+        """Creating a temporary directory for the files of the results."""
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, data):
+        """Writes the results to a file of the directory and returns its path."""
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        return path
+
+    def test_regressions(self):
+        """Checks that a benchmark regresses when it is slower than the threshold, apart from the noise
+        of the fast ones, or makes more queries, and that a new benchmark is not compared."""
+        baseline = results(slower=(10, 2), noise=(0.1, 2), queries=(10, 2), faster=(10, 2), same=(10, 2))
+        current = results(slower=(13, 2), noise=(0.15, 2), queries=(10, 3), faster=(5, 1), same=(11, 2),
+                          new=(1, 1))
+        rows = {row['name']: row for row in compare(current, baseline, threshold=20)}
+        self.assertEqual({name for name, row in rows.items() if row['regressed']}, {'slower', 'queries'})
+        self.assertAlmostEqual(rows['slower']['change'], 30)
+        self.assertIsNone(rows['new']['change'])
+        self.assertFalse(compare(current, baseline, threshold=40)[0]['regressed'])
+
+    def test_command(self):
+        """Checks that the command fails on a regression and passes otherwise."""
+        baseline = self.write('baseline.json', results(question_set=(10, 2)))
+        faster = self.write('faster.json', results(question_set=(9, 2)))
+        slower = self.write('slower.json', results(question_set=(20, 2)))
+        out = StringIO()
+        call_command('compare_benchmarks', faster, baseline, stdout=out)
+        self.assertIn('No regressions', out.getvalue())
+        with self.assertRaisesMessage(CommandError, 'question_set'):
+            call_command('compare_benchmarks', slower, baseline, stdout=StringIO())
+        call_command('compare_benchmarks', slower, baseline, '--threshold', '150', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('compare_benchmarks', os.path.join(self.directory, 'missing.json'), baseline)
+
+
+class TestBenchHotPaths(TestCase):
+    """Test class for the bench_hot_paths command on the synthetic data."""
+
+    def test_no_data(self):
+        """Checks that the benchmarks need the synthetic data."""
+        with self.assertRaisesMessage(CommandError, 'generate_data'):
+            call_command('bench_hot_paths', stdout=StringIO())
+
+    def test_results(self):
+        """Checks that all benchmarks run and are written to JSON, and that their changes are rolled back."""
+        call_command('generate_data', users=40, authors=5, categories=3, questions=60, posts=20, days=10,
+                     until=date(2026, 1, 31), allow_production=True, stdout=StringIO())
+        scores = list(MyUser.objects.order_by('pk').values_list('score', flat=True))
+        posts = Post.objects.count()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'results.json')
+
+        call_command('bench_hot_paths', '--repeat', '2', '--number', '1', '--json', path, stdout=StringIO())
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        self.assertEqual(list(data['benchmarks']), list(BENCHMARKS))
+        self.assertEqual(data['dataset']['questions'], 60)
+        for name, result in data['benchmarks'].items():
+            self.assertEqual(result['rounds'], 2, name)
+            self.assertGreater(result['min'], 0, name)
+            self.assertLessEqual(result['min'], result['median'], name)
+        self.assertGreater(data['benchmarks']['question_set']['queries'], 0)
+        self.assertEqual(list(MyUser.objects.order_by('pk').values_list('score', flat=True)), scores)
+        self.assertEqual(Post.objects.count(), posts)
@@ -0,0 +1,130 @@
+"""
+Contains unit and integration tests for checking the bulk write api views.
+"""
+
+import json
+import logging
+import sys
+
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from interview_quiz.versions import get_version
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestBulkApi(TestCase):
+    """Test class for the bulk create, update and toggle api views."""
+
+    def setUp(self):
+        """Creating a test superuser, a category and questions."""
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_staff=True)
+        self.category = QuestionCategory.objects.create(name='Python', description='some text')
+        self.questions = [Question.objects.create(question=f'question {number}', subject=self.category,
+                                                  author=self.test_user, right_answer='a', answer_01='a',
+                                                  available=number % 2 == 0)
+                          for number in range(1, 4)]
+        self.client.login(username='test_01', password='laLA12')
+
+    def question_data(self, number, right_answer='a'):
+        """Returns the data of a new question for the api."""
+        return {'question': f'new question {number}', 'subject': self.category.id, 'right_answer': right_answer,
+                'answer_01': 'a', 'answer_02': 'b', 'answer_03': 'c', 'answer_04': 'd', 'is_active': True}
+
+    def post_json(self, url, data, method='post'):
+        """Sends the data as JSON with the chosen method."""
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def test_bulk_create(self):
+        """Checks that all questions are created with the current user as the author."""
+        version = get_version(Question)
+        response = self.post_json('/api/questions/bulk-create/', [self.question_data(1), self.question_data(2)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(Question.objects.filter(question__startswith='new', author=self.test_user).count(), 2)
+        self.assertGreater(get_version(Question), version)
+
+    def test_bulk_create_is_atomic(self):
+        """Checks that nothing is created if one of the items is incorrect, and the errors are per item."""
+        response = self.post_json('/api/questions/bulk-create/',
+                                  [self.question_data(1), self.question_data(2, right_answer='z')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[0], {})
+        self.assertIn('non_field_errors', response.json()[1])
+        self.assertFalse(Question.objects.filter(question__startswith='new').exists())
+
+    def test_bulk_create_requires_authentication(self):
+        """Checks that anonymous users cannot create objects."""
+        self.client.logout()
+        response = self.post_json('/api/questions/bulk-create/', [self.question_data(1)])
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_update(self):
+        """Checks the partial update of several questions, validated against their current values."""
+        data = [{'id': question.id, 'answer_04': 'new'} for question in self.questions]
+        data[0]['right_answer'] = 'new'
+        response = self.post_json('/api/questions/bulk-update/', data, method='patch')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()], [item['id'] for item in data])
+        self.assertEqual(Question.objects.filter(answer_04='new').count(), 3)
+        self.assertEqual(Question.objects.get(pk=self.questions[0].pk).right_answer, 'new')
+
+    def test_bulk_update_ids_as_view_reads_them(self):
+        """Checks that the items are matched with the objects by the ids converted the way the view converts them."""
+        response = self.post_json('/api/questions/bulk-update/', [{'id': f'0{self.questions[0].id}', 'tag': 'tag'}],
+                                  method='patch')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Question.objects.get(pk=self.questions[0].pk).tag, 'tag')
+
+    def test_bulk_update_unknown_id(self):
+        """Checks that an unknown id is reported as an error of its item."""
+        response = self.post_json('/api/questions/bulk-update/', [{'id': 0, 'tag': 'tag'}], method='patch')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.json()[0])
+
+    def test_bulk_toggle(self):
+        """Checks that the state of the objects is inverted and unknown ids are reported."""
+        ids = [question.id for question in self.questions]
+        response = self.post_json('/api/questions/bulk-toggle/', {'ids': ids + [0, 'abc']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 3)
+        self.assertEqual(response.json()['not_found'], ['0', 'abc'])
+        self.assertEqual(list(Question.objects.filter(pk__in=ids).order_by('pk').values_list('available', flat=True)),
+                         [True, False, True])
+
+    def test_bulk_toggle_value(self):
+        """Checks that the passed value is set to all users, found by the ids in any case."""
+        MyUser.objects.create_user(username='test_02', email='bla@bla.ru', is_active=True)
+        ids = [str(pk) for pk in MyUser.objects.exclude(pk=self.test_user.pk).values_list('pk', flat=True)]
+        response = self.post_json('/api/users/bulk-toggle/', {'ids': [pk.upper() for pk in ids], 'value': False})
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(response.json()['not_found'], [])
+        self.assertFalse(MyUser.objects.get(username='test_02').is_active)
+
+    def test_bulk_toggle_categories_not_allowed(self):
+        """Checks that categories cannot be switched through the api."""
+        response = self.post_json('/api/categories/bulk-toggle/', {'ids': [self.category.id]})
+        self.assertEqual(response.status_code, 405)
+
+    def test_destroy_toggles_with_one_query(self):
+        """Checks that deleting a question deactivates it with a single UPDATE, reading only
+        the fields counted by the dashboard, without aggregating the table
+        (the other queries load the session and the user and change the dashboard counters)."""
+        question = self.questions[1]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.delete(f'/api/questions/{question.id}/')
+        queries = [query['sql'] for query in context.captured_queries if '"questions_question"' in query['sql']]
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('GROUP BY', queries[0])
+        self.assertTrue(queries[1].startswith('UPDATE'))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Question.objects.get(pk=question.pk).available)
+        self.assertEqual(self.client.delete('/api/questions/0/').status_code, 404)
@@ -0,0 +1,87 @@
+"""
+Contains unit and integration tests for checking the conditional GET requests of the api.
+"""
+
+import logging
+import sys
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestConditionalApi(TestCase):
+    """Test class for the validators of the api responses."""
+
+    def setUp(self):
+        """Creating a test staff user, a category and questions."""
+        cache.clear()
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_staff=True)
+        self.category = QuestionCategory.objects.create(name='Python')
+        self.questions = [Question.objects.create(question=f'question {number}', subject=self.category,
+                                                  author=self.test_user, available=True)
+                          for number in range(1, 4)]
+
+    def test_list_not_modified(self):
+        """Checks that an unchanged list is answered with 304 without queries and a changed one - with 200."""
+        response = self.client.get('/api/questions/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/questions/', {'limit': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.client.get('/api/questions/', {'limit': 3})['ETag'], etag)
+
+        Question.objects.get(pk=self.questions[2].pk).delete()
+        response = self.client.get('/api/questions/', {'limit': 2}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_depends_on_its_object(self):
+        """Checks that a question keeps its ETag when another question changes, but not after bulk changes."""
+        url = f'/api/questions/{self.questions[0].pk}/'
+        etag = self.client.get(url)['ETag']
+        question = Question.objects.get(pk=self.questions[1].pk)
+        question.tag = 'python'
+        question.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.login(username='test_01', password='laLA12')
+        etag = self.client.get(url)['ETag']
+        self.client.post('/api/questions/bulk-toggle/', {'ids': [self.questions[1].pk], 'value': False},
+                         content_type='application/json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_category_depends_on_contents(self):
+        """Checks that the numbers of the questions and posts of a category are not answered with 304
+        after a question or a post is added to it."""
+        url = f'/api/categories/{self.category.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(response.json()['questions'], 3)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Question.objects.create(question='question 4', subject=self.category, author=self.test_user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['questions'], 4)
+        etag = response['ETag']
+        Post.objects.create(title='post', category=self.category, body='body', author=self.test_user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['posts'], 1)
+
+    def test_permissions_checked_first(self):
+        """Checks that a request without permissions is refused even with a valid ETag."""
+        self.client.login(username='test_01', password='laLA12')
+        etag = self.client.get('/api/users/')['ETag']
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/users/', HTTP_IF_NONE_MATCH=etag).status_code, 403)
@@ -0,0 +1,103 @@
+"""
+Contains unit tests for checking the in-process pool of database connections.
+"""
+
+import logging
+import sys
+import threading
+
+from django.core.management import call_command, CommandError
+from django.test import SimpleTestCase
+
+from interview_quiz.db.pool import ConnectionPool, PoolTimeout, get_pool, get_pool_stats, close_pools
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class FakeConnection:
+    """A connection of the tests, which may be broken."""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(SimpleTestCase):
+    """Test class for the connection pool."""
+
+    @staticmethod
+    def check(connection):
+        """Returns True if the fake connection is usable."""
+        return not connection.broken
+
+    def test_reuses_released_connections(self):
+        """Checks that a released connection is given out again instead of opening a new one."""
+        pool = ConnectionPool(2)
+        first = pool.acquire(FakeConnection, self.check)
+        pool.release(first)
+        self.assertIs(pool.acquire(FakeConnection, self.check), first)
+        stats = pool.stats()
+        self.assertEqual((stats['opened'], stats['acquired'], stats['open'], stats['in_use']), (1, 2, 1, 1))
+
+    def test_limit_and_timeout(self):
+        """Checks that no more than max_size connections are opened and the waiting ends with an error."""
+        pool = ConnectionPool(1, timeout=0.05)
+        pool.acquire(FakeConnection, self.check)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection, self.check)
+        stats = pool.stats()
+        self.assertEqual((stats['open'], stats['timeouts']), (1, 1))
+        self.assertGreaterEqual(stats['max_wait_time'], 0.05)
+
+    def test_waits_for_released_connection(self):
+        """Checks that a thread waiting for a connection gets the one released by another thread."""
+        pool = ConnectionPool(1, timeout=5)
+        first = pool.acquire(FakeConnection, self.check)
+        timer = threading.Timer(0.05, pool.release, [first])
+        timer.start()
+        self.assertIs(pool.acquire(FakeConnection, self.check), first)
+        timer.join()
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_broken_connection_is_replaced(self):
+        """Checks that an idle connection is checked and a broken one is closed and replaced."""
+        pool = ConnectionPool(1, check_after=0)
+        first = pool.acquire(FakeConnection, self.check)
+        pool.release(first)
+        first.broken = True
+        second = pool.acquire(FakeConnection, self.check)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        stats = pool.stats()
+        self.assertEqual((stats['broken'], stats['open'], stats['in_use']), (1, 1, 1))
+
+    def test_failed_connect_frees_place(self):
+        """Checks that an error of opening a connection does not take a place in the pool."""
+        pool = ConnectionPool(1, timeout=0.05)
+
+        def connect():
+            raise OSError('connection refused')
+
+        with self.assertRaises(OSError):
+            pool.acquire(connect, self.check)
+        self.assertIsInstance(pool.acquire(FakeConnection, self.check), FakeConnection)
+
+    def test_pools_of_process(self):
+        """Checks that the pool is created by the database settings and shared by the process."""
+        self.addCleanup(close_pools)
+        self.assertIsNone(get_pool('default', {'POOL_SIZE': 0}))
+        pool = get_pool('default', {'POOL_SIZE': 3, 'POOL_TIMEOUT': 1})
+        self.assertIs(get_pool('default', {'POOL_SIZE': 3}), pool)
+        pool.release(pool.acquire(FakeConnection, self.check))
+        self.assertEqual(get_pool_stats()['default']['idle'], 1)
+        close_pools()
+        self.assertEqual(get_pool_stats(), {})
+
+    def test_benchmark_requires_postgresql(self):
+        """Checks that the benchmark is not run on SQLite."""
+        with self.assertRaises(CommandError):
+            call_command('bench_db_pool')
@@ -0,0 +1,126 @@
+"""
+Contains integration tests for checking the routing of reads to the read replicas.
+A second SQLite database stands in for a replica; it is not replicated, so the data
+of a response shows which database has served it.
+"""
+
+import logging
+import sys
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from interview_quiz.db.router import ReplicaRouter, Routing, PIN_COOKIE, routing, primary_only
+from interview_quiz.versions import bump_version, modified_key
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from questions.views import get_available_categories
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'],
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestReplicaRouter(TestCase):
+    """Test class for the replica router and its middleware."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """Creating a test superuser and different categories in the primary and the replica."""
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_superuser=True,
+                                                    is_staff=True)
+        QuestionCategory.objects.create(name='Primary', available=True)
+        QuestionCategory.objects.using('replica').create(name='Replica', available=True)
+        self.addCleanup(cache.clear)
+        self.replica_caught_up()
+
+    @staticmethod
+    def replica_caught_up():
+        """Moves the last change of the categories and their contents back beyond the lag allowed for the replicas."""
+        for model in (QuestionCategory, Question, Post):
+            cache.set(modified_key(model), time.time() - 60, timeout=None)
+
+    def category_names(self):
+        """Returns the names of the categories of the api."""
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        return [category['name'] for category in response.json()['results']]
+
+    def test_reads_outside_requests_use_primary(self):
+        """Checks that management commands and other code outside requests read from the primary."""
+        self.assertEqual(ReplicaRouter().db_for_read(QuestionCategory), 'default')
+        self.assertEqual(list(QuestionCategory.objects.values_list('name', flat=True)), ['Primary'])
+
+    def test_get_requests_read_from_replica(self):
+        """Checks that the reads of a GET request go to the replica."""
+        self.assertEqual(self.category_names(), ['Replica'])
+
+    def test_write_pins_client_to_primary(self):
+        """Checks that the reads of a client go to the primary after its write until the cookie expires."""
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.post('/api/categories/', {'name': 'Created'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+        self.assertEqual(self.category_names(), ['Created', 'Primary'])
+
+        del self.client.cookies[PIN_COOKIE]
+        self.replica_caught_up()
+        self.assertEqual(self.category_names(), ['Replica'])
+
+    def test_fresh_version_reads_primary(self):
+        """Checks that a response validated by a version the replica may not have caught up with yet
+        is read from the primary, so its ETag never stands for the rows preceding the change."""
+        bump_version(QuestionCategory)
+        self.assertEqual(self.category_names(), ['Primary'])
+        self.replica_caught_up()
+        self.assertEqual(self.category_names(), ['Replica'])
+
+    def test_versioned_cache_filled_from_primary(self):
+        """Checks that the data cached under the current version is read from the primary."""
+        bump_version(QuestionCategory)
+        token = routing.set(Routing(use_replicas=True))
+        try:
+            self.assertEqual([category.name for category in get_available_categories()], ['Primary'])
+        finally:
+            routing.reset(token)
+        token = routing.set(Routing(use_replicas=True))
+        try:
+            self.assertEqual([category.name for category in get_available_categories()], ['Primary'])
+        finally:
+            routing.reset(token)
+
+    def test_write_pins_rest_of_request(self):
+        """Checks that the reads after a write in the same request go to the primary."""
+        router = ReplicaRouter()
+        token = routing.set(Routing(use_replicas=True))
+        try:
+            self.assertEqual(router.db_for_read(QuestionCategory), 'replica')
+            router.db_for_write(QuestionCategory)
+            self.assertEqual(router.db_for_read(QuestionCategory), 'default')
+        finally:
+            routing.reset(token)
+
+    def test_primary_only_hint(self):
+        """Checks that the explicit hint sends the reads of the rest of the request to the primary."""
+        router = ReplicaRouter()
+        token = routing.set(Routing(use_replicas=True))
+        try:
+            view = primary_only(lambda request: router.db_for_read(QuestionCategory))
+            self.assertEqual(view(None), 'default')
+            self.assertEqual(router.db_for_read(QuestionCategory), 'default')
+        finally:
+            routing.reset(token)
+
+    def test_admin_panel_reads_from_primary(self):
+        """Checks that the admin panel reads the session, the user and the data from the primary."""
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.get(reverse('myadmin:admins_categories'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([category.name for category in response.context['object_list']], ['Primary'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
@@ -0,0 +1,52 @@
+"""
+Contains integration tests for checking the indexes of the hot queries and the EXPLAIN audit command.
+"""
+
+import io
+import logging
+import sys
+
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+
+from myadmin.management.commands.explain_queries import seq_scans
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestExplainQueries(TestCase):
+    """Test class for the explain_queries command."""
+
+    def setUp(self):
+        """Creating a test user, a category, a question and a post."""
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru', score=10,
+                                                    is_active=True)
+        category = QuestionCategory.objects.create(name='Python')
+        Question.objects.create(question='question', subject=category, author=self.test_user, available=True)
+        Post.objects.create(title='post', category=category, author=self.test_user, body='text', available=True)
+
+    def test_hot_queries_use_indexes(self):
+        """Checks that none of the hot queries reads a whole table."""
+        out = io.StringIO()
+        call_command('explain_queries', '--strict', '-v', '2', stdout=out)
+        self.assertNotIn('SEQ SCAN', out.getvalue())
+        self.assertIn('question_pool_idx', out.getvalue())
+        self.assertIn('user_leaderboard_idx', out.getvalue())
+        self.assertIn('questions_questioncategory_name', out.getvalue())
+
+    def test_unknown_query(self):
+        """Checks that an unknown name of a query is reported."""
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', '--only', 'nope', stdout=io.StringIO())
+
+    def test_seq_scans(self):
+        """Checks the recognition of sequential scans in the plans of PostgreSQL and SQLite."""
+        plan = 'Limit\n  ->  Seq Scan on posts_post\n  ->  Index Scan using post_idx on questions_question'
+        self.assertEqual(seq_scans(plan, 'postgresql'), ['posts_post'])
+        plan = '2 0 0 SCAN posts_post\n3 0 0 SCAN questions_question USING INDEX question_pool_idx'
+        self.assertEqual(seq_scans(plan, 'sqlite'), ['posts_post'])
+        self.assertEqual(seq_scans('2 0 0 SEARCH users_myuser USING INDEX user_leaderboard_idx', 'sqlite'), [])
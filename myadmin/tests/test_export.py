@@ -0,0 +1,67 @@
+"""
+Contains unit and integration tests for checking the streaming export of objects.
+"""
+
+import io
+import json
+import logging
+import sys
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestExport(TestCase):
+    """Test class for the export command and the export api views."""
+
+    def setUp(self):
+        """Creating a test superuser, category and questions."""
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_staff=True)
+        category = QuestionCategory.objects.create(name='Python', description='some text')
+        for number in range(1, 6):
+            Question.objects.create(question=f'question {number}', subject=category, author=self.test_user,
+                                    available=number % 2 == 0)
+
+    def test_command_exports_csv(self):
+        """Checks the export of all questions to CSV with a header line."""
+        out = io.StringIO()
+        call_command('export_data', 'questions', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('id,question,subject_id,author_id'))
+        self.assertEqual(len(lines), 6)
+
+    def test_command_uses_filters(self):
+        """Checks that the command applies the filters of the api filterset."""
+        out = io.StringIO()
+        call_command('export_data', 'questions', '--format', 'ndjson', '--filter', 'available=true', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row['question'] for row in rows], ['question 2', 'question 4'])
+
+    def test_api_export_admins_only(self):
+        """Checks that the export is not available to anonymous users."""
+        response = self.client.get('/api/questions/export/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_api_export_streams_filtered_rows(self):
+        """Checks the streaming export of filtered users in NDJSON format."""
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.get('/api/users/export/', {'export_format': 'ndjson', 'is_active': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[0]['username'], 'test_01')
+        self.assertNotIn('password', rows[0])
+
+    def test_api_export_unknown_format(self):
+        """Checks the response to an unknown export format."""
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.get('/api/posts/export/', {'export_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,115 @@
+"""
+Contains unit and integration tests for checking the generate_data command of synthetic data.
+"""
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from myadmin.models import StatCounter
+from myadmin.stats import ANSWERS, NEW_USERS, PENDING_QUESTIONS
+from myadmin.synthetic import PASSWORD, SYNTHETIC_DOMAIN, SYNTHETIC_MARK
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+SMALL = {'users': 60, 'authors': 5, 'categories': 14, 'questions': 120, 'posts': 30, 'days': 30,
+         'until': date(2026, 1, 31), 'batch_size': 25, 'allow_production': True}
+
+
+def generate(**options):
+    """Runs the command with the small numbers of objects and returns its output."""
+    out = StringIO()
+    call_command('generate_data', stdout=out, **{**SMALL, **options})
+    return out.getvalue()
+
+
+class TestGenerateData(TestCase):
+    """Test class for the generate_data command."""
+
+    def users(self):
+        """Returns the usernames, the keys and the scores of the generated users."""
+        return list(MyUser.objects.filter(email__endswith=SYNTHETIC_DOMAIN).order_by('username')
+                    .values_list('username', 'id', 'score'))
+
+    def test_objects(self):
+        """Checks that the requested numbers of objects are created with their relations and dates."""
+        generate()
+        users = MyUser.objects.filter(email__endswith=SYNTHETIC_DOMAIN)
+        self.assertEqual(users.count(), 60)
+        self.assertEqual(QuestionCategory.objects.filter(description__startswith=SYNTHETIC_MARK).count(), 14)
+        self.assertEqual(Question.objects.filter(author__in=users).count(), 120)
+        self.assertEqual(Post.objects.filter(author__in=users).count(), 30)
+        self.assertEqual(Question.objects.values('author').distinct().count(), 5)
+        self.assertFalse(users.filter(score__lt=0).exists())
+        self.assertTrue(users.filter(score__gt=0).exists())
+        self.assertTrue(all(question.right_answer in (question.answer_01, question.answer_02, question.answer_03,
+                                                      question.answer_04) and question.tag
+                            for question in Question.objects.all()))
+        dates = sorted(Post.objects.values_list('created_on', flat=True))
+        self.assertLessEqual(dates[-1].date().isoformat(), '2026-01-31')
+        self.assertGreaterEqual(dates[0].date().isoformat(), '2026-01-01')
+        joined = list(users.order_by('username').values_list('date_joined', flat=True))
+        self.assertEqual(joined, sorted(joined))
+        self.assertTrue(users.first().check_password(PASSWORD))
+
+        counters = dict(StatCounter.objects.filter(name=ANSWERS).values_list('key', 'value'))
+        self.assertTrue(counters)
+        self.assertTrue(all('2026-01-01' <= day <= '2026-01-31' for day in counters))
+        self.assertEqual(sum(StatCounter.objects.filter(name=PENDING_QUESTIONS).values_list('value', flat=True)),
+                         Question.objects.filter(available=False).count())
+        self.assertTrue(StatCounter.objects.filter(name=NEW_USERS).exists())
+
+    def test_debug_only(self):
+        """Checks that the users with the known password are not created on a production site by mistake."""
+        with self.assertRaisesMessage(CommandError, '--allow-production'):
+            generate(allow_production=False)
+        self.assertFalse(MyUser.objects.exists())
+        with override_settings(DEBUG=True):
+            generate(allow_production=False)
+        self.assertEqual(MyUser.objects.count(), 60)
+
+    def test_deterministic(self):
+        """Checks that the same seed gives the same data and another seed another one."""
+        generate(seed=3)
+        first = self.users()
+        questions = list(Question.objects.order_by('pk').values_list('question', 'tag'))
+        generate(seed=3, replace=True)
+        self.assertEqual(self.users(), first)
+        self.assertEqual(list(Question.objects.order_by('pk').values_list('question', 'tag')), questions)
+        generate(seed=4, replace=True)
+        self.assertNotEqual(self.users(), first)
+
+    def test_replace(self):
+        """Checks that the data is generated once unless it is replaced, and that replacing leaves other data."""
+        category = QuestionCategory.objects.create(name='Python', available=True)
+        generate()
+        with self.assertRaises(CommandError):
+            generate()
+        output = generate(replace=True, users=10, questions=3, posts=0)
+        self.assertIn('users.MyUser: 60 deleted', output)
+        self.assertEqual(MyUser.objects.filter(email__endswith=SYNTHETIC_DOMAIN).count(), 10)
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(QuestionCategory.objects.filter(pk=category.pk).exists())
+
+    def test_images(self):
+        """Checks that the placeholder images are created and used."""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        with override_settings(MEDIA_ROOT=media):
+            generate(images=3)
+        self.assertEqual(sorted(os.listdir(os.path.join(media, 'synthetic'))),
+                         ['placeholder_01.png', 'placeholder_02.png', 'placeholder_03.png'])
+        self.assertTrue(all(post.image.name.startswith('synthetic/') for post in Post.objects.all()))
@@ -0,0 +1,101 @@
+"""
+Contains unit and integration tests for checking the data grids of the admin panel.
+"""
+
+import logging
+import sys
+
+from django.http import QueryDict
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from myadmin.grids import QuestionGrid, UserGrid, GridError
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestGrids(TestCase):
+    """Test class for the grids and their views."""
+
+    def setUp(self):
+        """Creating a test superuser, categories and questions."""
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_superuser=True)
+        python = QuestionCategory.objects.create(name='Python')
+        django = QuestionCategory.objects.create(name='Django')
+        for number in range(1, 8):
+            Question.objects.create(question=f'question {number}', subject=python if number % 2 else django,
+                                    author=self.test_user, tag=f'tag {number % 3}', available=number > 4)
+
+    @staticmethod
+    def params(**kwargs):
+        """Returns the parameters of a grid request."""
+        params = QueryDict(mutable=True)
+        params.update(kwargs)
+        return params
+
+    def walk(self, grid, **kwargs):
+        """Returns all rows of the grid, requesting the pages one by one with the cursors."""
+        rows, page = [], grid.get_page(self.params(**kwargs))
+        rows.extend(page['rows'])
+        while page['next']:
+            page = grid.get_page(self.params(cursor=page['next'], **kwargs))
+            rows.extend(page['rows'])
+        return rows
+
+    def test_keyset_pages_cover_all_rows(self):
+        """Checks that the pages follow each other without gaps and repetitions in any order."""
+        grid = QuestionGrid()
+        expected = list(Question.objects.order_by('-tag', '-pk').values_list('question', flat=True))
+        rows = self.walk(grid, sort='-tag', limit=2)
+        self.assertEqual([row[1] for row in rows], expected)
+
+    def test_sort_by_related_column(self):
+        """Checks sorting by the name of the category of the question."""
+        rows = self.walk(QuestionGrid(), sort='subject__name', limit=3)
+        self.assertEqual([row[2] for row in rows], ['Django'] * 3 + ['Python'] * 4)
+
+    def test_filters(self):
+        """Checks a text filter, a boolean filter and a filter by the author."""
+        page = QuestionGrid().get_page(self.params(tag='TAG 1', available='true', author__username='test'))
+        self.assertEqual(sorted(row[1] for row in page['rows']), ['question 7'])
+        self.assertIsNone(page['next'])
+
+    def test_uuid_primary_key(self):
+        """Checks keyset pagination of users sorted by their uuid primary keys."""
+        MyUser.objects.create_user(username='test_02', email='bla@bla.ru')
+        rows = self.walk(UserGrid(), limit=1)
+        self.assertEqual(len(rows), 2)
+
+    def test_incorrect_parameters(self):
+        """Checks that incorrect parameters are reported."""
+        grid = QuestionGrid()
+        for params in ({'sort': 'password'}, {'available': 'maybe'}, {'cursor': 'abc'}, {'limit': 'all'}):
+            with self.assertRaises(GridError):
+                grid.get_page(self.params(**params))
+
+    def test_data_view(self):
+        """Checks the json page of the grid and the errors of the view."""
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.get(reverse('myadmin:admins_grid_data', args=['questions']), {'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['rows']), 5)
+        self.assertIsNotNone(response.json()['next'])
+        response = self.client.get(reverse('myadmin:admins_grid_data', args=['questions']), {'sort': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('myadmin:admins_grid_data', args=['nope']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_view(self):
+        """Checks the page of the grid and that it is available to superusers only."""
+        response = self.client.get(reverse('myadmin:admins_grid', args=['users']))
+        self.assertEqual(response.status_code, 302)
+        self.client.login(username='test_01', password='laLA12')
+        response = self.client.get(reverse('myadmin:admins_grid', args=['users']))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'myadmin/grid.html')
+        self.assertEqual(response.context['grid_columns'][1][0], 'username')
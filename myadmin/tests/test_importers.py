@@ -0,0 +1,168 @@
+"""
+Contains unit and integration tests for checking the bulk import of questions and posts.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from unittest import mock
+
+from PIL import Image
+from django.core import mail
+from django.core.management import call_command, CommandError
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from myadmin.importers import QuestionImporter, PostImporter, ImportFileError, guess_format
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+QUESTIONS_CSV = ('question,subject,right_answer,answer_01,answer_02,answer_03,answer_04,difficulty_level,'
+                 'available,tag,image_01\n'
+                 'What is a list?,Python,mutable,mutable,immutable,both,none,NB,true,list,list.png\n'
+                 'What is a tuple?,Python,immutable,mutable,immutable,both,none,AV,false,tuple,\n'
+                 'Wrong answer,Python,unknown,mutable,immutable,both,none,NB,true,list,\n'
+                 'No category,Ruby,mutable,mutable,immutable,both,none,NB,true,list,\n')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestImporters(TestCase):
+    """Test class for the importers of questions and posts."""
+
+    @classmethod
+    def tearDownClass(cls):
+        """Removes the images saved during the tests."""
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        """Creating a test user and category."""
+        self.test_user = MyUser.objects.create_user(username='drf', email='drf@bla.ru', is_active=True)
+        self.test_category = QuestionCategory.objects.create(name='Python', description='some text')
+
+    @staticmethod
+    def make_archive(name, size=(1200, 800)):
+        """Returns a zip archive with one test image."""
+        image = io.BytesIO()
+        Image.new('RGB', size).save(image, 'PNG')
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr(name, image.getvalue())
+        archive.seek(0)
+        return archive
+
+    def test_guess_format(self):
+        """Checks the detection of the format of the file by its extension."""
+        self.assertEqual(guess_format('questions.jsonl'), 'jsonl')
+        self.assertEqual(guess_format('questions.CSV'), 'csv')
+
+    def test_import_questions_csv(self):
+        """Checks that correct rows are created and incorrect ones are reported."""
+        importer = QuestionImporter(archive=self.make_archive('list.png'), batch_size=1)
+        result = importer.run(io.StringIO(QUESTIONS_CSV), 'csv')
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual([line_num for line_num, error in result.errors], [4, 5])
+        self.assertEqual(Question.objects.count(), 2)
+
+        question = Question.objects.get(question='What is a list?')
+        self.assertTrue(question.available)
+        self.assertEqual(question.subject, self.test_category)
+        self.assertEqual(question.author.username, 'drf')
+        self.assertTrue(question.image_01.name.startswith('que_images/Python/'))
+        with Image.open(question.image_01.path) as img:
+            self.assertEqual(img.size, (600, 400))
+        self.assertFalse(Question.objects.get(question='What is a tuple?').available)
+
+    def test_import_sends_one_summary_email(self):
+        """Checks that only one summary email is sent instead of an email for every new object."""
+        importer = QuestionImporter(archive=self.make_archive('list.png'))
+        importer.run(io.StringIO(QUESTIONS_CSV), 'csv')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_import_rows_with_images_requires_archive(self):
+        """Checks that rows with images are rejected if there is no archive."""
+        result = QuestionImporter().run(io.StringIO(QUESTIONS_CSV), 'csv')
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.failed, 3)
+
+    def test_import_unknown_author(self):
+        """Checks that rows of a nonexistent author are rejected."""
+        rows = json.dumps({'title': 'Title', 'category': 'Python', 'body': 'text', 'author': 'nobody'})
+        result = PostImporter().run(io.StringIO(rows), 'jsonl')
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.failed, 1)
+
+    def test_import_posts_jsonl(self):
+        """Checks the import of posts from a JSONL file, including an incorrect JSON line."""
+        rows = '\n'.join([
+            json.dumps({'title': 'Generators', 'category': 'Python', 'body': 'text', 'tag': 'generator'}),
+            '{not a json',
+            json.dumps({'title': 'Decorators', 'category': self.test_category.id, 'body': 'text',
+                        'available': True}),
+        ])
+        result = PostImporter(batch_size=10).run(io.StringIO(rows), 'jsonl')
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors[0][0], 2)
+        self.assertEqual(Post.objects.filter(available=True).count(), 1)
+        self.assertEqual(Post.objects.get(title='Generators').tag, 'generator')
+
+    def test_import_command(self):
+        """Checks the import through the management command."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as csv_file:
+            csv_file.write(QUESTIONS_CSV.replace(',list.png', ','))
+        out = io.StringIO()
+        call_command('import_content', 'questions', csv_file.name, stdout=out, stderr=io.StringIO())
+        os.remove(csv_file.name)
+        self.assertIn('Создано объектов: 2', out.getvalue())
+        self.assertEqual(Question.objects.count(), 2)
+
+    def test_import_command_bad_archive(self):
+        """Checks that a missing or broken archive is reported as an error of the command."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as csv_file:
+            csv_file.write(QUESTIONS_CSV)
+        self.addCleanup(os.remove, csv_file.name)
+        with tempfile.NamedTemporaryFile('wb', suffix='.zip', delete=False) as archive:
+            archive.write(b'not a zip archive')
+        self.addCleanup(os.remove, archive.name)
+        for path in (archive.name + '.missing', archive.name):
+            with self.assertRaises(CommandError):
+                call_command('import_content', 'questions', csv_file.name, '--archive', path,
+                             stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertFalse(Question.objects.exists())
+
+    def test_import_unreadable_file(self):
+        """Checks that a file not in UTF-8 or with an incorrect CSV is reported with the line it stops at."""
+        with tempfile.NamedTemporaryFile('wb', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(QUESTIONS_CSV.replace(',list.png', ',').encode('utf-8') + 'Вопрос'.encode('cp1251'))
+        self.addCleanup(os.remove, csv_file.name)
+        with self.assertRaisesMessage(CommandError, 'Файл не читается'):
+            call_command('import_content', 'questions', csv_file.name, '--batch-size', '1',
+                         stdout=io.StringIO(), stderr=io.StringIO())
+
+        rows = QUESTIONS_CSV.replace('What is a tuple?', 'x' * (csv.field_size_limit() + 1))
+        with self.assertRaisesMessage(ImportFileError, 'после строки 2'):
+            QuestionImporter(archive=self.make_archive('list.png')).run(io.StringIO(rows), 'csv')
+
+    def test_images_deleted_on_failed_batch(self):
+        """Checks that the images stored for a batch are deleted when the batch cannot be saved."""
+        def stored():
+            return [name for _, _, files in os.walk(MEDIA_ROOT) for name in files]
+
+        before = stored()
+        with mock.patch.object(Question.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                QuestionImporter(archive=self.make_archive('list.png')).run(io.StringIO(QUESTIONS_CSV), 'csv')
+        self.assertEqual(stored(), before)
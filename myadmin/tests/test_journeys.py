@@ -0,0 +1,130 @@
+"""
+Contains unit and integration tests for checking the load tests of the user journeys:
+the scenarios run against a live server, the reports and the stand-in of memcached.
+"""
+
+import csv
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from django.core.cache.backends.memcached import PyMemcacheCache
+from django.core.management import call_command, CommandError
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from myadmin.journeys.memcached import MemcachedStandIn
+from myadmin.journeys.report import compare, summarize
+from myadmin.journeys.scenarios import users_of_runs
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestJourneys(LiveServerTestCase):
+    """Test class for the loadtest_journeys command run against a live server."""
+
+    def setUp(self):
+        """Creating a category with questions of one level and the temporary files of the reports."""
+        author = MyUser.objects.create_user(username='author', email='author@example.com', password='laLA12')
+        category = QuestionCategory.objects.create(name='Python', available=True)
+        for number in range(3):
+            Question.objects.create(question=f'Question {number}?', subject=category, author=author,
+                                    answer_01='a', answer_02='b', answer_03='c', answer_04='d', right_answer='a',
+                                    difficulty_level=Question.NEWBIE, available=True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_report(self):
+        """Checks that all steps of the scenarios succeed, are reported and their users are deleted."""
+        report = os.path.join(self.directory.name, 'report.csv')
+        page = os.path.join(self.directory.name, 'report.html')
+        for scenario, steps in (('journey', ('register:submit', 'verify', 'quiz:start', 'quiz:answer', 'top_users')),
+                                ('quiz', ('login:submit', 'category', 'quiz:answer', 'quiz:next', 'top_users')),
+                                ('browse', ('browse:index', 'browse:posts', 'browse:api'))):
+            out = io.StringIO()
+            call_command('loadtest_journeys', self.live_server_url, '--scenario', scenario, '--users', '1',
+                         '--duration', '2', '--think', '0', '--answers', '2', '--csv', report, '--html', page,
+                         '--baseline', '', stdout=out)
+            with open(report, encoding='utf-8') as file:
+                rows = {row['step']: row for row in csv.DictReader(file)}
+            for step in steps:
+                self.assertIn(step, rows, scenario)
+                self.assertIn(step, out.getvalue())
+            self.assertEqual(rows['total']['errors'], '0', scenario)
+            with open(page, encoding='utf-8') as file:
+                self.assertIn(steps[-1], file.read())
+        self.assertFalse(users_of_runs().exists())
+
+    def test_no_questions(self):
+        """Checks that the run is refused when there are no available questions."""
+        Question.objects.update(available=False)
+        with self.assertRaises(CommandError):
+            call_command('loadtest_journeys', self.live_server_url, '--baseline', '', stdout=io.StringIO())
+
+
+class TestReport(SimpleTestCase):
+    """Test class for the rows of the reports and their comparison with the baseline."""
+
+    def test_summarize(self):
+        """Checks the rows of the steps in the given order, their errors and the total."""
+        results = [('b', 200, 0.01, False)] * 99 + [('b', 500, 1.0, True), ('a', None, 0.5, True)]
+        rows = summarize(results, 10, order=('a', 'b'))
+        self.assertEqual([row['step'] for row in rows], ['a', 'b', 'total'])
+        self.assertEqual((rows[1]['requests'], rows[1]['errors'], rows[1]['rps']), (100, 1, 10))
+        self.assertEqual((rows[1]['p50'], rows[1]['max']), (10, 1000))
+        self.assertEqual(rows[2]['errors'], 2)
+
+    def test_compare(self):
+        """Checks that only the steps with enough requests whose p95 has grown too much are regressions."""
+        baseline = {'a': {'requests': 100, 'p95': 100.0}, 'b': {'requests': 100, 'p95': 100.0},
+                    'c': {'requests': 10, 'p95': 100.0}}
+        rows = [{'step': 'a', 'requests': 100, 'p95': 120.0}, {'step': 'b', 'requests': 100, 'p95': 200.0},
+                {'step': 'c', 'requests': 100, 'p95': 500.0}, {'step': 'd', 'requests': 100, 'p95': 500.0}]
+        self.assertEqual([row['step'] for row in compare(rows, baseline, 50)], ['b'])
+        self.assertAlmostEqual(rows[0]['change'], 20)
+        self.assertNotIn('change', rows[2])
+
+
+class TestMemcachedStandIn(SimpleTestCase):
+    """Test class for the stand-in of memcached used through the cache backend of the site."""
+
+    def setUp(self):
+        """Starting the stand-in and connecting the cache backend to it."""
+        self.server = MemcachedStandIn()
+        self.cache = PyMemcacheCache(self.server.start(), {})
+        self.addCleanup(self.server.stop)
+        self.addCleanup(self.cache.close)
+
+    def test_operations(self):
+        """Checks the operations of the cache used by the site."""
+        self.cache.set('one', {'value': 1})
+        self.cache.set_many({'two': 2, 'three': 'три'})
+        self.assertEqual(self.cache.get('one'), {'value': 1})
+        self.assertEqual(self.cache.get_many(['two', 'three', 'four']), {'two': 2, 'three': 'три'})
+        self.assertFalse(self.cache.add('two', 20))
+        self.assertTrue(self.cache.add('four', 4))
+        self.assertEqual(self.cache.incr('four', 3), 7)
+        self.assertEqual(self.cache.decr('four', 10), 0)
+        self.assertTrue(self.cache.delete('one'))
+        self.assertFalse(self.cache.delete('one'))
+        self.assertEqual(self.cache.get_or_set('five', 5), 5)
+        self.cache.delete_many(['two', 'three'])
+        self.assertEqual(self.cache.get_many(['two', 'three']), {})
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('five'))
+
+    def test_expiration(self):
+        """Checks that the items expire and the touched items get the new expiration."""
+        self.cache.set('short', 1, timeout=1)
+        self.cache.set('touched', 1, timeout=1)
+        self.cache.set('gone', 1, timeout=-1)
+        self.assertTrue(self.cache.touch('touched', 10))
+        self.assertIsNone(self.cache.get('gone'))
+        time.sleep(1.1)
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.get('touched'), 1)
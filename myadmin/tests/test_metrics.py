@@ -0,0 +1,157 @@
+"""
+Contains unit and integration tests for checking the metrics of the site exposed to Prometheus.
+"""
+
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, SimpleTestCase, Client, override_settings
+from django.urls import reverse
+
+from interview_quiz import metrics
+from interview_quiz.metrics import Counter, REGISTRY, exposition, mark_process_dead, process_file, write_values
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+def sample(text, line):
+    """Returns the value of the sample of the exposition, 0 if there is no such sample."""
+    found = re.search(rf'^{re.escape(line)} (\S+)$', text, re.MULTILINE)
+    return float(found.group(1)) if found else 0
+
+
+class TestMetrics(TestCase):
+    """Test class for the metrics of the requests and the quiz and the /metrics view."""
+
+    def setUp(self):
+        """Creating a participant, a category and a question."""
+        self.client = Client()
+        self.user = MyUser.objects.create_user(username='user', email='user@example.com', password='laLA12',
+                                               is_active=True)
+        self.category = QuestionCategory.objects.create(name='Python', available=True)
+        self.question = Question.objects.create(question='What is a list?', subject=self.category,
+                                                author=self.user, right_answer='mutable',
+                                                difficulty_level=Question.NEWBIE, available=True)
+
+    def scrape(self, **headers):
+        """Returns the metrics read by the view."""
+        response = self.client.get('/metrics', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_requests(self):
+        """Checks that the requests are counted by the url name with their latency and database queries."""
+        before = self.scrape()
+        self.client.get(reverse('questions:categories'))
+        after = self.scrape()
+        labels = 'url_name="questions:categories",method="GET"'
+        for line in (f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}',
+                     f'http_request_duration_seconds_count{{{labels}}}',
+                     f'http_requests_total{{{labels},status="200"}}'):
+            self.assertEqual(sample(after, line) - sample(before, line), 1, line)
+        self.assertGreater(sample(after, 'db_queries_total'), sample(before, 'db_queries_total'))
+        self.assertEqual(sample(after, 'http_requests_in_flight'), 1)
+
+    def test_quiz(self):
+        """Checks that the started tests and the answers are counted by the category, the level and the result."""
+        before = self.scrape()
+        self.client.login(username='user', password='laLA12')
+        self.client.post(reverse('questions:test_body', args=[self.category.pk]),
+                         {'csrfmiddlewaretoken': '', 'dif': Question.NEWBIE, 'limit': 'no'})
+        url = reverse('questions:answers', args=[self.question.pk])
+        self.client.get(url, {'csrfmiddlewaretoken': '', 'answer': 'mutable'})
+        self.client.get(url, {'csrfmiddlewaretoken': '', 'answer': 'immutable'})
+        after = self.scrape()
+        for line, delta in ((f'quiz_starts_total{{category="Python",level="{Question.NEWBIE}"}}', 1),
+                            (f'quiz_answers_total{{level="{Question.NEWBIE}",result="correct"}}', 1),
+                            (f'quiz_answers_total{{level="{Question.NEWBIE}",result="wrong"}}', 1)):
+            self.assertEqual(sample(after, line) - sample(before, line), delta, line)
+
+    def test_protection(self):
+        """Checks that the metrics are read only directly from the allowed addresses or with the token."""
+        self.assertEqual(self.client.get('/metrics', HTTP_X_FORWARDED_FOR='10.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1').status_code, 403)
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8']):
+            self.scrape(REMOTE_ADDR='10.0.0.1')
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.1',
+                                             HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.scrape(REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='10.0.0.1', HTTP_AUTHORIZATION='Bearer secret')
+
+
+class TestRegistry(SimpleTestCase):
+    """Test class for the registry of the metrics, its multiprocess mode and the counted emails."""
+
+    def setUp(self):
+        """Creating a test counter removed from the registry at the end."""
+        self.counter = Counter('test_events_total', 'The events of the test.', ('kind',))
+        self.addCleanup(REGISTRY.remove, self.counter)
+
+    def test_threads(self):
+        """Checks that the changes of the threads are summed."""
+        def run():
+            for _ in range(1000):
+                self.counter.inc(kind='thread')
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIn('# TYPE test_events_total counter', exposition())
+        self.assertEqual(sample(exposition(), 'test_events_total{kind="thread"}'), 4000)
+
+    def test_finished_threads(self):
+        """Checks that the values of the finished threads are kept while their dicts are dropped."""
+        shards = len(metrics._shards)
+        for _ in range(50):
+            thread = threading.Thread(target=self.counter.inc, kwargs={'kind': 'short'})
+            thread.start()
+            thread.join()
+        self.assertEqual(len(metrics._shards), shards)
+        self.assertEqual(sample(exposition(), 'test_events_total{kind="short"}'), 50)
+
+    def test_escaping(self):
+        """Checks that the values of the labels are escaped."""
+        self.counter.inc(kind='a "quoted"\\ value')
+        self.assertEqual(sample(exposition(), r'test_events_total{kind="a \"quoted\"\\ value"}'), 1)
+
+    def test_multiprocess(self):
+        """Checks that the files of the workers are summed and the gauges of a stopped worker are dropped."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(METRICS_DIR=directory):
+            self.counter.inc(2, kind='worker')
+            write_values(process_file(999999), {('test_events_total', ('worker',), ''): 3,
+                                                ('http_requests_in_flight', (), ''): 5})
+            text = exposition()
+            self.assertTrue(os.path.exists(process_file(os.getpid())))
+            self.assertEqual(sample(text, 'test_events_total{kind="worker"}'), 5)
+            self.assertEqual(sample(text, 'http_requests_in_flight'), 5)
+
+            mark_process_dead(999999, directory)
+            text = exposition()
+            self.assertEqual(sample(text, 'test_events_total{kind="worker"}'), 5)
+            self.assertEqual(sample(text, 'http_requests_in_flight'), 0)
+
+    @override_settings(EMAIL_BACKEND='interview_quiz.mail.EmailBackend')
+    def test_emails(self):
+        """Checks that the emails handed to the backend, sent and failed are counted."""
+        before = exposition()
+        with mock.patch('django.core.mail.backends.smtp.EmailBackend.send_messages', return_value=1):
+            mail.send_mass_mail([('subject', 'message', 'from@example.com', ['to@example.com'])] * 2)
+        after = exposition()
+        for state, delta in (('queued', 2), ('sent', 1), ('failed', 1)):
+            line = f'emails_total{{state="{state}"}}'
+            self.assertEqual(sample(after, line) - sample(before, line), delta, line)
@@ -0,0 +1,93 @@
+"""
+Contains unit and integration tests for checking the cached OpenAPI schema of the REST api.
+"""
+
+import json
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+
+from interview_quiz import api_views
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestOpenApiSchema(TestCase):
+    """Test class for the generation and the serving of the schema."""
+
+    def setUp(self):
+        """Creating a temporary directory for the schema files and clearing the loaded schemas."""
+        cache.clear()
+        self.client = Client()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=Path(directory.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        api_views.loaded_schemas.clear()
+        self.addCleanup(api_views.loaded_schemas.clear)
+
+    def test_generated_once(self):
+        """Checks that the schema is generated by the first request only and is served with an ETag."""
+        with mock.patch.object(api_views, 'generate_schemas', wraps=api_views.generate_schemas) as generate:
+            response = self.client.get('/swagger.json')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('/questions/', json.loads(response.content)['paths'])
+            self.client.get('/swagger.json')
+            response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get('/swagger/', {'format': 'openapi'})
+            self.assertEqual(response['Content-Type'], 'application/openapi+json')
+        self.assertEqual(generate.call_count, 1)
+
+    def test_built_files_and_cache(self):
+        """Checks that a built schema is read from its file, or from the cache in another process."""
+        path, = api_views.build_schemas(('json',))
+        with mock.patch.object(api_views, 'generate_schemas', side_effect=AssertionError):
+            self.assertEqual(self.client.get('/swagger.json').content, path.read_bytes())
+            api_views.loaded_schemas.clear()
+            path.unlink()
+            self.assertEqual(self.client.get('/swagger.json').status_code, 200)
+
+    def test_new_version_regenerated(self):
+        """Checks that a new version of the code gets a new schema and a new ETag."""
+        etag = self.client.get('/swagger.json')['ETag']
+        with mock.patch.object(api_views, 'get_schema_version', return_value='new'), \
+                mock.patch.object(api_views, 'generate_schemas', wraps=api_views.generate_schemas) as generate:
+            response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_served_host(self):
+        """Checks that the schema names no host, so the clients use the host serving it."""
+        schema = json.loads(self.client.get('/swagger.json').content)
+        self.assertNotIn('host', schema)
+        self.assertEqual(schema['basePath'], '/api')
+
+    def test_version(self):
+        """Checks that the version follows the release, and without it - any python file of the project."""
+        self.addCleanup(api_views.get_schema_version.cache_clear)
+        versions = []
+        for release in ('1.0', '1.1'):
+            with override_settings(RELEASE=release):
+                api_views.get_schema_version.cache_clear()
+                versions.append(api_views.get_schema_version())
+        self.assertNotEqual(versions[0], versions[1])
+
+        with tempfile.NamedTemporaryFile(suffix='.py') as source, override_settings(RELEASE=''), \
+                mock.patch.object(api_views, 'project_sources', return_value=[Path(source.name)]):
+            api_views.get_schema_version.cache_clear()
+            version = api_views.get_schema_version()
+            source.write(b'# changed')
+            source.flush()
+            api_views.get_schema_version.cache_clear()
+            self.assertNotEqual(api_views.get_schema_version(), version)
+        self.assertIn(Path(api_views.__file__), api_views.project_sources())
@@ -0,0 +1,45 @@
+"""
+Contains integration tests for checking the templates in the production profile (DEBUG unset).
+"""
+
+import logging
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+#: the code of the checking process: it compiles the templates of the project and renders the base page
+#: with the applications installed in production; the static files are not collected in the tests
+RENDER_CODE = '''
+import django
+django.setup()
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import get_template
+from django.test import RequestFactory, override_settings
+for directory in [settings.BASE_DIR / 'templates'] + sorted(settings.BASE_DIR.glob('*/templates')):
+    for path in sorted(directory.rglob('*.html')):
+        get_template(str(path.relative_to(directory)))
+request = RequestFactory().get('/')
+request.user = AnonymousUser()
+with override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'):
+    print(get_template('questions/base.html').render({'title': 'Главная'}, request))
+'''
+
+
+class TestProductionProfile(SimpleTestCase):
+    """Test class for the templates rendered by the production workers."""
+
+    def test_templates_render(self):
+        """Checks that the templates of the project load only the tag libraries of the applications
+        installed in production and that the base page is rendered with the counter of the metrics."""
+        env = dict(os.environ, DEBUG='', DJANGO_SETTINGS_MODULE='interview_quiz.settings',
+                   PYTHONPATH=str(settings.BASE_DIR))
+        process = subprocess.run([sys.executable, '-c', RENDER_CODE], env=env, capture_output=True, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertIn(settings.YANDEX_METRICA_COUNTER_ID, process.stdout)
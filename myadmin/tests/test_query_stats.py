@@ -0,0 +1,122 @@
+"""
+Contains unit and integration tests for checking the statistics of the database queries
+by their fingerprints, the query_report command and the page of the admin panel.
+"""
+
+import logging
+import shutil
+import sys
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, SimpleTestCase, Client, override_settings
+from django.urls import reverse
+
+from interview_quiz import metrics
+from interview_quiz.db import queries
+from questions.models import QuestionCategory
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestFingerprint(SimpleTestCase):
+    """Test class for the fingerprints of SQL and the percentiles of the ranges of time."""
+
+    def test_literals(self):
+        """Checks that the literals, the placeholders and the lists of values are replaced."""
+        self.assertEqual(
+            queries.fingerprint('SELECT "U0"."id_2" FROM "t"  WHERE "t"."id" IN (%s, %s, %s)\n'
+                                'AND "t"."name" = \'it\'\'s\' AND "t"."level" > 1.5 LIMIT 21'),
+            'SELECT "U0"."id_2" FROM "t" WHERE "t"."id" IN (...) AND "t"."name" = ? AND "t"."level" > ? LIMIT ?')
+        self.assertEqual(queries.fingerprint('INSERT INTO "t" ("a", "b") VALUES (%s, %s), (%s, %s)'),
+                         queries.fingerprint('INSERT INTO "t" ("a", "b") VALUES (%s, %s)'))
+
+    def test_upper_bound(self):
+        """Checks the percentile of the ranges of time."""
+        buckets = [0] * (len(queries.BOUNDS) + 1)
+        buckets[0], buckets[5] = 94, 6
+        self.assertEqual(queries.upper_bound(buckets, 0.5), queries.BOUNDS[0])
+        self.assertEqual(queries.upper_bound(buckets, 0.95), queries.BOUNDS[5])
+        buckets[-1] = 100
+        self.assertEqual(queries.upper_bound(buckets, 0.95), queries.BOUNDS[-1] * 2)
+
+
+@override_settings(QUERY_STATS=True)
+class TestQueryStats(TestCase):
+    """Test class for the statistics of the queries of the requests, the command and the page."""
+
+    def setUp(self):
+        """Creating a staff user, a participant and a category, forgetting the queries made before."""
+        self.client = Client()
+        MyUser.objects.create_user(username='staff', email='staff@example.com', password='laLA12',
+                                   is_active=True, is_staff=True)
+        MyUser.objects.create_user(username='user', email='user@example.com', password='laLA12', is_active=True)
+        QuestionCategory.objects.create(name='Python', available=True)
+        queries.clear()
+        self.addCleanup(queries.clear)
+
+    def category_rows(self, rows):
+        """Returns the rows of the queries of the categories."""
+        return [row for row in rows if 'FROM "questions_questioncategory"' in row['fingerprint']]
+
+    def test_requests(self):
+        """Checks that the queries are grouped by the fingerprint with the view and the place of the code."""
+        self.client.get(reverse('questions:categories'))
+        self.client.get(reverse('questions:categories'))
+        rows, samples = queries.report(queries.load(), top=100)
+        found = self.category_rows(rows)
+        self.assertTrue(found)
+        self.assertEqual(found[0]['view'], 'questions.views.AllCategoriesView')
+        self.assertNotIn('site-packages', found[0]['location'])
+        self.assertEqual(found[0]['count'] % 2, 0)
+        self.assertGreaterEqual(found[0]['p95'], found[0]['mean'] / 2)
+        self.assertEqual(samples, [])
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_samples(self):
+        """Checks that the slow queries are kept by their fingerprints without the parameters, the slowest first."""
+        self.client.get(reverse('questions:categories'))
+        _, samples = queries.report(queries.load())
+        self.assertTrue(samples)
+        self.assertEqual([sample['duration'] for sample in samples],
+                         sorted((sample['duration'] for sample in samples), reverse=True))
+        self.assertEqual(set(samples[0]), {'fingerprint', 'duration', 'view', 'location', 'time'})
+
+    @override_settings(QUERY_STATS=False)
+    def test_disabled(self):
+        """Checks that the queries are not recorded when the statistics are turned off."""
+        self.client.get(reverse('questions:categories'))
+        self.assertEqual(queries.snapshot()['stats'], {})
+
+    def test_workers(self):
+        """Checks that the files of the workers are summed and shown by the command and the page."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.client.get(reverse('questions:categories'))
+        with override_settings(METRICS_DIR=directory):
+            metrics.flush()
+            queries.flush(directory, 999999)
+            rows, _ = queries.report(queries.load(directory), top=100)
+            single, _ = queries.report([queries.snapshot()], top=100)
+            self.assertEqual(self.category_rows(rows)[0]['count'], 2 * self.category_rows(single)[0]['count'])
+
+            out = StringIO()
+            call_command('query_report', top=100, sort='count', stdout=out)
+            self.assertIn('FROM "questions_questioncategory"', out.getvalue())
+            self.assertIn('questions.views.AllCategoriesView at ', out.getvalue())
+
+            self.client.login(username='staff', password='laLA12')
+            response = self.client.get(reverse('myadmin:admins_queries'), {'sort': 'p95'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['sort'], 'p95')
+            self.assertContains(response, 'questions.views.AllCategoriesView')
+
+    def test_page_for_staff_only(self):
+        """Checks that the participants and the anonymous users are redirected from the page."""
+        url = reverse('myadmin:admins_queries')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.login(username='user', password='laLA12')
+        self.assertEqual(self.client.get(url).status_code, 302)
@@ -0,0 +1,109 @@
+"""
+Contains unit and integration tests for checking the time-ordered primary keys of the users
+and the re-keying of the existing users.
+"""
+
+import logging
+import sys
+import time
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils.timezone import now
+
+from interview_quiz.db.keys import uuid7, user_references
+from myadmin.management.commands.rekey_users import index_sessions, rekey_sessions
+from questions.models import Question, QuestionCategory
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestUuid7(TestCase):
+    """Test class for the generation of the keys."""
+
+    def test_keys_are_ordered(self):
+        """Checks that the keys are of version 7, of the RFC variant and strictly increasing."""
+        keys = [uuid7() for _ in range(10000)]
+        self.assertEqual({key.version for key in keys}, {7})
+        self.assertEqual({key.variant for key in keys}, {uuid.RFC_4122})
+        self.assertEqual(keys, sorted(set(keys)))
+
+    def test_keys_hold_time(self):
+        """Checks that a key starts with its time in milliseconds."""
+        self.assertAlmostEqual(uuid7().int >> 80, time.time() * 1000, delta=1000)
+        self.assertEqual(uuid7(1700000000.5).int >> 80, 1700000000500)
+
+    def test_new_users_get_ordered_keys(self):
+        """Checks that new users get keys of version 7 in the order of registration."""
+        first = MyUser.objects.create_user(username='first', email='first@example.com')
+        second = MyUser.objects.create_user(username='second', email='second@example.com')
+        self.assertEqual(first.pk.version, 7)
+        self.assertLess(first.pk, second.pk)
+
+
+class TestRekeyUsers(TestCase):
+    """Test class for the rekey_users command."""
+
+    def setUp(self):
+        """Creating the users with random keys, their questions, groups and sessions."""
+        self.client = Client()
+        joined = now() - timedelta(days=10)
+        for number in range(5):
+            MyUser.objects.create_user(id=uuid.uuid4(), username=f'user_{number}', password='laLA12',
+                                       email=f'user_{number}@example.com', is_active=True,
+                                       date_joined=joined + timedelta(days=number))
+        self.author = MyUser.objects.get(username='user_3')
+        self.author.groups.add(Group.objects.create(name='authors'))
+        category = QuestionCategory.objects.create(name='Python')
+        Question.objects.create(question='What is a list?', subject=category, author=self.author)
+        self.client.login(username='user_3', password='laLA12')
+
+    def test_references(self):
+        """Checks that the foreign keys of the questions, the groups and the admin log are found."""
+        references = user_references(MyUser)
+        self.assertIn(('questions_question', 'author_ref_id'), references)
+        self.assertIn(('users_myuser_groups', 'myuser_id'), references)
+        self.assertIn(('django_admin_log', 'user_id'), references)
+
+    def test_rekey(self):
+        """Checks that the users get keys in the order of registration, keeping their relations and sessions."""
+        out = StringIO()
+        call_command('rekey_users', batch_size=2, stdout=out)
+        self.assertIn('5 users re-keyed, 1 sessions changed', out.getvalue())
+
+        users = list(MyUser.objects.order_by('date_joined'))
+        self.assertEqual({user.pk.version for user in users}, {7})
+        self.assertEqual(users, sorted(users, key=lambda user: user.pk))
+        author = MyUser.objects.get(username='user_3')
+        self.assertNotEqual(author.pk, self.author.pk)
+        self.assertEqual(Question.objects.get().author, author)
+        self.assertEqual(list(author.groups.values_list('name', flat=True)), ['authors'])
+        self.assertEqual(self.client.get(reverse('users:profile')).context['user'], author)
+
+        out = StringIO()
+        call_command('rekey_users', stdout=out)
+        self.assertIn('0 users re-keyed', out.getvalue())
+
+    def test_sessions_read_once(self):
+        """Checks that only the sessions of the re-keyed users are read after the index,
+        and that the sessions saved later are indexed separately."""
+        other = Client()
+        other.login(username='user_1', password='laLA12')
+        started = now()
+        index = index_sessions('default')
+        self.assertEqual(set(index), {str(self.author.pk), str(MyUser.objects.get(username='user_1').pk)})
+        self.assertEqual(index_sessions('default', started), {})
+
+        new = uuid7()
+        with self.assertNumQueries(2):
+            self.assertEqual(rekey_sessions({self.author.pk: new, uuid.uuid4(): uuid7()}, index, 'default'), 1)
+        self.assertNotIn(str(self.author.pk), index)
+        Client().login(username='user_2', password='laLA12')
+        self.assertEqual(set(index_sessions('default', started)), {str(MyUser.objects.get(username='user_2').pk)})
@@ -0,0 +1,76 @@
+"""
+Contains unit and integration tests for checking the seed command.
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from myadmin.models import FixtureChecksum
+from posts.models import Post
+from questions.models import QuestionCategory
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestSeedCommand(TestCase):
+    """Test class for the seed command."""
+
+    def setUp(self):
+        """Creating a test fixture file."""
+        self.fixture = tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False)
+        self.write_fixture('some text')
+
+    def tearDown(self):
+        """Removing the test fixture file."""
+        os.remove(self.fixture.name)
+
+    def write_fixture(self, description):
+        """Writes a fixture with one category and one post of this category."""
+        data = [
+            {'model': 'questions.questioncategory', 'pk': 7,
+             'fields': {'name': 'Python', 'description': description, 'image': '', 'available': True}},
+            {'model': 'users.myuser', 'pk': '55231f2d-5852-4b98-985e-038cb5395200',
+             'fields': {'username': 'drf', 'email': 'drf@bla.ru', 'password': '', 'is_active': True,
+                        'groups': [], 'user_permissions': []}},
+            {'model': 'posts.post', 'pk': 3,
+             'fields': {'title': 'Generators', 'author': '55231f2d-5852-4b98-985e-038cb5395200', 'category': 7, 'body': 'text',
+                        'created_on': '2022-02-28T22:41:23.251Z', 'available': True, 'tag': 'generator'}},
+        ]
+        with open(self.fixture.name, 'w', encoding='utf-8') as fixture:
+            json.dump(data, fixture)
+
+    def seed(self):
+        """Runs the command for the test fixture and returns its output."""
+        out = io.StringIO()
+        call_command('seed', self.fixture.name, stdout=out)
+        return out.getvalue()
+
+    def test_seed_creates_objects_and_keeps_dates(self):
+        """Checks the creation of objects with the values from the fixture."""
+        self.assertIn('3 created, 0 updated', self.seed())
+        self.assertEqual(QuestionCategory.objects.get(pk=7).description, 'some text')
+        self.assertEqual(Post.objects.get(pk=3).created_on.year, 2022)
+        self.assertTrue(FixtureChecksum.objects.filter(name=os.path.basename(self.fixture.name)).exists())
+
+    def test_seed_skips_unchanged_fixture(self):
+        """Checks that the unchanged fixture is not loaded again."""
+        self.seed()
+        QuestionCategory.objects.filter(pk=7).update(description='changed on the site')
+        self.assertIn('unchanged, skipped', self.seed())
+        self.assertEqual(QuestionCategory.objects.get(pk=7).description, 'changed on the site')
+
+    def test_seed_updates_changed_fixture(self):
+        """Checks that the changed fixture updates the existing objects."""
+        self.seed()
+        self.write_fixture('new text')
+        self.assertIn('0 created, 3 updated', self.seed())
+        self.assertEqual(QuestionCategory.objects.get(pk=7).description, 'new text')
+        self.assertEqual(QuestionCategory.objects.count(), 1)
@@ -0,0 +1,127 @@
+"""
+Contains unit and integration tests for checking the materialised statistics of the admin panel.
+"""
+
+import io
+import json
+import logging
+import sys
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate
+
+from myadmin.models import StatCounter
+from myadmin.stats import get_dashboard, reconcile, replace_counters, count_answer, PENDING_QUESTIONS
+from posts.models import Post
+from questions.models import QuestionCategory, Question
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestStats(TestCase):
+    """Test class for the dashboard counters."""
+
+    def setUp(self):
+        """Creating a test superuser, categories, questions and a post."""
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru',
+                                                    password='laLA12', is_active=True, is_staff=True,
+                                                    is_superuser=True)
+        self.python = QuestionCategory.objects.create(name='Python')
+        self.django = QuestionCategory.objects.create(name='Django')
+        self.questions = [Question.objects.create(question=f'question {number}', subject=self.python,
+                                                  author=self.test_user, available=number > 2)
+                          for number in range(1, 5)]
+        Post.objects.create(title='post', category=self.django, author=self.test_user, body='text')
+
+    def assertCountersReconciled(self):
+        """Checks that the incremental counters are equal to the recomputed ones."""
+        incremental = get_dashboard()
+        reconcile()
+        self.assertEqual(incremental, get_dashboard())
+
+    def test_signals_count_pending_objects(self):
+        """Checks the pending questions and posts per category after creation, changes and deletion."""
+        stats = get_dashboard()
+        self.assertEqual(stats['pending'], [('Django', 0, 1), ('Python', 2, 0)])
+        self.assertEqual(stats['pending_questions'], 2)
+
+        question = Question.objects.get(pk=self.questions[0].pk)
+        question.subject = self.django
+        question.save()
+        question = Question.objects.get(pk=self.questions[1].pk)
+        question.available = True
+        question.save()
+        Question.objects.get(pk=self.questions[3].pk).delete()
+        self.assertEqual(get_dashboard()['pending'], [('Django', 1, 1)])
+        self.assertCountersReconciled()
+
+    def test_signals_count_users(self):
+        """Checks the new users of today and the activation backlog."""
+        user = MyUser.objects.create_user(username='test_02', email='bla@bla.ru', activation_key='key')
+        stats = get_dashboard()
+        self.assertEqual(stats['days'][0], (localdate().isoformat(), 2, 0))
+        self.assertEqual(stats['activation_backlog'], 1)
+
+        user = MyUser.objects.get(pk=user.pk)
+        user.is_active, user.activation_key = True, ''
+        user.save()
+        self.assertEqual(get_dashboard()['activation_backlog'], 0)
+        self.assertCountersReconciled()
+
+    def test_count_answers(self):
+        """Checks that answers are counted per day."""
+        count_answer()
+        count_answer()
+        self.assertEqual(get_dashboard()['days'][0][2], 2)
+
+    def test_reconcile_after_bulk_update(self):
+        """Checks that the reconciliation corrects the counters after a query without signals."""
+        Question.objects.update(available=False)
+        call_command('reconcile_stats', stdout=io.StringIO())
+        self.assertEqual(StatCounter.objects.get(name=PENDING_QUESTIONS, key=str(self.python.pk)).value, 4)
+
+    def test_bulk_requests_count_changes(self):
+        """Checks that the bulk api requests and the activation of a category change the counters
+        without aggregating the tables."""
+        self.client.login(username='test_01', password='laLA12')
+        user = MyUser.objects.create_user(username='test_02', email='bla@bla.ru', activation_key='key')
+        with CaptureQueriesContext(connection) as context:
+            self.client.post('/api/questions/bulk-toggle/', json.dumps({'ids': [self.questions[0].pk,
+                                                                                self.questions[2].pk]}),
+                             content_type='application/json')
+            self.client.patch('/api/questions/bulk-update/', json.dumps([{'id': self.questions[3].pk,
+                                                                          'subject': self.django.pk}]),
+                              content_type='application/json')
+            self.client.post('/api/posts/bulk-create/', json.dumps([{'title': 'new', 'category': self.python.pk,
+                                                                      'body': 'text', 'is_active': False}]),
+                             content_type='application/json')
+            self.client.post('/api/users/bulk-toggle/', json.dumps({'ids': [str(user.pk)], 'value': True}),
+                             content_type='application/json')
+            self.client.post(reverse('myadmin:admins_category_delete', args=[self.django.pk]), {'flag': 'false'})
+        self.assertFalse([query['sql'] for query in context.captured_queries if 'GROUP BY' in query['sql']])
+        self.assertEqual(get_dashboard()['pending'], [('Django', 1, 1), ('Python', 2, 1)])
+        self.assertFalse(QuestionCategory.objects.get(pk=self.django.pk).available)
+        self.assertEqual(get_dashboard()['activation_backlog'], 0)
+        self.assertCountersReconciled()
+
+    def test_replace_counters_in_place(self):
+        """Checks that the replacement keeps the existing counters and zeroes the missing ones."""
+        count_answer()
+        counter = StatCounter.objects.get(name='answers')
+        replace_counters('answers', {'2022-05-01': 3})
+        self.assertEqual(StatCounter.objects.get(pk=counter.pk).value, 0)
+        self.assertEqual(StatCounter.objects.get(name='answers', key='2022-05-01').value, 3)
+
+    def test_dashboard_reads_counters_only(self):
+        """Checks that the dashboard does not depend on the number of objects of the site."""
+        self.client.login(username='test_01', password='laLA12')
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('myadmin:admins_index'))
+        self.assertEqual(response.context['stats']['pending_posts'], 1)
@@ -0,0 +1,125 @@
+"""
+Contains unit and integration tests for checking the measurements of the requests
+and the summary of the slowest views.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from interview_quiz.timing import Timings, timings, install
+from questions.models import QuestionCategory
+from users.models import MyUser
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, DEBUG=False)
+class TestTiming(TestCase):
+    """Test class for the timing middleware and the slow_views command."""
+
+    def setUp(self):
+        """Creating a staff user, a participant and a category."""
+        cache.clear()
+        self.client = Client()
+        MyUser.objects.create_user(username='staff', email='staff@example.com', password='laLA12',
+                                   is_active=True, is_staff=True)
+        MyUser.objects.create_user(username='user', email='user@example.com', password='laLA12', is_active=True)
+        QuestionCategory.objects.create(name='Python')
+
+    def test_header_for_staff(self):
+        """Checks that the staff gets the measurements of the page in the Server-Timing header."""
+        self.client.login(username='staff', password='laLA12')
+        response = self.client.get(reverse('questions:categories'))
+        self.assertEqual(response.status_code, 200)
+        parts = dict(re.findall(r'(\w+);([^;,]+(?:;desc="[^"]*")?)', response['Server-Timing']))
+        self.assertEqual(set(parts), {'db', 'cache', 'template', 'total'})
+        self.assertRegex(parts['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+        self.assertRegex(parts['cache'], r'^dur=[\d.]+;desc="\d+ hits, \d+ misses"$')
+        self.assertNotEqual(parts['template'], 'dur=0.0')
+
+    def test_no_header_for_others(self):
+        """Checks that the anonymous users and the participants do not get the measurements."""
+        self.assertNotIn('Server-Timing', self.client.get(reverse('questions:categories')))
+        self.client.login(username='user', password='laLA12')
+        self.assertNotIn('Server-Timing', self.client.get(reverse('questions:categories')))
+
+    def test_user_not_loaded(self):
+        """Checks that the user is not loaded for the header by the requests that have not used it."""
+        self.client.login(username='staff', password='laLA12')
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('ready'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_cache_counters(self):
+        """Checks that the hits and misses of the cache are counted once, including the nested calls."""
+        install()
+        state = Timings()
+        token = timings.set(state)
+        try:
+            cache.set('one', 1)
+            cache.get('one')
+            cache.get('two')
+            cache.get_many(['one', 'two', 'three'])
+            self.assertEqual(cache.get_or_set('four', 4), 4)
+            self.assertEqual(cache.get('five', 5), 5)
+            self.assertEqual(cache.get(key='one', default=0), 1)
+            self.assertEqual(cache.get(key='six', default=6), 6)
+        finally:
+            timings.reset(token)
+        cache.get('one')
+        self.assertEqual((state.cache_hits, state.cache_misses), (4, 6))
+        self.assertGreater(state.cache_time, 0)
+
+    def test_cache_in_templates(self):
+        """Checks that the cache calls of a template are counted, and the nested templates are timed once."""
+        install()
+        state = Timings()
+        token = timings.set(state)
+        try:
+            cache.set('fragment', 'text')
+            rendered = Template('{% include inner %}').render(Context({
+                'inner': Template('{{ read }}'), 'read': lambda: cache.get('fragment'),
+            }))
+        finally:
+            timings.reset(token)
+        self.assertEqual(rendered, 'text')
+        self.assertEqual((state.cache_hits, state.cache_misses), (1, 0))
+        self.assertGreater(state.template_time, 0)
+        self.assertEqual(state.depth, {'cache': 0, 'template': 0})
+
+    @override_settings(TIMING_SAMPLE_RATE=1)
+    def test_sampled_records(self):
+        """Checks that the sampled requests are logged and summarised by the slowest views."""
+        logging.disable(logging.NOTSET)
+        self.addCleanup(logging.disable, logging.CRITICAL)
+        with self.assertLogs('interview_quiz.timing', logging.INFO) as logs:
+            self.client.get(reverse('questions:categories'))
+            self.client.get('/api/categories/')
+            self.client.get('/api/categories/')
+        records = [json.loads(line.split(':', 2)[2]) for line in logs.output]
+        self.assertEqual([record['view'] for record in records],
+                         ['questions.views.AllCategoriesView', 'api_rest.api.QuestionCategoryViewSet.list',
+                          'api_rest.api.QuestionCategoryViewSet.list'])
+        self.assertGreater(records[0]['db_queries'], 0)
+
+        handle, path = tempfile.mkstemp(suffix='.log')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as log:
+            log.write('\n'.join(line.split(':', 2)[2] for line in logs.output) + '\nbroken line\n')
+        out = StringIO()
+        call_command('slow_views', log=path, min_requests=2, stdout=out)
+        self.assertIn('3 requests of 2 views', out.getvalue())
+        self.assertIn('api_rest.api.QuestionCategoryViewSet.list', out.getvalue())
+        self.assertNotIn('AllCategoriesView', out.getvalue())
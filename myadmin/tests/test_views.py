@@ -5,8 +5,9 @@ Contains unit and integration tests for checking the views of the web applicatio
 import logging
 import sys
 
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Q
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
 from myadmin.forms import QuestionForm, PostForm, UserAdminRegisterForm, UserAdminProfileForm, CategoryForm
@@ -451,6 +452,16 @@ class TestAdminUserIsStaff(TestAdminTwoUsers):
         user = MyUser.objects.get(id=self.test_user_02.id)
         self.assertFalse(user.is_staff)
 
+    def test_view_ajax_returns_changed_row(self):
+        """Checks that an ajax request receives the row of the changed user only."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        response = self.client.post(reverse('myadmin:admins_user_is_staff', args=[self.test_user_02.id]),
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        data = response.json()
+        self.assertEqual(data['id'], str(self.test_user_02.id))
+        self.assertIn('fa-star', data['row'])
+        self.assertNotIn(self.test_user.username, data['row'])
+
 
 class TestAdminCategoriesListView(TestAdminOneUserSeveralCategories):
     """CategoriesListView test."""
@@ -981,6 +992,26 @@ class TestAdminQuestionDeleteView(TestAdminOneUserOneCategory):
         self.assertEqual(response.status_code, 302)
         self.assertFalse(Question.objects.filter(id=self.test_question.id).exists())
 
+    def test_view_ajax_returns_changed_row(self):
+        """Checks that an ajax request receives only the row of the changed question and the version."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        response = self.client.post(reverse('myadmin:admins_question_delete', args=[self.test_question.id]),
+                                    {'flag': ['false'], }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['id'], str(self.test_question.id))
+        self.assertTrue(data['row'].startswith(f'<tr data-row-id="{self.test_question.id}"'))
+        self.assertIn('no-active', data['row'])
+        self.assertNotIn('<table', data['row'])
+        self.assertIsInstance(data['version'], int)
+
+    def test_view_ajax_delete_returns_no_row(self):
+        """Checks that an ajax deletion tells the script to remove the row."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        response = self.client.post(reverse('myadmin:admins_question_delete', args=[self.test_question.id]),
+                                    {'flag': ['true'], }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertIsNone(response.json()['row'])
+
 
 class TestAdminPostListView(TestAdminOneUserTwoCategories):
     """PostListView test."""
@@ -1509,3 +1540,56 @@ class TestAdminsSearchPostView(TestAdminOneUserOneCategory):
 
         posts = Post.objects.filter(Q(title__icontains='6') | Q(tag__icontains='6'))
         self.assertQuerysetEqual(response.context['object_list'], posts, ordered=False)
+
+
+class TestAdminContentImportView(TestAdminOneUserOneCategory):
+    """ContentImportView test."""
+
+    def test_view_authorized_users_only(self):
+        """Checks that view and relevant site page are not available to unauthorized users."""
+        response = self.client.get('/myadmin/import/')
+        self.assertEqual(response.url, '/users/login/?next=/myadmin/import/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_superusers_only(self):
+        """Checks that ContentImportView view and relevant site page are only available to superusers."""
+        self.test_user.is_superuser = False
+        self.test_user.save()
+        self.client.login(username=self.test_user.username, password='laLA12')
+        response = self.client.get('/myadmin/import/')
+        self.assertEqual(response.url, '/users/login/?next=/myadmin/import/')
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_uses_correct_template_and_title(self):
+        """Checks that the view uses the correct template and title."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        response = self.client.get(reverse('myadmin:admins_import'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'myadmin/import.html')
+        self.assertEqual(response.context['title'], 'Импорт')
+
+    def test_view_imports_uploaded_file(self):
+        """Checks the import of posts from the uploaded file on behalf of the current user."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        rows = SimpleUploadedFile('posts.csv', 'title,category,body\nNew post,test_category,text\n'
+                                  .encode('utf-8'))
+        response = self.client.post(reverse('myadmin:admins_import'), {'content': 'posts', 'file': rows})
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(title='New post')
+        self.assertEqual(post.author, self.test_user)
+        self.assertEqual(post.category, self.test_category)
+
+    def test_view_rejects_unreadable_and_large_files(self):
+        """Checks that a file not in UTF-8 and a too large file are reported as errors of the form."""
+        self.client.login(username=self.test_user.username, password='laLA12')
+        rows = SimpleUploadedFile('posts.csv', 'title,category,body\nСтатья,test_category,text\n'.encode('cp1251'))
+        response = self.client.post(reverse('myadmin:admins_import'), {'content': 'posts', 'file': rows})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Файл не читается', response.context['form'].errors['file'][0])
+
+        rows = SimpleUploadedFile('posts.csv', 'title,category,body\nNew post,test_category,text\n'.encode('utf-8'))
+        with override_settings(IMPORT_MAX_FILE_SIZE=10):
+            response = self.client.post(reverse('myadmin:admins_import'), {'content': 'posts', 'file': rows})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('file', response.context['form'].errors)
+        self.assertFalse(Post.objects.filter(title='New post').exists())
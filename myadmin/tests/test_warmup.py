@@ -0,0 +1,95 @@
+"""
+Contains unit and integration tests for checking the warm-up of worker processes.
+"""
+
+import io
+import logging
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+
+from django.core.cache import cache
+from django.core.management import call_command, CommandError
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from interview_quiz import warmup
+from questions.models import QuestionCategory, Question
+from questions.views import get_question_pool
+from users.models import MyUser
+from users.views import get_leaderboard
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestWarmUp(TestCase):
+    """Test class for the warm-up and the caches it fills."""
+
+    def setUp(self):
+        """Creating a test user, a category and questions."""
+        cache.clear()
+        self.client = Client()
+        self.test_user = MyUser.objects.create_user(username='test_01', email='blabla@bla.ru', score=10,
+                                                    is_active=True)
+        self.category = QuestionCategory.objects.create(name='Python')
+        self.questions = [Question.objects.create(question=f'question {number}', subject=self.category,
+                                                  author=self.test_user, difficulty_level='NB', available=True)
+                          for number in range(1, 4)]
+        self.addCleanup(setattr, warmup, 'ready', warmup.ready)
+
+    def test_readiness(self):
+        """Checks that the process is reported as ready only after the warm-up."""
+        warmup.ready = False
+        self.assertEqual(self.client.get(reverse('ready')).status_code, 503)
+        with mock.patch.object(warmup.connections, 'close_all') as close_all:
+            timings = warmup.warm_up()
+        close_all.assert_called_once_with()
+        self.assertEqual([name for name, _, _ in timings], [name for name, _ in warmup.STEPS])
+        self.assertFalse([result for _, _, result in timings if isinstance(result, Exception)])
+        self.assertEqual(self.client.get(reverse('ready')).json(), {'ready': True})
+
+    def test_disabled(self):
+        """Checks that the process is ready at once when the warm-up is disabled."""
+        warmup.ready = False
+        with mock.patch.dict('os.environ', {'WARM_UP': '0'}):
+            self.assertEqual(self.client.get(reverse('ready')).json(), {'ready': True})
+
+    def test_primed_caches(self):
+        """Checks that after the warm-up the cached data is read without queries
+        and that it is recomputed after a change of the content."""
+        warmup.prime_caches()
+        with self.assertNumQueries(0):
+            self.assertEqual(sorted(get_question_pool(self.category.pk, 'NB')), [item.pk for item in self.questions])
+            self.assertEqual(get_leaderboard(), [self.test_user])
+
+        Question.objects.get(pk=self.questions[0].pk).delete()
+        self.assertEqual(len(get_question_pool(self.category.pk, 'NB')), 2)
+
+    def test_command(self):
+        """Checks that the command prints the time of every step."""
+        out = io.StringIO()
+        call_command('warmup', stdout=out)
+        for name, _ in warmup.STEPS:
+            self.assertIn(name, out.getvalue())
+
+    def test_broken_project_template(self):
+        """Checks that an error in a template of the project fails the warm-up,
+        and in a template of a third-party package is only logged."""
+        warmup.ready = False
+        with tempfile.TemporaryDirectory(dir=settings.BASE_DIR) as project, tempfile.TemporaryDirectory() as package:
+            Path(project, 'page.html').write_text('{% load missing_library %}')
+            Path(package, 'widget.html').write_text('{% load missing_library %}')
+            engine = {'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [package]}
+            with override_settings(TEMPLATES=[engine]):
+                self.assertEqual(warmup.load_templates(), 0)
+            with override_settings(TEMPLATES=[{**engine, 'DIRS': [package, project]}]):
+                with self.assertRaisesMessage(warmup.WarmUpError, 'page.html'):
+                    warmup.warm_up()
+                with self.assertRaisesMessage(CommandError, 'page.html'):
+                    call_command('warmup', stdout=io.StringIO())
+        self.assertEqual(self.client.get(reverse('ready')).status_code, 503)
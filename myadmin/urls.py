@@ -14,7 +14,8 @@ from .views import AdminPanelView, UserListView, UserUpdateView, UserDeleteView,
     UserCreateView, CategoriesListView, CategoriesUpdateView, \
     CategoriesCreateView, CategoriesDeleteView, QuestionListView, QuestionCreateView, QuestionUpdateView, \
     QuestionDeleteView, PostListView, PostCreateView, PostUpdateView, PostDeleteView, UserIsStaff, \
-    AdminsSearchQuestionView, AdminsSearchPostView, AdminsSearchUserView, AdminsSearchCategoryView
+    AdminsSearchQuestionView, AdminsSearchPostView, AdminsSearchUserView, AdminsSearchCategoryView, \
+    ContentImportView, GridView, GridDataView, QueryReportView
 
 app_name = 'myadmin'
 urlpatterns = [
@@ -45,4 +46,11 @@ urlpatterns = [
     path('search/cat/', AdminsSearchCategoryView.as_view(), name='admins_search_results_category'),
     path('search/question/', AdminsSearchQuestionView.as_view(), name='admins_search_results_question'),
     path('search/post/', AdminsSearchPostView.as_view(), name='admins_search_results_post'),
+
+    path('import/', ContentImportView.as_view(), name='admins_import'),
+
+    path('grid/<str:name>/', GridView.as_view(), name='admins_grid'),
+    path('grid/<str:name>/data/', GridDataView.as_view(), name='admins_grid_data'),
+
+    path('queries/', QueryReportView.as_view(), name='admins_queries'),
 ]
@@ -6,19 +6,33 @@ There are views:
     * for standard work with objects according to the CRUD principle;
     * for searching for users, posts, categories and questions by a given mask (word or part of a word);
     * to grant or remove administrator rights to a user;
+    * for bulk import of questions and posts from CSV or JSONL files;
+    * for data grids with server-side sorting, filtering and keyset pagination;
+    * for the statistics of the database queries of the requests, open to the whole staff;
 
-To reduce code duplication, two parent classes are used.
+To reduce code duplication, two parent classes and a mixin for partial row responses are used.
 """
 
+import io
+
+from django.conf import settings
+from django.contrib import messages
 from django.db.models import Q
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import HttpResponseRedirect, JsonResponse, Http404
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy, reverse
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
-
-from interview_quiz.mixin import TitleMixin, UserDispatchMixin
-from myadmin.forms import UserAdminRegisterForm, UserAdminProfileForm, CategoryForm, QuestionForm, PostForm
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView, FormView
+
+from interview_quiz import metrics
+from interview_quiz.db import queries
+from interview_quiz.mixin import TitleMixin, UserDispatchMixin, StaffDispatchMixin
+from interview_quiz.versions import bump_version, get_version
+from myadmin.forms import UserAdminRegisterForm, UserAdminProfileForm, CategoryForm, QuestionForm, PostForm, \
+    ImportForm
+from myadmin.grids import GRIDS, GridError
+from myadmin.importers import IMPORTERS, ImportFileError, guess_format
+from myadmin.stats import PENDING_POSTS, PENDING_QUESTIONS, get_dashboard, increment
 from posts.models import Post
 from questions.models import QuestionCategory, Question
 from users.models import MyUser
@@ -45,7 +59,34 @@ class BaseListView(ListView, TitleMixin, UserDispatchMixin):
         return context
 
 
-class BaseDeleteView(DeleteView, UserDispatchMixin):
+class RowResponseMixin:
+    """Mixin for the views that change a single row of the lists of the admin panel.
+    Instead of re-rendering the whole table of the page, an ajax request receives only
+    the changed row, which the script replaces in place.
+
+    Attributes:
+
+        * row_template (`str`): the template of one row of the table;
+        * row_context_name (`str`): the name of the object in the context of the row template.
+    """
+    row_template = ''
+    row_context_name = ''
+
+    def row_response(self, request, pk):
+        """Returns the new state of the changed object (``self.object``).
+
+        The response contains the id of the object, its rendered row ('row' is None if
+        the object has been deleted) and the version of the model. The script ignores
+        responses with a version older than the one already applied to the row,
+        so late responses of previous clicks do not overwrite fresh data.
+        """
+        row = None
+        if self.object.pk is not None:
+            row = render_to_string(self.row_template, {self.row_context_name: self.object}, request=request)
+        return JsonResponse({'id': str(pk), 'row': row, 'version': get_version(self.model)})
+
+
+class BaseDeleteView(RowResponseMixin, DeleteView, UserDispatchMixin):
     """Parent class for QuestionDeleteView and PostDeleteView, required to comply with the DRY pattern."""
 
     def delete(self, request, flag='false', *args, **kwargs):
@@ -60,7 +101,7 @@ class BaseDeleteView(DeleteView, UserDispatchMixin):
             * ``*args``: standard parameter.
             * ``**kwargs``: standard parameter.
         """
-        item = self.get_object()
+        item = self.object = self.get_object()
         if 'flag' in request.POST:
             flag = request.POST['flag']
         if flag == 'false':
@@ -71,10 +112,18 @@ class BaseDeleteView(DeleteView, UserDispatchMixin):
 
 
 class AdminPanelView(TemplateView, TitleMixin, UserDispatchMixin):
-    """View for the main admin page."""
+    """View for the main admin page with the statistics of the site.
+    The statistics are read from the materialised counters, so the page does not
+    aggregate the tables of the site whatever their size."""
     template_name = 'myadmin/admin.html'
     title = 'Админка'
 
+    def get_context_data(self, **kwargs):
+        """Adds the dashboard statistics to the context."""
+        context = super().get_context_data(**kwargs)
+        context['stats'] = get_dashboard()
+        return context
+
 
 class UserListView(ListView, TitleMixin, UserDispatchMixin):
     """View to view lists of all registered users of the site in the admin panel."""
@@ -103,11 +152,13 @@ class UserUpdateView(UpdateView, TitleMixin, UserDispatchMixin):
     title = 'Изменить пользователя'
 
 
-class UserDeleteView(DeleteView, UserDispatchMixin):
+class UserDeleteView(RowResponseMixin, DeleteView, UserDispatchMixin):
     """View to delete or activate/deactivate a specific user in the admin panel."""
     model = MyUser
     template_name = 'myadmin/users/users-update.html'
     success_url = reverse_lazy('myadmin:admins_users')
+    row_template = 'myadmin/includes/row-users.html'
+    row_context_name = 'user'
 
     def delete(self, request, flag='false', *args, **kwargs):
         """Performs complete deletion or activation/deactivation of the user
@@ -121,7 +172,7 @@ class UserDeleteView(DeleteView, UserDispatchMixin):
             * ``*args``: standard parameter.
             * ``**kwargs``: standard parameter.
         """
-        item = self.get_object()
+        item = self.object = self.get_object()
         if 'flag' in request.POST:
             flag = request.POST['flag']
         if request.user.id != kwargs['pk']:
@@ -133,38 +184,33 @@ class UserDeleteView(DeleteView, UserDispatchMixin):
 
     def post(self, request, *args, **kwargs):
         """Starts the process of deleting or activating/deactivating user.
-        When enabled ajax, returns data for an asynchronous web request"""
+        When enabled ajax, returns the changed row of the table"""
         self.delete(request, *args, **kwargs)
         if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-            uuids = request.POST.getlist('elements[]')
-
-            page_obj = MyUser.objects.filter(id__in=uuids)
-            context = {'page_obj': page_obj}
-
-            result = render_to_string('myadmin/includes/table-users.html', request=request, context=context)
-            return JsonResponse({'result': result})
+            return self.row_response(request, kwargs['pk'])
         return HttpResponseRedirect(reverse('myadmin:admins_user_update', kwargs=kwargs))
 
 
-class UserIsStaff(UpdateView, UserDispatchMixin):
+class UserIsStaff(RowResponseMixin, UpdateView, UserDispatchMixin):
     """View for granting the user rights/removing the rights of the superuser in the admin panel."""
     model = MyUser
     form_class = UserAdminProfileForm
     template_name = 'myadmin/includes/table-users.html'
+    row_template = 'myadmin/includes/row-users.html'
+    row_context_name = 'user'
 
     def post(self, request, *args, **kwargs):
         """Sets superuser rights for the selected user or deletes them.
-        When enabled ajax, returns data for an asynchronous web request."""
-        user = get_object_or_404(MyUser, pk=kwargs['pk'])
+        When enabled ajax, returns the changed row of the table."""
+        user = self.object = get_object_or_404(MyUser, pk=kwargs['pk'])
         if self.request.user != user:
             user.is_staff = False if user.is_staff is True else True
             user.save()
+        if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
+            return self.row_response(request, kwargs['pk'])
         uuids = request.POST.getlist('elements[]')
         page_obj = MyUser.objects.filter(id__in=uuids)
         context = {'page_obj': page_obj}
-        if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-            result = render_to_string('myadmin/includes/table-users.html', request=request, context=context)
-            return JsonResponse({'result': result})
         return render(request, 'myadmin/users/users-viewing.html', context=context)
 
 
@@ -201,11 +247,13 @@ class CategoriesUpdateView(UpdateView, TitleMixin, UserDispatchMixin):
     title = 'Изменить категорию'
 
 
-class CategoriesDeleteView(DeleteView, UserDispatchMixin):
+class CategoriesDeleteView(RowResponseMixin, DeleteView, UserDispatchMixin):
     """View to delete or activate/deactivate a specific category in the admin panel."""
     model = QuestionCategory
     template_name = 'myadmin/categories/category-update.html'
     success_url = reverse_lazy('myadmin:admins_categories')
+    row_template = 'myadmin/includes/row-categories.html'
+    row_context_name = 'category'
 
     def delete(self, request, flag='false', *args, **kwargs):
         """Performs complete deletion or activation/deactivation of the category
@@ -220,35 +268,31 @@ class CategoriesDeleteView(DeleteView, UserDispatchMixin):
             * ``*args``: standard parameter.
             * ``**kwargs``: standard parameter.
         """
-        item = self.get_object()
+        item = self.object = self.get_object()
         if 'flag' in request.POST:
             flag = request.POST['flag']
         if flag == 'false':
-            if item.available is True:
-                item.question_set.update(available=False)
-                item.post_set.update(available=False)
-                item.available = False
-            else:
-                item.question_set.update(available=True)
-                item.post_set.update(available=True)
-                item.available = True
+            # the objects already in the new state are skipped, so the counters change by the updated rows
+            delta = 1 if item.available else -1
+            questions = item.question_set.filter(available=item.available).update(available=not item.available)
+            posts = item.post_set.filter(available=item.available).update(available=not item.available)
+            for name, changed in ((PENDING_QUESTIONS, questions), (PENDING_POSTS, posts)):
+                if changed:
+                    increment(name, item.pk, delta * changed)
+            item.available = not item.available
+            bump_version(Question)
+            bump_version(Post)
             item.save()
         else:
             item.delete()
 
     def post(self, request, *args, **kwargs):
         """Starts the process of deleting or activating/deactivating category.
-        When enabled ajax, returns data for an asynchronous web request.
+        When enabled ajax, returns the changed row of the table.
         """
         self.delete(request, *args, **kwargs)
         if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-            str_to_int = list(map(int, request.POST.getlist('elements[]')))
-
-            page_obj = QuestionCategory.objects.filter(id__in=str_to_int)
-            context = {'page_obj': page_obj}
-
-            result = render_to_string('myadmin/includes/table-categories.html', request=request, context=context)
-            return JsonResponse({'result': result})
+            return self.row_response(request, kwargs['pk'])
         return HttpResponseRedirect(reverse('myadmin:admins_category_update', kwargs=kwargs))
 
 
@@ -326,20 +370,18 @@ class QuestionUpdateView(UpdateView, TitleMixin, UserDispatchMixin):
 class QuestionDeleteView(BaseDeleteView):
     """View to delete or activate/deactivate a specific question in the admin panel."""
     model = Question
+    queryset = Question.objects.select_related('subject', 'author')
     template_name = 'myadmin/questions/question-update.html'
     success_url = reverse_lazy('myadmin:admins_questions')
+    row_template = 'myadmin/includes/row-questions.html'
+    row_context_name = 'question'
 
     def post(self, request, *args, **kwargs):
         """Starts the process of deleting or activating/deactivating question.
-        When enabled ajax, returns data for an asynchronous web request."""
+        When enabled ajax, returns the changed row of the table."""
         self.delete(request, *args, **kwargs)
         if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-            str_to_int = list(map(int, request.POST.getlist('elements[]')))
-
-            page_obj = Question.objects.filter(id__in=str_to_int)
-            context = {'page_obj': page_obj}
-            result = render_to_string('myadmin/includes/table-questions.html', request=request, context=context)
-            return JsonResponse({'result': result})
+            return self.row_response(request, kwargs['pk'])
         return HttpResponseRedirect(reverse('myadmin:admins_question_update', kwargs=kwargs))
 
 
@@ -412,20 +454,19 @@ class PostUpdateView(UpdateView, TitleMixin, UserDispatchMixin):
 class PostDeleteView(BaseDeleteView):
     """View to delete or activate/deactivate a specific post in the admin panel."""
     model = Post
+    queryset = Post.objects.select_related('category', 'author')
     template_name = 'myadmin/posts/post-update.html'
     success_url = reverse_lazy('myadmin:admins_posts')
+    row_template = 'myadmin/includes/row-posts.html'
+    row_context_name = 'post'
 
     def post(self, request, *args, **kwargs):
         """Starts the process of deleting or activating/deactivating post.
-        When enabled ajax, returns data for an asynchronous web request.
+        When enabled ajax, returns the changed row of the table.
         """
         self.delete(request, *args, **kwargs)
         if request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest':
-            str_to_int = list(map(int, request.POST.getlist('elements[]')))
-            page_obj = Post.objects.filter(id__in=str_to_int)
-            context = {'page_obj': page_obj}
-            result = render_to_string('myadmin/includes/table-posts.html', request=request, context=context)
-            return JsonResponse({'result': result})
+            return self.row_response(request, kwargs['pk'])
         return HttpResponseRedirect(reverse('myadmin:admins_post_update', kwargs=kwargs))
 
 
@@ -498,3 +539,84 @@ class AdminsSearchPostView(ListView, TitleMixin, UserDispatchMixin):
             object_list = Post.objects.filter(Q(title__icontains=query) | Q(tag__icontains=query))
             return object_list
         return Post.objects.all()
+
+
+class ContentImportView(FormView, TitleMixin, UserDispatchMixin):
+    """View for bulk import of questions or posts from a CSV or JSONL file in the admin panel.
+    Images of the rows can be uploaded as a zip archive together with the file.
+    """
+    template_name = 'myadmin/import.html'
+    form_class = ImportForm
+    success_url = reverse_lazy('myadmin:admins_import')
+    title = 'Импорт'
+
+    def form_valid(self, form):
+        """Reads the uploaded file as a stream and imports its rows.
+        The result of the import and the first errors are shown to the user as messages,
+        a file that cannot be read - as an error of the form.
+        """
+        uploaded = form.cleaned_data['file']
+        importer = IMPORTERS[form.cleaned_data['content']](author=self.request.user.username,
+                                                           archive=form.cleaned_data['archive'])
+        stream = io.TextIOWrapper(uploaded.file, encoding='utf-8', newline='')
+        try:
+            result = importer.run(stream, guess_format(uploaded.name))
+        except ImportFileError as e:
+            form.add_error('file', str(e))
+            return self.form_invalid(form)
+        messages.success(self.request, str(result))
+        for line_num, error in result.errors:
+            messages.warning(self.request, f'Строка {line_num}: {error}')
+        return super().form_valid(form)
+
+
+class GridView(TemplateView, TitleMixin, UserDispatchMixin):
+    """View of the page with a data grid of users, categories, questions or posts.
+    The rows are loaded by the script of the page from GridDataView as the table is scrolled."""
+    template_name = 'myadmin/grid.html'
+    title = 'Таблица'
+
+    def get_context_data(self, **kwargs):
+        """Adds the name, columns and headers of the grid to the context."""
+        context = super().get_context_data(**kwargs)
+        if kwargs['name'] not in GRIDS:
+            raise Http404
+        grid = GRIDS[kwargs['name']]()
+        context['grid_name'] = kwargs['name']
+        context['grid_columns'] = list(zip(grid.columns, grid.get_labels()))
+        return context
+
+
+class GridDataView(UserDispatchMixin):
+    """View that returns one page of a data grid as JSON."""
+
+    def get(self, request, *args, **kwargs):
+        """Returns the rows of the page selected by the parameters of the request
+        (see ``BaseGrid``), or an error with the status 400 if the parameters are incorrect."""
+        if kwargs['name'] not in GRIDS:
+            raise Http404
+        try:
+            page = GRIDS[kwargs['name']]().get_page(request.GET)
+        except GridError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(page)
+
+
+class QueryReportView(TemplateView, TitleMixin, StaffDispatchMixin):
+    """View of the page with the database queries of the requests grouped by their fingerprints
+    and the slowest of them (see interview_quiz/db/queries.py).
+    The order of the fingerprints is taken from the 'sort' parameter of the request."""
+    template_name = 'myadmin/queries.html'
+    title = 'Запросы к БД'
+
+    def get_context_data(self, **kwargs):
+        """Adds the fingerprints and the slow samples of all workers to the context."""
+        context = super().get_context_data(**kwargs)
+        sort = self.request.GET.get('sort')
+        context['sort'] = sort if sort in queries.SORT_BY else 'total'
+        if settings.METRICS_DIR:
+            metrics.flush()
+        context['rows'], context['samples'] = queries.report(queries.load(settings.METRICS_DIR), context['sort'])
+        context['slow_query_ms'] = settings.SLOW_QUERY_MS
+        context['enabled'] = settings.QUERY_STATS
+        return context
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.2 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('available', True)), fields=['tag'], name='post_available_tag_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('available', True)), fields=['category'], name='post_available_category_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.2 on 2026-10-19 15:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from interview_quiz.db.author_keys import create_sync_trigger, drop_sync_trigger
+
+
+class Migration(migrations.Migration):
+    """The first step of the migration of the author to the primary key of the user
+    (see interview_quiz/db/author_keys.py): the new column and the trigger syncing it."""
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0003_post_available_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='author_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(create_sync_trigger('posts.Post'), drop_sync_trigger('posts.Post')),
+    ]
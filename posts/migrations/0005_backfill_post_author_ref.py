@@ -0,0 +1,19 @@
+# Generated by Django 3.2.2 on 2026-10-19 15:02
+
+from django.db import migrations
+
+from interview_quiz.db.author_keys import backfill_author_ref, restore_author_username
+
+
+class Migration(migrations.Migration):
+    """The second step of the migration of the author to the primary key of the user
+    (see interview_quiz/db/author_keys.py): the backfill, one transaction per batch."""
+    atomic = False
+
+    dependencies = [
+        ('posts', '0004_post_author_ref'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_author_ref('posts.Post'), restore_author_username('posts.Post')),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.2 on 2026-10-19 15:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import users.models
+
+from interview_quiz.db.author_keys import KeepOldColumn, SetNotNull
+
+
+class Migration(migrations.Migration):
+    """The third step of the migration of the author to the primary key of the user
+    (see interview_quiz/db/author_keys.py): the model reads and writes the new column."""
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0005_backfill_post_author_ref'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                # the previous release still writes the usernames until it is stopped
+                KeepOldColumn(
+                    model_name='post',
+                    name='author',
+                    field=models.ForeignKey(db_constraint=False, default='drf', null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, to_field='username'),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='post',
+                    name='author',
+                ),
+                migrations.RenameField(
+                    model_name='post',
+                    old_name='author_ref',
+                    new_name='author',
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='author',
+                    field=models.ForeignKey(db_column='author_ref_id', null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        SetNotNull(
+            model_name='post',
+            name='author',
+            field=models.ForeignKey(db_column='author_ref_id', default=users.models.get_default_author, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -2,16 +2,18 @@
 Stores the post model, which is necessary to provide additional functionality
 of the site - small articles for better disclosure of the topic of questions.
 """
-from PIL import Image
 from django.core.mail import send_mail
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 
+from interview_quiz.images import shrink_image
+from interview_quiz.mixin import DirtyFieldsMixin
 from interview_quiz.settings import ADMIN_USERNAME, DOMAIN_NAME, EMAIL_HOST_USER
+from interview_quiz.versions import bump_version
 from questions.models import QuestionCategory
-from users.models import MyUser
+from users.models import MyUser, get_default_author
 
 
 def post_image_path(instance, filename):
@@ -31,10 +33,13 @@ def post_image_path(instance, filename):
     return f'post_images/{title_str}_{filename}'
 
 
-class Post(models.Model):
+class Post(DirtyFieldsMixin, models.Model):
     """The model for the post."""
     title = models.CharField(max_length=150)
-    author = models.ForeignKey(MyUser, to_field='username', default='drf',  on_delete=models.CASCADE)
+    # the primary key of the author in the column that has replaced the username,
+    # see interview_quiz/db/author_keys.py
+    author = models.ForeignKey(MyUser, on_delete=models.CASCADE,
+                               db_column='author_ref_id')
     category = models.ForeignKey(QuestionCategory, on_delete=models.CASCADE)
     body = models.TextField()
     image = models.ImageField(blank=True, upload_to=post_image_path)
@@ -42,6 +47,14 @@ class Post(models.Model):
     available = models.BooleanField(default=False)
     tag = models.CharField(max_length=250, default='IT', db_index=True)
 
+    class Meta:
+        indexes = [
+            # the available posts of a tag (the answer page, TagPostView) and of a category
+            models.Index(fields=['tag'], condition=models.Q(available=True), name='post_available_tag_idx'),
+            models.Index(fields=['category'], condition=models.Q(available=True),
+                         name='post_available_category_idx'),
+        ]
+
     def __str__(self):
         """Forms a printable representation of the object.
         Returns a post's title.
@@ -54,6 +67,8 @@ class Post(models.Model):
         and a image is added for it, the selected image will be reduced
         to a certain size of 300x300 (if it is initially larger) and
         will be saved along the generated path.
+        Only the changed fields are written, the image is processed only if it has changed.
+        A post without an author is given the default one (``users.models.DEFAULT_AUTHOR``).
 
         The following path to the image will be assigned:
             post_images/{title of post}_{name of the source image file}
@@ -67,14 +82,12 @@ class Post(models.Model):
             it is assumed that the images will have a horizontal orientation,
             the vertical orientation images will be processed incorrectly and should not be used.
         """
-        super().save()
-        if self.image:
-            img = Image.open(self.image.path)
-
-            if img.height > 600 or img.width > 600:
-                output_size = (600, 600)
-                img.thumbnail(output_size)
-                img.save(self.image.path)
+        if self.author_id is None:
+            self.author_id = get_default_author()
+        kwargs['update_fields'] = self.get_fields_to_save(**kwargs)
+        super().save(**kwargs)
+        if self.image and (kwargs['update_fields'] is None or 'image' in kwargs['update_fields']):
+            shrink_image(self.image.path, (600, 600))
 
     def delete(self, using=None, keep_parents=False):
         """When deleting a post, it also deletes the image belonging to it, if it existed."""
@@ -105,8 +118,11 @@ def new_post_info(sender, instance, **kwargs):
 
     Note:
         When creating a new post by the admin, an email notification is not sent to him.
+        Updates and fixture loading are skipped without loading the author of the post.
     """
-    if not instance.pk and instance.author.username not in ADMIN_USERNAME:
+    if kwargs.get('raw') or instance.pk:
+        return
+    if instance.author.username not in ADMIN_USERNAME:
         subject = f"Предложена новая статья"
         context = {
             'user': instance.author.username,
@@ -117,3 +133,16 @@ def new_post_info(sender, instance, **kwargs):
         message = render_to_string('emails/new_post.html', context)
         send_mail(subject, message, EMAIL_HOST_USER, [EMAIL_HOST_USER],
                   html_message=message, fail_silently=False)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def post_content_changed(sender, instance, **kwargs):
+    """Increases the version of posts when one of them is saved or deleted,
+    which invalidates the cached data derived from them.
+
+    Args:
+
+        * sender (`Post`): the model of the changed object;
+        * instance (`Post`): the changed object.
+    """
+    bump_version(sender, instance.pk)
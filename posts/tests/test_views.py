@@ -5,7 +5,8 @@ import logging
 import sys
 
 from django.db.models import Q
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 
 from questions.models import QuestionCategory
@@ -247,3 +248,44 @@ class TestSearchPostView(TestPostBase):
 
         post = self.test_post_05
         self.assertNotIn(post, response.context['object_list'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestConditionalGet(TestPostBase):
+    """Test class for the conditional GET requests of the pages of posts."""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+
+    def test_not_modified_without_queries(self):
+        """Checks that a repeated request of an unchanged post is answered with 304 without database queries."""
+        url = reverse('posts:post', args=[self.test_post_01.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_change_of_object_changes_etag(self):
+        """Checks that only the change of the post itself (or of a category) changes the ETag of its page."""
+        url = reverse('posts:post', args=[self.test_post_01.pk])
+        etag = self.client.get(url)['ETag']
+        self.test_post_02.title = 'Moonfall'
+        self.test_post_02.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.test_post_01.title = 'The Day After'
+        self.test_post_01.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_user(self):
+        """Checks that the pages of anonymous and authorized users have different ETags."""
+        url = reverse('posts:tag_posts', args=['fantastic'])
+        etag = self.client.get(url)['ETag']
+        self.client.login(username='test_01', password='laLA12')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
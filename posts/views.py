@@ -16,18 +16,19 @@ from django.db.models import Q, Count
 from django.shortcuts import get_object_or_404
 from django.views.generic import ListView, DetailView
 
-from interview_quiz.mixin import TitleMixin, AuthorizedOnlyDispatchMixin
+from interview_quiz.mixin import TitleMixin, AuthorizedOnlyDispatchMixin, ConditionalGetMixin
 from posts.models import Post
 from questions.models import QuestionCategory
 from users.models import MyUser
 
 
-class PostsCategoryView(ListView, TitleMixin):
+class PostsCategoryView(ListView, TitleMixin, ConditionalGetMixin):
     """View for displaying all posts by category (only active categories)."""
     model = QuestionCategory
     template_name = 'posts/all.html'
     context_object_name = 'posts_categories'
     title = 'Посты'
+    version_models = (QuestionCategory, Post)
 
     def get_queryset(self):
         """Displaying all active categories.
@@ -37,10 +38,12 @@ class PostsCategoryView(ListView, TitleMixin):
             annotate(posts_count=Count('post', distinct=True))
 
 
-class PostView(DetailView):
+class PostView(DetailView, ConditionalGetMixin):
     """View for the output of a separate post."""
     model = Post
     template_name = 'posts/read.html'
+    version_models = (QuestionCategory,)
+    version_object_model = Post
 
     def get_context_data(self, *args, **kwargs):
         """Getting a specific post and its title and passing it to the context."""
@@ -51,12 +54,14 @@ class PostView(DetailView):
         return context
 
 
-class UserPostView(ListView, AuthorizedOnlyDispatchMixin):
+class UserPostView(ListView, AuthorizedOnlyDispatchMixin, ConditionalGetMixin):
     """View for displaying posts of a specific user.
     It is triggered when you click on the author's nickname when you are
     on the page of a particular post."""
     model = Post
     template_name = 'posts/user_posts.html'
+    version_models = (Post,)
+    version_object_model = MyUser
 
     def get_context_data(self, *args, **kwargs):
         """Retrieves a specific user and a queryset of his posts and transfers to the context."""
@@ -70,11 +75,12 @@ class UserPostView(ListView, AuthorizedOnlyDispatchMixin):
         return context
 
 
-class TagPostView(ListView):
+class TagPostView(ListView, ConditionalGetMixin):
     """View to display posts with a specific tag.
     It is triggered when you click on the tag when you are on the page of a certain post."""
     model = Post
     template_name = 'posts/tag_posts.html'
+    version_models = (Post,)
 
     def get_context_data(self, *args, **kwargs):
         """Retrieves a specific tag and a queryset of posts with this tag and passes it to the context."""
@@ -87,11 +93,13 @@ class TagPostView(ListView):
         return context
 
 
-class CategoryPostView(ListView):
+class CategoryPostView(ListView, ConditionalGetMixin):
     """View to display posts of a specific category.
     It is triggered when you click on the category when you are on the page of a certain post."""
     model = Post
     template_name = 'posts/category_posts.html'
+    version_models = (Post,)
+    version_object_model = QuestionCategory
 
     def get_context_data(self, *args, **kwargs):
         """Retrieves a specific category and a queryset of posts of this category and passes it to the context."""
@@ -105,7 +113,7 @@ class CategoryPostView(ListView):
         return context
 
 
-class SearchPostView(ListView, TitleMixin):
+class SearchPostView(ListView, TitleMixin, ConditionalGetMixin):
     """View to display the search result posts.
     It is triggered when you use the search bar at the top of the page.
     The search is performed using the following options:
@@ -116,6 +124,7 @@ class SearchPostView(ListView, TitleMixin):
     model = Post
     template_name = 'posts/search_results_post.html'
     title = 'Поиск статьи'
+    version_models = (Post,)
 
     def get_queryset(self):
         """Retrieves the search mask specified by the user and
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.2 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questioncategory',
+            name='name',
+            field=models.CharField(db_index=True, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(condition=models.Q(('available', True)), fields=['subject', 'difficulty_level'], name='question_pool_idx'),
+        ),
+    ]
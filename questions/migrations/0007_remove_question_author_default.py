@@ -0,0 +1,28 @@
+# Generated by Django 3.2.2 on 2026-10-19 15:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """The default author is no longer a callable default of the field, which queried the users
+    for every new object, but is set by ``save()`` when the author is missing. A callable
+    default is never a default of the column, so only the state changes."""
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('questions', '0006_switch_question_author'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='question',
+                    name='author',
+                    field=models.ForeignKey(db_column='author_ref_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+    ]
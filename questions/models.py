@@ -5,15 +5,17 @@ user testing.
 
 import logging
 
-from PIL import Image
 from django.core.mail import send_mail
 from django.db import models
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 
+from interview_quiz.images import shrink_image
+from interview_quiz.mixin import DirtyFieldsMixin
 from interview_quiz.settings import ADMIN_USERNAME, DOMAIN_NAME, EMAIL_HOST_USER
-from users.models import MyUser
+from interview_quiz.versions import bump_version
+from users.models import MyUser, get_default_author
 
 logger = logging.getLogger(__name__)
 
@@ -51,9 +53,10 @@ def question_image_path(instance, filename):
     return f'que_images/{instance.subject}/{question_str}_{filename}'
 
 
-class QuestionCategory(models.Model):
+class QuestionCategory(DirtyFieldsMixin, models.Model):
     """The model for the category."""
-    name = models.CharField(max_length=64)
+    # the questions of a category are looked up by its name (GraphQL get_questions_by_category)
+    name = models.CharField(max_length=64, db_index=True)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to=category_image_path, blank=True)
     available = models.BooleanField(default=True, db_index=True)
@@ -67,6 +70,7 @@ class QuestionCategory(models.Model):
     def save(self, **kwargs):
         """Saves the object and if it has images, reduces them to a size of 600x300,
         forms a path to the images and saves them.
+        Only the changed fields are written, the image is processed only if it has changed.
 
         The following path to the image will be assigned:
             cat_images/{category name}_{name of the source image file}
@@ -80,14 +84,10 @@ class QuestionCategory(models.Model):
             it is assumed that the images will have a horizontal orientation,
             the vertical orientation images will be processed incorrectly and should not be used.
         """
-        super().save()
-        if self.image:
-            img = Image.open(self.image.path)
-
-            if img.height > 600 or img.width > 600:
-                output_size = (600, 300)
-                img.thumbnail(output_size)
-                img.save(self.image.path)
+        kwargs['update_fields'] = self.get_fields_to_save(**kwargs)
+        super().save(**kwargs)
+        if self.image and (kwargs['update_fields'] is None or 'image' in kwargs['update_fields']):
+            shrink_image(self.image.path, (600, 300))
 
     @property
     def image_url(self):
@@ -102,7 +102,7 @@ class QuestionCategory(models.Model):
         super().delete()
 
 
-class Question(models.Model):
+class Question(DirtyFieldsMixin, models.Model):
     """The model for the category."""
     NEWBIE = 'NB'
     AVERAGE = 'AV'
@@ -118,7 +118,10 @@ class Question(models.Model):
 
     question = models.CharField(max_length=250)
     subject = models.ForeignKey(QuestionCategory, on_delete=models.CASCADE, default='1')
-    author = models.ForeignKey(MyUser, to_field='username', on_delete=models.CASCADE, default='drf')
+    # the primary key of the author in the column that has replaced the username,
+    # see interview_quiz/db/author_keys.py
+    author = models.ForeignKey(MyUser, on_delete=models.CASCADE,
+                               db_column='author_ref_id')
     right_answer = models.CharField(max_length=150, default='default')
     answer_01 = models.CharField(max_length=150, default='default')
     answer_02 = models.CharField(max_length=150, default='default')
@@ -134,6 +137,13 @@ class Question(models.Model):
     image_02 = models.ImageField(upload_to=question_image_path, blank=True)
     image_03 = models.ImageField(upload_to=question_image_path, blank=True)
 
+    class Meta:
+        indexes = [
+            # the pool of questions of a test: the available questions of a category and level
+            models.Index(fields=['subject', 'difficulty_level'], condition=models.Q(available=True),
+                         name='question_pool_idx'),
+        ]
+
     def __str__(self):
         """Forms a printable representation of the object.
         Returns the content of the question.
@@ -143,6 +153,8 @@ class Question(models.Model):
     def save(self, **kwargs):
         """Saves the object and if it has images, reduces them to a size of 600x600,
         forms a path to the images and saves them.
+        Only the changed fields are written, only the changed images are processed.
+        A question without an author is given the default one (``users.models.DEFAULT_AUTHOR``).
 
         The following path to the image will be assigned:
             que_images/{category name}/{question content}_{name of the source image file}
@@ -157,17 +169,18 @@ class Question(models.Model):
             it is assumed that the images will have a horizontal orientation,
             the vertical orientation images will be processed incorrectly and should not be used.
         """
-        super().save()
-        for image in (self.image_01, self.image_02, self.image_03):
+        if self.author_id is None:
+            self.author_id = get_default_author()
+        kwargs['update_fields'] = self.get_fields_to_save(**kwargs)
+        super().save(**kwargs)
+        for name in ('image_01', 'image_02', 'image_03'):
+            image = getattr(self, name)
+            if not image or (kwargs['update_fields'] is not None and name not in kwargs['update_fields']):
+                continue
             try:
-                img = Image.open(image.path)
-                if img.height > 600 or img.width > 600:
-                    output_size = (600, 600)
-                    img.thumbnail(output_size)
-                    img.save(image.path)
-            except ValueError as e:
+                shrink_image(image.path, (600, 600))
+            except (ValueError, OSError) as e:
                 logger.error(f'Ошибка обработки фото для нового вопроса {e}')
-                pass
 
     def delete(self, using=None, keep_parents=False):
         """When deleting a category, it also deletes the image belonging to it, if it existed."""
@@ -195,8 +208,11 @@ def new_question_info(sender, instance, **kwargs):
 
     Note:
         When creating a new question by the admin, an email notification is not sent to him.
+        Updates and fixture loading are skipped without loading the author of the question.
     """
-    if not instance.pk and instance.author.username not in ADMIN_USERNAME:
+    if kwargs.get('raw') or instance.pk:
+        return
+    if instance.author.username not in ADMIN_USERNAME:
         subject = f"Предложен новый вопрос"
         context = {
             'user': instance.author.username,
@@ -206,3 +222,17 @@ def new_question_info(sender, instance, **kwargs):
         message = render_to_string('emails/new_question.html', context)
         send_mail(subject, message, EMAIL_HOST_USER, [EMAIL_HOST_USER],
                   html_message=message, fail_silently=False)
+
+
+@receiver([post_save, post_delete], sender=QuestionCategory)
+@receiver([post_save, post_delete], sender=Question)
+def question_content_changed(sender, instance, **kwargs):
+    """Increases the version of categories or questions when one of them is saved or deleted,
+    which invalidates the cached data derived from them.
+
+    Args:
+
+        * sender (`QuestionCategory` or `Question`): the model of the changed object;
+        * instance (`QuestionCategory` or `Question`): the changed object.
+    """
+    bump_version(sender, instance.pk)
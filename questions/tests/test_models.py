@@ -2,9 +2,17 @@
 Contains unit and integration tests for checking the models of the web application.
 """
 
+import io
 import logging
+import shutil
 import sys
-from django.test import TestCase
+import tempfile
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from users.models import MyUser
 from ..models import Question, QuestionCategory
@@ -50,6 +58,18 @@ class TestQuestionCategoryModel(TestCase):
         category = QuestionCategory.objects.get(id=1)
         self.assertEquals(category.available, True)
 
+    def test_image_reduced(self):
+        """Checks that a large image of a category is reduced to 600x300."""
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        image = io.BytesIO()
+        Image.new('RGB', (1200, 900)).save(image, 'PNG')
+        with override_settings(MEDIA_ROOT=media):
+            category = QuestionCategory.objects.create(
+                name='Go', image=SimpleUploadedFile('go.png', image.getvalue(), content_type='image/png'))
+            with Image.open(category.image.path) as img:
+                self.assertEqual(img.size, (400, 300))
+
 
 class TestQuestionModel(TestCase):
     """Test class for the Question model."""
@@ -155,3 +175,40 @@ class TestQuestionModel(TestCase):
         question = Question.objects.first()
         expected_string_output = question.question
         self.assertEquals(expected_string_output, str(question))
+
+
+class TestChangeAwareSave(TestCase):
+    """Test class for saving only the changed fields of questions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Set up a test category, user and question."""
+        category = QuestionCategory.objects.create(name='Python', description='a convenient programming language')
+        author = MyUser.objects.create_user(username='drf', email='drf@bla.ru', is_active=True)
+        cls.question_id = Question.objects.create(question='What is a list?', subject=category, author=author).id
+
+    def test_dirty_fields(self):
+        """Only the changed fields are reported as dirty, a new object has no loaded values."""
+        question = Question.objects.get(id=self.question_id)
+        self.assertEqual(question.get_dirty_fields(), [])
+        question.available = True
+        self.assertEqual(question.get_dirty_fields(), ['available'])
+        self.assertIsNone(Question(question='new').get_dirty_fields())
+
+    def test_save_writes_changed_fields_only(self):
+        """Toggling availability updates a single column without loading the author."""
+        question = Question.objects.get(id=self.question_id)
+        question.available = True
+        with CaptureQueriesContext(connection) as context:
+            question.save()
+        queries = [query['sql'] for query in context.captured_queries if 'questions_question' in query['sql']]
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"tag"', queries[0])
+        self.assertTrue(Question.objects.get(id=self.question_id).available)
+        self.assertEqual(question.get_dirty_fields(), [])
+
+    def test_save_without_changes(self):
+        """Saving an unchanged object makes no queries."""
+        question = Question.objects.get(id=self.question_id)
+        with self.assertNumQueries(0):
+            question.save()
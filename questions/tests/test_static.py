@@ -0,0 +1,51 @@
+"""
+Contains unit tests for checking the storage of the static files of the production build.
+"""
+import gzip
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    logging.disable(logging.CRITICAL)
+
+
+class TestStaticStorage(SimpleTestCase):
+    """Test class for the hashed and precompressed static files."""
+
+    def setUp(self):
+        """Creating a temporary directory of source files and a directory for the collected files."""
+        self.source = tempfile.TemporaryDirectory()
+        self.root = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.source.name, 'css'))
+        with open(os.path.join(self.source.name, 'css', 'big.css'), 'w') as file:
+            file.write('body { background: url("../small.txt"); }\n' + '.row { margin: 0; }\n' * 200)
+        with open(os.path.join(self.source.name, 'small.txt'), 'w') as file:
+            file.write('small')
+
+    def tearDown(self):
+        self.source.cleanup()
+        self.root.cleanup()
+
+    def test_collectstatic(self):
+        """Checks the manifest, the hashed names and that only big files are compressed."""
+        with override_settings(STATICFILES_DIRS=[self.source.name], STATIC_ROOT=self.root.name,
+                               STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+                               STATICFILES_STORAGE='interview_quiz.storage.CompressedManifestStaticFilesStorage'):
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(self.root.name, 'staticfiles.json')) as file:
+            paths = json.load(file)['paths']
+        css = os.path.join(self.root.name, paths['css/big.css'])
+        self.assertRegex(paths['css/big.css'], r'^css/big\.[0-9a-f]{12}\.css$')
+        with open(css, 'rb') as file, gzip.open(css + '.gz') as compressed:
+            content = file.read()
+            self.assertEqual(compressed.read(), content)
+        self.assertIn(paths['small.txt'].encode(), content)
+        self.assertFalse(os.path.exists(os.path.join(self.root.name, paths['small.txt']) + '.gz'))
+        self.assertFalse(os.path.exists(os.path.join(self.root.name, 'css', 'big.css.gz')))
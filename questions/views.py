@@ -14,14 +14,19 @@ Here are views:
 
 
 import logging
-from random import randint
+from random import sample
 
 from django.db.models import Q
 from django.shortcuts import render, get_object_or_404
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, TemplateView, DetailView
 
-from interview_quiz.mixin import TitleMixin, AuthorizedOnlyDispatchMixin
+from interview_quiz.db.router import primary_only
+from interview_quiz.metrics import QUIZ_STARTS, QUIZ_ANSWERS
+from interview_quiz.mixin import TitleMixin, AuthorizedOnlyDispatchMixin, ConditionalGetMixin
 from interview_quiz.variabls import POINTS_LEVEL
+from interview_quiz.versions import get_cached
+from myadmin.stats import count_answer
 from posts.models import Post
 from questions.models import Question, QuestionCategory
 from users.models import MyUser
@@ -29,6 +34,20 @@ from users.models import MyUser
 logger = logging.getLogger(__name__)
 
 
+def get_available_categories():
+    """Returns the list of available categories, cached until categories change."""
+    return get_cached('available_categories', (QuestionCategory,),
+                      lambda: list(QuestionCategory.objects.filter(available=True)))
+
+
+def get_question_pool(category_id, diff_level):
+    """Returns the ids of the available questions of the category and level of complexity
+    that the questions of a test are chosen from, cached until questions change."""
+    return get_cached(f'question_pool:{category_id}:{diff_level}', (Question,),
+                      lambda: list(Question.objects.filter(subject_id=category_id, difficulty_level=diff_level,
+                                                           available=True).values_list('pk', flat=True)))
+
+
 def my_handler404(request, exception):
     """View for the 404 page."""
     context = dict()
@@ -44,15 +63,17 @@ class MainView(TemplateView, TitleMixin):
     title = 'Interview challenge'
 
 
-class AllCategoriesView(ListView, TitleMixin):
+class AllCategoriesView(ListView, TitleMixin, ConditionalGetMixin):
     """View for the categories of questions page."""
     model = QuestionCategory
     template_name = 'questions/categories.html'
     title = 'Категории тестов'
+    context_object_name = 'questioncategory_list'
+    version_models = (QuestionCategory,)
 
     def get_queryset(self):
-        """Returns queryset of only available categories."""
-        return QuestionCategory.objects.filter(available=True)
+        """Returns the list of only available categories."""
+        return get_available_categories()
 
 
 class CategoryView(DetailView, AuthorizedOnlyDispatchMixin):
@@ -107,6 +128,7 @@ class QuestionView(DetailView, AuthorizedOnlyDispatchMixin):
         self.request.session['limit'] = data[2]
 
         current_category = get_object_or_404(QuestionCategory, pk=self.kwargs.get('pk'))
+        QUIZ_STARTS.inc(category=current_category.name, level=difficulty_level)
         question_set = self.get_question_set(current_category, difficulty_level)
         id_list = [item.id for item in question_set]
         context = {'dif_points': POINTS_LEVEL[difficulty_level],
@@ -148,56 +170,26 @@ class QuestionView(DetailView, AuthorizedOnlyDispatchMixin):
         return render(request, 'questions/test_body.html', context=context_current)
 
     @staticmethod
-    def get_question_set(category, diff_level):
-        """Generates a queryset of all available questions of the desired category and level of complexity;
-        receives and returns a pseudo-random queryset of 20 questions if the original queryset was more than 20,
-        or in an amount equal to the number of questions of the original queryset.
+    def get_question_set(category, diff_level, limit=20):
+        """Returns a pseudo-random list of available questions of the desired category and level of complexity:
+        20 questions if there are more of them, otherwise all of them in random order.
 
         Args:
 
             * category(QuestionCategory): user-selected question category;
             * diff_level(Question.difficulty_level): user-selected difficulty level;
-
-        Return:
-
-            * result_set(list): a pseudo-random list of Question objects - questions of the selected category
-            and difficulty level, are available for use.
-
-        """
-        question_set = Question.objects.filter(Q(subject=category), Q(difficulty_level=diff_level), Q(available=True))
-        question_set_count = question_set.count()
-        if question_set_count < 20:
-            return QuestionView.create_random_queryset(question_set, question_set_count, question_set_count)
-        return QuestionView.create_random_queryset(question_set, question_set_count)
-
-    @staticmethod
-    def create_random_queryset(question_set, question_set_count, limit=20):
-        """Generates a pseudo-random queryset of questions in an amount equal to the specified limit and returns it.
-
-        Args:
-
-            * question_set(Queryset of Question objects): queryset of all questions of the selected category,
-                                                          difficulty level and available for use;
-            * question_set_count(int): the number of questions in this queryset;
             * limit(int, optional): the default value is 20. Limits the number of questions per test.
-                                    If less than 20 questions belong to the selected category and
-                                    difficulty level, the limit value will be equal to their number.
 
         Return:
 
             * result_set(list): a pseudo-random list of Question objects - questions of the selected category
             and difficulty level, are available for use.
+
         """
-        result_set = list()
-        while len(result_set) < limit:
-            try:
-                item = question_set[randint(0, question_set_count - 1)]
-                if item not in result_set:
-                    result_set.append(item)
-            except ValueError:
-                logger.error('Ошибка запроса вопроса из базы')
-                return None
-        return result_set
+        pool = get_question_pool(category.pk, diff_level)
+        chosen = sample(pool, min(limit, len(pool)))
+        questions = Question.objects.in_bulk(chosen)
+        return [questions[pk] for pk in chosen if pk in questions]
 
 
 class AnswerQuestion(DetailView, AuthorizedOnlyDispatchMixin):
@@ -206,6 +198,8 @@ class AnswerQuestion(DetailView, AuthorizedOnlyDispatchMixin):
     model = Question
     template_name = 'questions/answers.html'
 
+    # the score is read and written back, so it must not be read from a lagging replica
+    @method_decorator(primary_only)
     def get(self, request, guessed=False, *args, **kwargs):
         """Checks the correctness of this answer and increases/decreases the player's score
         and the number of his correct and incorrect answers stored in the session.
@@ -241,6 +235,8 @@ class AnswerQuestion(DetailView, AuthorizedOnlyDispatchMixin):
                 user.score = 0
         request.session.modified = True
         user.save(update_fields=['score'])
+        count_answer()
+        QUIZ_ANSWERS.inc(level=difficult_level, result='correct' if guessed else 'wrong')
         context = {
             'title': f'Ответ на вопрос {item}',
             'item': item,
@@ -0,0 +1,128 @@
+/**
+ * Contains the virtual-scrolling data grid of the admin panel.
+ *
+ * Pages of rows are requested from the server with a cursor as the table is scrolled,
+ * and only the rows visible in the viewport (plus a small margin) are kept in the DOM,
+ * so the page stays fast whatever the number of loaded rows.
+ */
+
+window.addEventListener('load', () => {
+    let grid = document.getElementById('admin_grid');
+    if (grid === null) {
+        return;
+    }
+
+    const ROW_HEIGHT = 37;
+    const OVERSCAN = 10;
+    const PAGE_SIZE = 200;
+
+    let viewport = grid.querySelector('.grid-viewport');
+    let spacer = grid.querySelector('.grid-spacer');
+    let rowsTable = grid.querySelector('.grid-rows');
+    let body = rowsTable.querySelector('tbody');
+
+    let state = {rows: [], next: null, done: false, loading: false, sort: '', filters: {}, request: 0};
+
+    /**
+     * Forms the parameters of the request of the next page.
+     */
+    function params() {
+        let query = new URLSearchParams(state.filters);
+        query.set('limit', PAGE_SIZE);
+        if (state.sort) {
+            query.set('sort', state.sort);
+        }
+        if (state.next) {
+            query.set('cursor', state.next);
+        }
+        return query;
+    }
+
+    /**
+     * Loads the next page of rows. Responses of requests made before
+     * the sorting or filters were changed are ignored.
+     */
+    function loadMore() {
+        if (state.loading || state.done) {
+            return;
+        }
+        state.loading = true;
+        let request = state.request;
+        $.getJSON(grid.dataset.url + '?' + params().toString())
+            .done((data) => {
+                if (request !== state.request) {
+                    return;
+                }
+                state.rows = state.rows.concat(data.rows);
+                state.next = data.next;
+                state.done = data.next === null;
+                render();
+            })
+            .always(() => {
+                if (request === state.request) {
+                    state.loading = false;
+                }
+            });
+    }
+
+    /**
+     * Draws only the rows that are visible in the viewport and loads
+     * the next page when the end of the loaded rows becomes close.
+     */
+    function render() {
+        spacer.style.height = (state.rows.length * ROW_HEIGHT) + 'px';
+        let first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        let last = Math.min(state.rows.length,
+            Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+
+        let html = '';
+        for (let i = first; i < last; i++) {
+            html += '<tr style="height: ' + ROW_HEIGHT + 'px">';
+            state.rows[i].forEach((value) => {
+                html += '<td>' + $('<div>').text(value === null ? '' : value).html() + '</td>';
+            });
+            html += '</tr>';
+        }
+        body.innerHTML = html;
+        rowsTable.style.top = (first * ROW_HEIGHT) + 'px';
+
+        if (last + PAGE_SIZE / 2 > state.rows.length) {
+            loadMore();
+        }
+    }
+
+    /**
+     * Drops the loaded rows and starts loading from the first page.
+     */
+    function reload() {
+        state.request += 1;
+        state.rows = [];
+        state.next = null;
+        state.done = false;
+        state.loading = false;
+        viewport.scrollTop = 0;
+        render();
+    }
+
+    viewport.addEventListener('scroll', () => window.requestAnimationFrame(render));
+
+    $(grid).on('click', '.grid-sort', (e) => {
+        let column = e.currentTarget.dataset.column;
+        state.sort = state.sort === column ? '-' + column : column;
+        reload();
+    });
+
+    let timer = null;
+    $(grid).on('input', '.grid-filter', (e) => {
+        let column = e.currentTarget.dataset.column;
+        if (e.currentTarget.value) {
+            state.filters[column] = e.currentTarget.value;
+        } else {
+            delete state.filters[column];
+        }
+        clearTimeout(timer);
+        timer = setTimeout(reload, 300);
+    });
+
+    reload();
+});
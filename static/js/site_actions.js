@@ -5,32 +5,51 @@
 window.addEventListener('load', (e) => {
 
     /**
-     * Allows you to make a category available/unavailable at the click of a button
-     * without reloading the entire page, while preserving the original pagination.
-     * Works in the admin panel on the category list page.
+     * Replaces a row of an admin panel table with the row received from the server,
+     * or removes it if the object has been deleted. The server returns the version of the data
+     * with each row: a response older than the one already applied to the row is ignored,
+     * so a late answer to a previous click cannot overwrite fresh data.
      */
-    $('#update_cat_catcher').on('click', '#update_cat_btn', (e) => {
-        let t_href = e.target;
-        let checkBox = document.getElementById("option2");
-
-        let arr = [];
-        let elements = document.getElementsByClassName('item-on-page')
-        for (let i = 0; i < elements.length; i++) {
-            arr[i] = elements[i].attributes['value'].value
+    function patchRow(data) {
+        let row = $(`tr[data-row-id="${data.id}"]`);
+        if (row.data('version') > data.version) {
+            return;
         }
+        if (data.row === null) {
+            row.remove();
+            return;
+        }
+        let newRow = $($.parseHTML(data.row.trim()));
+        newRow.data('version', data.version);
+        row.replaceWith(newRow);
+    }
 
-        let flag = checkBox.checked;
+    /**
+     * Sends an activation/deactivation (or deletion) request for one object of an admin panel
+     * table and patches only its row, without reloading the page or the whole table.
+     */
+    function toggleRow(url, data) {
         $.ajax({
             type: 'POST',
             headers: {'X-CSRF-TOKEN': csrftoken},
-            data: {'flag': flag, 'elements': arr},
-            url: '/myadmin/categories-delete/' + t_href.name + '/',
+            data: data,
+            url: url,
             success: (data) => {
-                if (data) {
-                    $('.table-responsive').html(data.result)
+                if (data && data.id) {
+                    patchRow(data)
                 }
             },
         });
+    }
+
+    /**
+     * Allows you to make a category available/unavailable at the click of a button
+     * without reloading the entire page, while preserving the original pagination.
+     * Works in the admin panel on the category list page.
+     */
+    $('#update_cat_catcher').on('click', '#update_cat_btn', (e) => {
+        let flag = document.getElementById("option2").checked;
+        toggleRow('/myadmin/categories-delete/' + e.target.name + '/', {'flag': flag});
         e.preventDefault();
     });
 
@@ -40,30 +59,8 @@ window.addEventListener('load', (e) => {
      * Works in the admin panel on the question list page.
      */
     $('#update_que_catcher').on('click', '#update_que_btn', (e) => {
-        let t_href = e.target;
-        let checkBox = document.getElementById("option2");
-
-        let arr = [];
-        let elements = document.getElementsByClassName('item-on-page')
-        for (let i = 0; i < elements.length; i++) {
-            arr[i] = elements[i].attributes['value'].value
-        }
-
-        let flag = checkBox.checked;
-        $.ajax({
-            type: 'POST',
-            headers: {'X-CSRF-TOKEN': csrftoken},
-            data: {
-                'flag': flag,
-                'elements': arr
-            },
-            url: '/myadmin/questions-delete/' + t_href.name + '/',
-            success: (data) => {
-                if (data) {
-                    $('.table-responsive').html(data.result)
-                }
-            },
-        });
+        let flag = document.getElementById("option2").checked;
+        toggleRow('/myadmin/questions-delete/' + e.target.name + '/', {'flag': flag});
         e.preventDefault();
     });
 
@@ -73,91 +70,29 @@ window.addEventListener('load', (e) => {
      * Works in the admin panel on the user list page.
      */
     $('#update_users_catcher').on('click', '#update_user_btn', (e) => {
-        let t_href = e.target;
-        let checkBox = document.getElementById("option2");
-
-        let arr = [];
-        let elements = document.getElementsByClassName('item-on-page')
-        for (let i = 0; i < elements.length; i++) {
-            arr[i] = elements[i].attributes['value'].value
-        }
-
-        let flag = checkBox.checked;
-        $.ajax({
-            type: 'POST',
-            headers: {'X-CSRF-TOKEN': csrftoken},
-            data: {
-                'flag': flag,
-                'elements': arr
-            },
-            url: '/myadmin/users-delete/' + t_href.name + '/',
-            success: (data) => {
-                if (data.result) {
-                    $('.table-responsive').html(data.result)
-                }
-            },
-        });
+        let flag = document.getElementById("option2").checked;
+        toggleRow('/myadmin/users-delete/' + e.target.name + '/', {'flag': flag});
         e.preventDefault();
     });
 
     /**
-     * Allows you to give the user the rights of a superuser/deprive of these rights
-     * at the touch of a button without reloading the entire page, while preserving the original pagination.
-     * Works in the admin panel on the user list page.
+     * Allows you to make a post available/unavailable at the click of a button
+     * without reloading the entire page, while preserving the original pagination.
+     * Works in the admin panel on the post list page.
      */
     $('#update_post_catcher').on('click', '#update_post_btn', (e) => {
-        let t_href = e.target;
-        let checkBox = document.getElementById("option2");
-
-        let arr = [];
-        let elements = document.getElementsByClassName('item-on-page')
-        for (let i = 0; i < elements.length; i++) {
-            arr[i] = elements[i].attributes['value'].value
-        }
-
-        let flag = checkBox.checked;
-        $.ajax({
-            type: 'POST',
-            headers: {'X-CSRF-TOKEN': csrftoken},
-            data: {
-                'flag': flag,
-                'elements': arr
-            },
-            url: '/myadmin/posts-delete/' + t_href.name + '/',
-            success: (data) => {
-                if (data.result) {
-                    $('.table-responsive').html(data.result)
-                }
-            },
-        });
+        let flag = document.getElementById("option2").checked;
+        toggleRow('/myadmin/posts-delete/' + e.target.name + '/', {'flag': flag});
         e.preventDefault();
     });
 
     /**
-     * Allows you to make a user active/inactive at the click of a button
-     * without reloading the entire page, while preserving the original pagination.
+     * Allows you to give the user the rights of a superuser/deprive of these rights
+     * at the touch of a button without reloading the entire page, while preserving the original pagination.
      * Works in the admin panel on the users list page.
      */
     $('#give_me_a_crown').on('click', '#give_me_a_crown_btn', (e) => {
-        let t_href = e.target;
-
-        let arr = [];
-        let elements = document.getElementsByClassName('item-on-page')
-        for (let i = 0; i < elements.length; i++) {
-            arr[i] = elements[i].attributes['value'].value
-        }
-
-        $.ajax({
-            type: 'POST',
-            headers: {'X-CSRF-TOKEN': csrftoken},
-            data: {'elements': arr},
-            url: '/myadmin/users-is-staff/' + t_href.name + '/',
-            success: (data) => {
-                if (data.result) {
-                    $('.table-responsive').html(data.result)
-                }
-            },
-        });
+        toggleRow('/myadmin/users-is-staff/' + e.target.name + '/', {});
         e.preventDefault();
     });
 
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.2 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_alter_myuser_social_network'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='myuser',
+            index=models.Index(condition=models.Q(('is_active', True), ('score__gt', 0)), fields=['-score'], name='user_leaderboard_idx'),
+        ),
+    ]
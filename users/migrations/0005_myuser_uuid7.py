@@ -0,0 +1,24 @@
+# Generated by Django 3.2.2 on 2026-10-19 14:23
+
+from django.db import migrations, models
+import interview_quiz.db.keys
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_myuser_user_leaderboard_idx'),
+    ]
+
+    operations = [
+        # the default is applied by Django, the table does not change (SQLite would rebuild it)
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='myuser',
+                    name='id',
+                    field=models.UUIDField(default=interview_quiz.db.keys.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
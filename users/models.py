@@ -2,13 +2,18 @@
 Stores the user model that is necessary for the interaction of site visitors with its content.
 """
 from datetime import timedelta
-from uuid import uuid4
 
-from PIL import Image
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils.timezone import now
 
+from interview_quiz.db.keys import uuid7
+from interview_quiz.images import shrink_image
+from interview_quiz.mixin import DirtyFieldsMixin
+from interview_quiz.versions import bump_version
+
 
 def users_image_path(instance, filename):
     """Generates and returns the path for the saved avatar of the user.
@@ -26,9 +31,10 @@ def users_image_path(instance, filename):
     return f'user_images/{instance.username}_{filename}'
 
 
-class MyUser(AbstractUser):
+class MyUser(DirtyFieldsMixin, AbstractUser):
     """The model for the user."""
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    # time-ordered keys, appended to the end of the indexes (see interview_quiz/db/keys.py)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     img = models.ImageField(blank=True, upload_to=users_image_path)
     email = models.EmailField(unique=True)
     score = models.PositiveIntegerField(default=0)
@@ -38,6 +44,13 @@ class MyUser(AbstractUser):
     info = models.BooleanField(default=True)
     social_network = models.BooleanField(default=False)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # the leaderboard: the active users with a score, by the score
+            models.Index(fields=['-score'], condition=models.Q(is_active=True, score__gt=0),
+                         name='user_leaderboard_idx'),
+        ]
+
     def __str__(self):
         """Forms a printable representation of the object.
         Returns user's firstname and username.
@@ -49,6 +62,7 @@ class MyUser(AbstractUser):
         Saves the object. If a user edits his profile and wants to set
         an avatar or change it, the selected image is reduced to a size
         of 300x300 (if it is initially larger) and saved along the generated path.
+        Only the changed fields are written, the avatar is processed only if it has changed.
 
         The following path to the image will be assigned:
             user_images/{username of the profile owner}_{name of the source image file}
@@ -62,17 +76,10 @@ class MyUser(AbstractUser):
             it is assumed that the images will have a horizontal orientation,
             the vertical orientation images will be processed incorrectly and should not be used.
         """
-        if 'update_fields' in kwargs:
-            super().save(update_fields=kwargs['update_fields'])
-            if self.img and 'img' in kwargs['update_fields']:
-                img = Image.open(self.img.path)
-
-                if img.height > 300 or img.width > 300:
-                    output_size = (300, 300)
-                    img.thumbnail(output_size)
-                    img.save(self.img.path)
-        else:
-            super().save()
+        kwargs['update_fields'] = self.get_fields_to_save(**kwargs)
+        super().save(**kwargs)
+        if self.img and (kwargs['update_fields'] is None or 'img' in kwargs['update_fields']):
+            shrink_image(self.img.path, (300, 300))
 
     def delete(self, using=None, keep_parents=False):
         """When deleting a user, it also deletes the image belonging to it, if it existed."""
@@ -87,3 +94,25 @@ class MyUser(AbstractUser):
         if now() <= self.activation_key_created + timedelta(hours=48):
             return False
         return True
+
+
+#: the username of the author of questions and posts created without one (the api, fixtures, imports)
+DEFAULT_AUTHOR = 'drf'
+
+
+def get_default_author():
+    """Returns the primary key of the default author of questions and posts, or None if there is no such user."""
+    return MyUser.objects.filter(username=DEFAULT_AUTHOR).values_list('pk', flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=MyUser)
+def user_changed(sender, instance, **kwargs):
+    """Increases the version of users when one of them is saved or deleted,
+    which invalidates the cached data derived from them (for example, the rating).
+
+    Args:
+
+        * sender (`MyUser`): the model of the changed object;
+        * instance (`MyUser`): the changed object.
+    """
+    bump_version(sender, instance.pk)
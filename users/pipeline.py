@@ -12,6 +12,7 @@ from django.urls import reverse
 from django.utils import timezone
 from social_core.exceptions import AuthForbidden
 
+from interview_quiz.metrics import REGISTRATIONS
 from users.models import MyUser
 
 import logging
@@ -73,6 +74,8 @@ def save_new_user(backend, user, response, *args, **kwargs):
         raise AuthForbidden('social_core.backends.vk.VK0Auth2')
     user.is_active, user.social_network = True, True
     user.save()
+    if kwargs.get('is_new'):
+        REGISTRATIONS.inc(method='vk')
 
 
 def if_user_exists_pipeline(request, details, backend, **kwargs):
@@ -27,8 +27,10 @@ from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.views.generic import UpdateView, CreateView, ListView, TemplateView, FormView
 
+from interview_quiz.metrics import REGISTRATIONS
 from interview_quiz.mixin import TitleMixin, AuthorizedOnlyDispatchMixin
 from interview_quiz.settings import DOMAIN_NAME, EMAIL_HOST_USER
+from interview_quiz.versions import get_cached
 from myadmin.forms import PostForm, QuestionForm
 from posts.models import Post
 from questions.models import Question
@@ -39,6 +41,12 @@ from users.models import MyUser
 logger = logging.getLogger(__name__)
 
 
+def get_leaderboard():
+    """Returns the 5 active participants with the highest total score, cached until users change."""
+    return get_cached('leaderboard', (MyUser,), lambda: list(
+        MyUser.objects.filter(Q(is_active=True) & Q(score__gt=0)).order_by('-score')[:5]))
+
+
 class UserLoginView(LoginView, TitleMixin):
     """A view for authorization."""
     template_name = 'registration/login.html'
@@ -81,6 +89,7 @@ class RegisterView(FormView, TitleMixin):
                     msg = f'К сожалению, произошел сбой, письмо для завершения регистрации не было отослано. ' \
                           f'Для активации вашего профиля напишите письмо на адрес {EMAIL_HOST_USER}'
                     messages.error(request, msg)
+                REGISTRATIONS.inc(method='form')
                 return HttpResponseRedirect(reverse('users:register'))
             except SMTPAuthenticationError:
                 messages.error(request, 'К сожалению, произошел сбой. Пользователь с указанными данными не был'
@@ -315,8 +324,8 @@ class TopUsers(ListView, TitleMixin, AuthorizedOnlyDispatchMixin):
     context_object_name = 'top_users'
 
     def get_queryset(self):
-        """Returns a sorted queryset of 5 participants with the highest total score."""
-        return MyUser.objects.filter(Q(is_active=True) & Q(score__gt=0)).order_by('-score')[:5]
+        """Returns a sorted list of 5 participants with the highest total score."""
+        return get_leaderboard()
 
 
 class WriteToAdmin(FormView, TitleMixin, AuthorizedOnlyDispatchMixin):